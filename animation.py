@@ -0,0 +1,138 @@
+# animation.py
+"""
+Animaciones de color del tablero en una sola línea de tiempo.
+- Cada animación es una descripción (Blink, Pulse, Fade) y su color en un
+  instante sale de cuánto tiempo pasó desde que empezó; no lee el color
+  actual del widget ni encadena after() propios.
+- Timeline tiene a lo sumo una animación por destino: volver a lanzar una
+  la reemplaza, así dos parpadeos no se desfasan ni se apilan.
+- frame() cuesta O(animaciones activas) y devuelve sólo los destinos
+  cuyo color cambió; la UI lo llama desde un único callback por frame.
+Sin Tk: los destinos son claves ("time", "shot", ...) que la UI traduce.
+"""
+from dataclasses import dataclass
+from typing import Optional
+import functools, math, time
+
+NS_PER_MS = 1_000_000
+RED   = "#ff2b2b"
+WHITE = "white"
+GOLD  = "#ffd700"
+
+_NAMED = {"white": (255, 255, 255), "black": (0, 0, 0)}
+
+
+@functools.lru_cache(maxsize=None)  # pocos colores distintos
+def rgb(color):
+    if color in _NAMED:
+        return _NAMED[color]
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def mix(a, b, f, steps=8):
+    """Color entre `a` y `b` (f de 0 a 1), redondeado a `steps` tonos: pocos sprites en el canvas."""
+    f = round(max(0.0, min(1.0, f)) * steps) / steps
+    ca, cb = rgb(a), rgb(b)
+    return "#%02x%02x%02x" % tuple(int(round(x + (y - x) * f)) for x, y in zip(ca, cb))
+
+
+@dataclass(frozen=True)
+class Blink:
+    """Alterna `on`/`off` cada `interval_ms`, `times` cambios, y queda en `end` (por defecto `on`)."""
+    on: str = RED
+    off: str = WHITE
+    interval_ms: int = 250
+    times: int = 6
+    end: Optional[str] = None
+
+    @property
+    def duration_ns(self):
+        return self.interval_ms * self.times * NS_PER_MS
+
+    def color(self, t_ns):
+        if t_ns >= self.duration_ns:
+            return self.end or self.on
+        return self.on if (t_ns // (self.interval_ms * NS_PER_MS)) % 2 == 0 else self.off
+
+
+@dataclass(frozen=True)
+class Pulse:
+    """Va y viene entre `a` y `b` (senoidal) hasta que se la detiene; `cycles`=0 es sin fin."""
+    a: str = GOLD
+    b: str = RED
+    period_ms: int = 600
+    cycles: int = 0
+    end: Optional[str] = None
+
+    @property
+    def duration_ns(self):
+        return self.period_ms * self.cycles * NS_PER_MS if self.cycles else None
+
+    def color(self, t_ns):
+        d = self.duration_ns
+        if d is not None and t_ns >= d:
+            return self.end or self.a
+        phase = (t_ns % (self.period_ms * NS_PER_MS)) / (self.period_ms * NS_PER_MS)
+        return mix(self.a, self.b, (1 - math.cos(2 * math.pi * phase)) / 2)
+
+
+@dataclass(frozen=True)
+class Fade:
+    """Pasa de `a` a `b` en `duration_ms` y queda en `b`."""
+    a: str = GOLD
+    b: str = RED
+    duration_ms: int = 1000
+
+    @property
+    def duration_ns(self):
+        return self.duration_ms * NS_PER_MS
+
+    def color(self, t_ns):
+        return mix(self.a, self.b, t_ns / self.duration_ns)
+
+
+# Las del tablero
+PERIOD_END = Blink(RED, WHITE, 250, 6)           # fin de período: el reloj parpadea y queda rojo
+SHOT_WARN  = Fade(GOLD, RED, 1000)               # 24s en 10: se pone rojo de a poco
+SHOT_LAST  = Pulse(RED, WHITE, 500)              # últimos 5 s: late hasta que se rearma
+SHOT_ZERO  = Blink(RED, "#000000", 150, 8)       # 24s en 0
+
+
+class Timeline:
+    """
+    - play(destino, animación): la reemplaza si ya había una
+    - stop(destino): la corta (la UI repone el color de reposo)
+    - frame(): {destino: color} de lo que cambió desde el frame anterior
+    """
+    def __init__(self, now=time.monotonic_ns):
+        self.now = now
+        self.active = {}     # destino -> (animación, t0)
+        self._shown = {}     # destino -> último color devuelto
+        self.frames = 0
+
+    def play(self, target, anim):
+        self.active[target] = (anim, self.now())
+        self._shown.pop(target, None)
+
+    def stop(self, target) -> bool:
+        self._shown.pop(target, None)
+        return self.active.pop(target, None) is not None
+
+    def playing(self, target):
+        entry = self.active.get(target)
+        return entry[0] if entry else None
+
+    def frame(self) -> dict:
+        now = self.now()
+        self.frames += 1
+        out = {}
+        for target, (anim, t0) in list(self.active.items()):
+            t = now - t0
+            color = anim.color(t)
+            if self._shown.get(target) != color:
+                self._shown[target] = out[target] = color
+            d = anim.duration_ns
+            if d is not None and t >= d:  # terminó: queda en su color final
+                del self.active[target]
+                del self._shown[target]
+        return out
@@ -0,0 +1,201 @@
+# archive.py
+"""
+Archivo de partidos del torneo en SQLite.
+- Cada partido guardado deja una fila en `games` y una por período en
+  `game_periods`; en la MISMA transacción se actualizan las tablas de
+  agregados `standings` y `head_to_head`, así las tablas de posiciones,
+  promedios y cruces son lecturas indexadas y no recorren los partidos.
+- save() acepta muchos partidos juntos (executemany, una transacción).
+- Cada partido tiene una clave (el id del partido de la UI): guardarlo de
+  nuevo, p.ej. después de recuperarlo del journal, no agrega otra fila.
+- finished = 0 es un partido abandonado (reiniciado antes del final):
+  queda registrado pero no cuenta para las tablas.
+- Todo corre en UN hilo dueño de la conexión (ThreadPoolExecutor de un
+  worker): la UI recibe Futures y nunca espera al disco.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+import sqlite3, time
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at TEXT NOT NULL,
+    rules TEXT NOT NULL,
+    home TEXT NOT NULL, away TEXT NOT NULL,
+    home_score INTEGER NOT NULL, away_score INTEGER NOT NULL,
+    periods INTEGER NOT NULL,
+    home_fouls INTEGER NOT NULL, away_fouls INTEGER NOT NULL,
+    home_timeouts INTEGER NOT NULL, away_timeouts INTEGER NOT NULL,
+    finished INTEGER NOT NULL,
+    game_key TEXT
+);
+CREATE INDEX IF NOT EXISTS games_home ON games(home, played_at);
+CREATE INDEX IF NOT EXISTS games_away ON games(away, played_at);
+CREATE TABLE IF NOT EXISTS game_periods (
+    game_id INTEGER NOT NULL REFERENCES games(id),
+    period INTEGER NOT NULL,
+    home INTEGER NOT NULL, away INTEGER NOT NULL,
+    PRIMARY KEY (game_id, period)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS standings (
+    team TEXT PRIMARY KEY,
+    played INTEGER NOT NULL, wins INTEGER NOT NULL, losses INTEGER NOT NULL,
+    points_for INTEGER NOT NULL, points_against INTEGER NOT NULL,
+    fouls INTEGER NOT NULL, timeouts INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS standings_rank ON standings(wins DESC, points_for - points_against DESC);
+CREATE TABLE IF NOT EXISTS head_to_head (
+    team TEXT NOT NULL, opponent TEXT NOT NULL,
+    played INTEGER NOT NULL, wins INTEGER NOT NULL,
+    points_for INTEGER NOT NULL, points_against INTEGER NOT NULL,
+    PRIMARY KEY (team, opponent)
+) WITHOUT ROWID;
+"""
+
+UPSERT_STANDINGS = """
+INSERT INTO standings VALUES (?, 1, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(team) DO UPDATE SET
+    played = played + 1, wins = wins + excluded.wins, losses = losses + excluded.losses,
+    points_for = points_for + excluded.points_for,
+    points_against = points_against + excluded.points_against,
+    fouls = fouls + excluded.fouls, timeouts = timeouts + excluded.timeouts
+"""
+UPSERT_H2H = """
+INSERT INTO head_to_head VALUES (?, ?, 1, ?, ?, ?)
+ON CONFLICT(team, opponent) DO UPDATE SET
+    played = played + 1, wins = wins + excluded.wins,
+    points_for = points_for + excluded.points_for,
+    points_against = points_against + excluded.points_against
+"""
+
+
+@dataclass
+class GameRecord:
+    home: str
+    away: str
+    scores: tuple
+    periods: dict = field(default_factory=dict)   # período -> (local, visitante)
+    last_period: int = 1
+    fouls: tuple = (0, 0)
+    timeouts: tuple = (0, 0)
+    rules: str = ""
+    finished: bool = True                         # False: abandonado, no cuenta en las tablas
+    key: Optional[str] = None                     # id del partido; repetido no se vuelve a guardar
+    played_at: str = field(default_factory=lambda: time.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def record_from(state, plays=None, finished=True, key=None) -> GameRecord:
+    """
+    GameRecord del partido en `state`: nombres, marcador y período salen del
+    estado. Un plays.PlayLog aporta faltas, minutos y parciales; los
+    parciales sólo si suman el marcador (si no, el log no cubre el partido).
+    """
+    fouls, timeouts, periods = tuple(state.fouls), (0, 0), {}
+    if plays is not None:
+        from plays import FOUL, TIMEOUT
+        splits = plays.splits()
+        if [sum(p[t] for p in splits.values()) for t in (0, 1)] == list(state.scores):
+            periods = splits
+        kind, value, team = plays.cols["kind"], plays.cols["value"], plays.cols["team"]
+        f, t = [0, 0], [0, 0]
+        for i in range(plays.n):
+            if kind[i] == FOUL:
+                f[team[i]] += value[i]
+            elif kind[i] == TIMEOUT:
+                t[team[i]] += value[i]
+        fouls, timeouts = tuple(f), tuple(t)
+    return GameRecord(state.team_names[0], state.team_names[1], tuple(state.scores), periods,
+                      state.period, fouls, timeouts, state.rules.name, finished, key)
+
+
+class Archive:
+    def __init__(self, path):
+        self.path = path
+        self._db = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="archive")
+
+    def _conn(self):
+        # sólo se usa desde el hilo del pool
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.executescript(SCHEMA)
+            if "game_key" not in {row[1] for row in self._db.execute("PRAGMA table_info(games)")}:
+                self._db.execute("ALTER TABLE games ADD COLUMN game_key TEXT")  # archivos viejos
+            self._db.execute("CREATE UNIQUE INDEX IF NOT EXISTS games_key ON games(game_key)")
+        return self._db
+
+    # ---------- Escritura ----------
+    def save(self, *records):
+        """Guarda los partidos en una transacción. Future con sus ids (None: ya estaba guardado)."""
+        return self._pool.submit(self._save, records)
+
+    def _save(self, records):
+        db = self._conn()
+        ids, new = [], []
+        with db:  # una transacción para todo el lote
+            for r in records:
+                cur = db.execute(
+                    "INSERT OR IGNORE INTO games (played_at, rules, home, away, home_score, away_score,"
+                    " periods, home_fouls, away_fouls, home_timeouts, away_timeouts, finished, game_key)"
+                    " VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                    (r.played_at, r.rules, r.home, r.away, *r.scores, r.last_period,
+                     *r.fouls, *r.timeouts, int(r.finished), r.key))
+                ids.append(cur.lastrowid if cur.rowcount else None)
+                if cur.rowcount:
+                    new.append((cur.lastrowid, r))
+            db.executemany("INSERT INTO game_periods VALUES (?,?,?,?)",
+                           [(gid, p, h, a) for gid, r in new for p, (h, a) in sorted(r.periods.items())])
+            done = [r for _, r in new if r.finished]
+            db.executemany(UPSERT_STANDINGS, [row for r in done for row in _standing_rows(r)])
+            db.executemany(UPSERT_H2H, [row for r in done for row in _h2h_rows(r)])
+        return ids
+
+    # ---------- Consultas (sobre los agregados) ----------
+    def standings(self, limit=50):
+        """Future -> [(equipo, PJ, G, P, PF, PC, promedio de puntos)]"""
+        return self._pool.submit(self._query,
+            "SELECT team, played, wins, losses, points_for, points_against,"
+            " round(1.0 * points_for / played, 1) FROM standings"
+            " ORDER BY wins DESC, points_for - points_against DESC LIMIT ?", (limit,))
+
+    def head_to_head(self, team, opponent):
+        """Future -> (PJ, G, PF, PC) de `team` contra `opponent`, o None."""
+        return self._pool.submit(self._query_one,
+            "SELECT played, wins, points_for, points_against FROM head_to_head"
+            " WHERE team = ? AND opponent = ?", (team, opponent))
+
+    def averages(self, team):
+        """Future -> (puntos a favor, en contra, faltas, minutos) por partido, o None."""
+        return self._pool.submit(self._query_one,
+            "SELECT 1.0 * points_for / played, 1.0 * points_against / played,"
+            " 1.0 * fouls / played, 1.0 * timeouts / played FROM standings WHERE team = ?", (team,))
+
+    def _query(self, sql, args):
+        return self._conn().execute(sql, args).fetchall()
+
+    def _query_one(self, sql, args):
+        return self._conn().execute(sql, args).fetchone()
+
+    def close(self):
+        def _close():
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        self._pool.submit(_close).result()
+        self._pool.shutdown()
+
+
+def _standing_rows(r):
+    (hs, as_), (hf, af), (ht, at) = r.scores, r.fouls, r.timeouts
+    return ((r.home, int(hs > as_), int(hs < as_), hs, as_, hf, ht),
+            (r.away, int(as_ > hs), int(as_ < hs), as_, hs, af, at))
+
+
+def _h2h_rows(r):
+    hs, as_ = r.scores
+    return ((r.home, r.away, int(hs > as_), hs, as_),
+            (r.away, r.home, int(as_ > hs), as_, hs))
@@ -0,0 +1,125 @@
+# assets.py
+"""
+Recursos con caché en disco para arrancar rápido:
+- font_available(): la respuesta se recuerda entre arranques; la de "no está"
+  sólo mientras no cambien las carpetas de fuentes (y a lo sumo FONT_TTL_S)
+- load_image(): las imágenes se guardan ya redimensionadas (PNG que Tk lee
+  solo), así en un arranque normal no se importa PIL ni se usa LANCZOS.
+- ImageCache: LRU en memoria de PhotoImage por (imagen, tamaño), acotada en
+  bytes; cambiar de equipo o de tamaño de ventana no vuelve a decodificar.
+"""
+from collections import OrderedDict
+import json, os, sys, time, zlib
+import tkinter as tk
+
+FONT_TTL_S = 7 * 24 * 3600  # una fuente que falta se vuelve a buscar al menos una vez por semana
+
+def resource_path(relative_path):
+    """ Devuelve ruta válida tanto en .py como en .exe """
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, relative_path)
+    return os.path.join(os.path.abspath("."), relative_path)
+
+def cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "marcador")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def read_json(path):
+    """Contenido de un JSON de datos/caché; {} si no existe o está roto."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_json(path, data):
+    """Escritura atómica (archivo temporal + replace): nunca queda a medias."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def _font_dirs():
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        return [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+                os.path.join(os.environ.get("LOCALAPPDATA", home), "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/Library/Fonts", "/System/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts",
+            os.path.join(home, ".local", "share", "fonts"), os.path.join(home, ".fonts")]
+
+def _fonts_stamp():
+    """mtime más nuevo de las carpetas de fuentes: instalar una lo cambia."""
+    stamp = 0
+    for d in _font_dirs():
+        try:
+            stamp = max(stamp, os.stat(d).st_mtime_ns)
+        except OSError:
+            pass
+    return stamp
+
+def font_available(root, family) -> bool:
+    """
+    Como `family in tkfont.families()`, pero la respuesta se recuerda entre
+    arranques. "No está" vale mientras no cambien las carpetas de fuentes y
+    por FONT_TTL_S: una fuente instalada después se ve igual.
+    """
+    path = os.path.join(cache_dir(), "fonts.json")
+    cache = read_json(path)
+    hit = cache.get(family)
+    if hit is True:
+        return True
+    stamp = _fonts_stamp()
+    if (isinstance(hit, dict) and hit.get("stamp") == stamp
+            and time.time() - hit.get("checked", 0) < FONT_TTL_S):
+        return False
+    import tkinter.font as tkfont
+    found = family in tkfont.families(root)
+    cache[family] = True if found else {"stamp": stamp, "checked": time.time()}
+    write_json(path, cache)
+    return found
+
+def load_image(root, relative_path, size):
+    """PhotoImage de `relative_path` redimensionada a `size`, con caché en disco."""
+    src = resource_path(relative_path)
+    with open(src, "rb") as f:
+        crc = zlib.crc32(f.read())  # en el .exe la fecha del archivo cambia en cada arranque
+    name = os.path.splitext(os.path.basename(src))[0]
+    cached = os.path.join(cache_dir(), f"{name}-{size[0]}x{size[1]}-{crc:08x}.png")
+    if not os.path.exists(cached):
+        from PIL import Image
+        img = Image.open(src).resize(size, Image.LANCZOS)
+        img.save(cached + ".tmp", format="PNG")
+        os.replace(cached + ".tmp", cached)
+    return tk.PhotoImage(master=root, file=cached)
+
+class ImageCache:
+    """
+    PhotoImage por (ruta, tamaño) con desalojo LRU cuando los píxeles en
+    memoria pasan `max_bytes`. Un fallo va a load_image (caché en disco).
+    """
+    def __init__(self, root, max_bytes=32 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._images = OrderedDict()   # (ruta, tamaño) -> PhotoImage
+        self.hits = self.misses = 0
+
+    def get(self, relative_path, size):
+        key = (relative_path, tuple(size))
+        img = self._images.get(key)
+        if img is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return img
+        self.misses += 1
+        img = self._images[key] = load_image(self.root, relative_path, key[1])
+        self.bytes += key[1][0] * key[1][1] * 4
+        while self.bytes > self.max_bytes and len(self._images) > 1:
+            (_, (w, h)), _ = self._images.popitem(last=False)
+            self.bytes -= w * h * 4
+        return img
@@ -0,0 +1,61 @@
+# audio.py
+import time
+from collections import deque
+import pygame
+
+# cue -> (archivo, repeticiones, silencio entre repeticiones en ms)
+CUES = {
+    "shot10": ("assets/beep.wav",  1, 0),
+    "shot5":  ("assets/beep.wav",  2, 500),
+    "shot0":  ("assets/beep1.wav", 1, 0),      # bocina de 24s
+    "end":    ("assets/beep1.wav", 2, 1000),   # bocina de fin de período
+}
+
+class AudioEngine:
+    """
+    Avisos sonoros precargados.
+    - Todos los patrones (varios beeps, bocinas) se arman al iniciar como UN
+      buffer ya mezclado: los silencios van dentro del audio, así la separación
+      es exacta a la muestra y no depende de after() ni del loop de Tk.
+    - Se tocan en un canal reservado del mixer; play() no bloquea y se puede
+      llamar desde cualquier hilo (SDL mezcla en su propio hilo de audio).
+    - latency_stats(): evento -> inicio de audio (llamada + buffer del mixer).
+    """
+    def __init__(self, resource_path, frequency=44100, buffer=256):
+        pygame.mixer.pre_init(frequency, -16, 2, buffer)
+        pygame.mixer.init()
+        self.freq, fmt, self.channels = pygame.mixer.get_init()
+        self.frame_bytes = abs(fmt) // 8 * self.channels
+        self.buffer_ns = buffer * 1_000_000_000 // self.freq
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+        self.latencies_ns = deque(maxlen=256)
+
+        raw = {}
+        self.sounds = {}
+        for cue, (path, times, gap_ms) in CUES.items():
+            if path not in raw:
+                raw[path] = pygame.mixer.Sound(resource_path(path)).get_raw()
+            self.sounds[cue] = pygame.mixer.Sound(buffer=self._pattern(raw[path], times, gap_ms))
+            self.sounds[cue].set_volume(1.0)
+
+    def _pattern(self, clip: bytes, times: int, gap_ms: int) -> bytes:
+        # cada repetición empieza len(clip) + gap después de la anterior: el
+        # silencio va siempre, aunque el clip dure más que la separación
+        pad = bytes(int(self.freq * gap_ms / 1000) * self.frame_bytes)
+        return (clip + pad) * (times - 1) + clip
+
+    def play(self, cue, event_ns=None):
+        """Toca `cue` ya; `event_ns` (perf_counter_ns del evento) para medir latencia."""
+        t = time.perf_counter_ns()
+        self.channel.play(self.sounds[cue])
+        done = time.perf_counter_ns()
+        self.latencies_ns.append(done - (event_ns or t) + self.buffer_ns)
+
+    def latency_stats(self) -> dict:
+        lat = sorted(self.latencies_ns)
+        if not lat:
+            return {}
+        pick = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] / 1e6
+        return {"n": len(lat), "p50_ms": pick(0.5), "p99_ms": pick(0.99),
+                "buffer_ms": self.buffer_ns / 1e6}
@@ -0,0 +1,1004 @@
+# bench.py
+"""
+Benchmarks sin Tk. Uso:
+    python bench.py            # corre todos
+    python bench.py sim        # sólo los nombrados
+"""
+import sys, time
+
+BENCHES = {}
+
+def bench(name):
+    def deco(fn):
+        BENCHES[name] = fn
+        return fn
+    return deco
+
+
+@bench("sim")
+def bench_sim(games=20):
+    """Partidos completos (4 períodos + alargue) con comandos al azar y jitter."""
+    from sim import run_game
+    ticks = commands = 0
+    t0 = time.perf_counter()
+    for seed in range(games):
+        rep = run_game(seed=seed, jitter_ms=150 if seed % 2 else 0)
+        ticks += rep.ticks
+        commands += rep.commands
+    dt = time.perf_counter() - t0
+    print(f"  {games} partidos en {dt:.2f} s ({dt / games * 1000:.0f} ms/partido), invariantes OK")
+    print(f"  {ticks / dt:,.0f} ticks/s, {commands / dt:,.0f} comandos/s")
+
+
+@bench("broadcast")
+def bench_broadcast(clients=24, frames=300):
+    """Latencia de fan-out de deltas UDP a muchas pantallas espejo locales."""
+    import asyncio, json, threading
+    from broadcast import Publisher, HELLO, _Protocol
+    from logic import GameState
+
+    pub = Publisher(host="127.0.0.1", port=0).start()
+    sent_at, recv = {}, []
+    loop = asyncio.new_event_loop()
+
+    def on_data(data, addr):
+        recv.append((json.loads(data)["s"], time.perf_counter_ns()))
+
+    async def setup():
+        for _ in range(clients):
+            tr, _ = await loop.create_datagram_endpoint(
+                lambda: _Protocol(on_data), remote_addr=("127.0.0.1", pub.port))
+            tr.sendto(HELLO)
+    ready = threading.Event()
+    threading.Thread(target=lambda: (asyncio.set_event_loop(loop), loop.run_until_complete(setup()),
+                                     ready.set(), loop.run_forever()), daemon=True).start()
+    ready.wait()
+    while len(pub.clients) < clients:
+        time.sleep(0.01)
+
+    state = GameState()
+    for i in range(frames):
+        state.add_points(i % 2, 1)
+        t = time.perf_counter_ns()
+        if pub.publish(state):
+            sent_at[pub.seq] = t
+        time.sleep(0.002)
+    time.sleep(0.2)
+    loop.call_soon_threadsafe(loop.stop)
+    pub.stop()
+
+    lat = sorted((r - sent_at[s]) / 1e6 for s, r in recv if s in sent_at)
+    pct = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))]
+    print(f"  {clients} clientes, {len(sent_at)} mensajes, {len(lat)} entregas "
+          f"({len(lat) / (clients * len(sent_at)):.1%})")
+    print(f"  latencia publish->cliente: p50 {pct(0.5):.2f} ms, p99 {pct(0.99):.2f} ms, máx {lat[-1]:.2f} ms")
+
+
+@bench("courts")
+def bench_courts(sizes=(10, 50, 100, 200), minutes=10):
+    """Memoria y CPU por cancha con un solo scheduler (reloj virtual)."""
+    import heapq, random, tracemalloc
+    from collections import Counter
+    from courts import CourtServer
+    from sim import VirtualClock
+
+    for n in sizes:
+        clock = VirtualClock()
+        events = Counter()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        srv = CourtServer(now=clock, on_event=lambda i, evt: events.update((evt,)))
+        for i in range(n):
+            srv.add_court(f"Local {i}", f"Visita {i}")
+        mem = (tracemalloc.get_traced_memory()[0] - base) / n
+        tracemalloc.stop()
+
+        # Cada cancha recibe un comando cada ~15 s de juego (punto + reinicio de 24)
+        rnd = random.Random(n)
+        cmds = [(int(rnd.uniform(0, 15) * 1e9), i) for i in range(n)]
+        for i in range(n):
+            srv.toggle_game(i); srv.toggle_shot(i)
+        end = minutes * 60 * 1_000_000_000
+        wakeups = 0
+        t0 = time.process_time()
+        heapq.heapify(cmds)
+        while True:
+            due = srv.next_due()
+            nxt = cmds[0][0] if due is None else min(due, cmds[0][0])
+            if nxt > end:
+                break
+            clock.ns = nxt
+            wakeups += 1
+            srv.run_due()
+            while cmds and cmds[0][0] <= clock.ns:
+                _, i = heapq.heappop(cmds)
+                srv.add_points(i, rnd.randrange(2), 2)
+                srv.reset_shot_24(i)
+                heapq.heappush(cmds, (clock.ns + int(rnd.uniform(5, 25) * 1e9), i))
+        cpu = time.process_time() - t0
+        print(f"  {n:4d} canchas: {mem:6.0f} B/cancha, {cpu / n / (minutes * 60) * 1e6:6.2f} µs CPU "
+              f"por cancha y segundo de juego, {wakeups} despertares, eventos {dict(events)}")
+
+    # Mismo reglamento que GameState: largo de períodos, alargues y minutos
+    from logic import GameState
+    from rules import RULESETS
+    for rules in RULESETS.values():
+        clock = VirtualClock()
+        srv = CourtServer(now=clock, rules=rules)
+        court = srv.add_court()
+        st = GameState(now=clock, rules=rules)
+        st.apply_minutes()
+        for p in range(rules.periods + 1):
+            assert (court.time_str(), court.period_str(), court.minutes) == \
+                   (st.time_str(), st.period_str(), st.minutes), (rules.name, p)
+            srv.next_period(0)
+            st.next_period()
+    print(f"  reglamentos {', '.join(RULESETS)}: canchas y GameState coinciden")
+
+    # Modo servidor: un comando y una consulta por TCP local
+    import json, socket, threading
+    from courts import CourtService
+    srv = CourtServer()
+    srv.add_court()
+    service = CourtService(srv, port=0)
+    threading.Thread(target=service.serve_forever, daemon=True).start()
+    with socket.create_connection(service.server_address) as s:
+        f = s.makefile("rwb")
+        for msg in ({"court": 0, "op": "add_points", "args": [1, 3]}, {"court": 0, "op": "state"},
+                    {"court": 7, "op": "state"}):
+            f.write(json.dumps(msg).encode() + b"\n"); f.flush()
+            reply = json.loads(f.readline())
+        assert "error" in reply and srv.court(0).scores == [0, 3]
+    # una mesa que no lee (Wi-Fi caído sin FIN): se llena su cola y se la corta, sin frenar al scheduler
+    with socket.create_connection(service.server_address) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        while not service.clients:
+            time.sleep(0.001)
+        worst, sent = 0, 0
+        while service.clients and sent < 1_000_000:
+            t0 = time.perf_counter_ns()
+            with srv.lock:
+                service._on_event(0, "shot0")
+            worst = max(worst, time.perf_counter_ns() - t0)
+            sent += 1
+        assert not service.clients and worst < 50_000_000
+    service.shutdown(); service.server_close()
+    print(f"  servidor: comando, consulta y cancha inexistente OK; mesa que no lee cortada "
+          f"a los {sent} eventos (peor aviso {worst / 1e6:.2f} ms)")
+
+
+@bench("audio")
+def bench_audio(plays=200):
+    """Latencia evento -> inicio de audio en el canal reservado."""
+    try:
+        import pygame  # noqa: F401
+    except ImportError:
+        print("  pygame no está instalado, se omite")
+        return
+    import os
+    from audio import AudioEngine
+    eng = AudioEngine(lambda p: os.path.join(os.path.dirname(os.path.abspath(__file__)), p))
+    for i in range(plays):
+        eng.play(("shot10", "shot5", "shot0", "end")[i % 4], time.perf_counter_ns())
+    st = eng.latency_stats()
+    print(f"  {st['n']} avisos: p50 {st['p50_ms']:.2f} ms, p99 {st['p99_ms']:.2f} ms "
+          f"(incluye {st['buffer_ms']:.2f} ms de buffer del mixer)")
+
+
+def _scoreboard_or_none(**kw):
+    """Scoreboard real si hay display y dependencias; None si no se puede."""
+    try:
+        from ui import Scoreboard
+        app = Scoreboard(**kw)
+    except Exception as ex:  # sin display, sin pygame/PIL...
+        print(f"  no se puede abrir la UI aquí ({type(ex).__name__}: {ex}), se omite")
+        return None
+    app.update()
+    return app
+
+
+@bench("resize")
+def bench_resize(events=60):
+    """Relayout de fuentes al redimensionar: por evento (antes) vs. agrupado por frame (después)."""
+    app = _scoreboard_or_none()
+    if app is None:
+        return
+    sizes = [(int(app.base_w * (0.6 + 0.4 * i / events)), int(app.base_h * 0.9)) for i in range(events)]
+
+    # Antes: cada <Configure> recalculaba y reconfiguraba las cuatro fuentes
+    t0 = time.perf_counter()
+    for w, h in sizes:
+        factor = max(0.6, min(1.0, min(w / app.base_w, h / app.base_h)))
+        for fnt, base in app._fontsizes:
+            new_size = max(8, int(round(base * factor)))
+            if fnt.cget("size") != new_size:
+                fnt.configure(size=new_size)
+        app.update_idletasks()
+    before = (time.perf_counter() - t0) * 1000
+
+    # Después: los eventos sólo agendan; se aplica la tabla una vez por frame
+    class Ev:
+        widget = app
+    t0 = time.perf_counter()
+    for k, (w, h) in enumerate(sizes):
+        app.geometry(f"{w}x{h}")
+        app._on_resize(Ev)
+        if k % 4 == 3:  # ~4 eventos por frame durante un arrastre
+            app.update()
+    app.update()
+    after = (time.perf_counter() - t0) * 1000
+    st = app.resize_stats
+    print(f"  {events} eventos: antes {before:.1f} ms; después {after:.1f} ms "
+          f"({st['applied']} relayouts, último {st['relayout_ms'][-1] if st['relayout_ms'] else 0:.1f} ms)")
+    app.destroy()
+
+
+@bench("startup")
+def bench_startup(runs=5):
+    """Tiempo de import de ui.py en un proceso nuevo y último perfil de arranque guardado."""
+    import os, subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = "import time; t = time.perf_counter(); import ui; print((time.perf_counter() - t) * 1000)"
+    ms = sorted(float(subprocess.check_output([sys.executable, "-c", code], cwd=here))
+                for _ in range(runs))
+    print(f"  import ui: mediana {ms[len(ms) // 2]:.1f} ms ({runs} corridas)")
+    from assets import cache_dir
+    log = os.path.join(cache_dir(), "startup.log")
+    if os.path.exists(log):
+        with open(log, encoding="utf-8") as f:
+            print(f"  último arranque: {f.readlines()[-1].strip()}")
+
+
+@bench("backends")
+def bench_backends(frames=300):
+    """Costo por frame del último minuto a 10 Hz: layout de Labels vs. Canvas de siete segmentos."""
+    for backend in ("labels", "canvas"):
+        app = _scoreboard_or_none(backend=backend)
+        if app is None:
+            return
+        st = app.state
+        st.time_left = 60
+        st.running = True
+        app.update()
+        t0 = time.perf_counter()
+        for i in range(frames):
+            st.game_clock.set_ns(60_000_000_000 - i * 100_000_000)  # una décima por frame
+            if i % 25 == 0:
+                st.add_points(i % 2, 2)
+            app._refresh_all()
+            app.update_idletasks()
+        dt = (time.perf_counter() - t0) * 1000
+        print(f"  {backend:7s}: {dt / frames:.2f} ms/frame ({frames} frames)")
+        app.destroy()
+
+
+@bench("rules")
+def bench_rules(games=5):
+    """Reglamentos compilados: cuántas veces el tick consulta reglas vs. cuántos ticks hay."""
+    import logic
+    from rules import RULESETS
+    from sim import run_game
+    calls = [0]
+    original = logic.GameState.apply_minutes
+
+    def counted(self):
+        calls[0] += 1
+        return original(self)
+
+    logic.GameState.apply_minutes = counted
+    try:
+        for rules in RULESETS.values():
+            calls[0] = ticks = 0
+            t0 = time.perf_counter()
+            for seed in range(games):
+                ticks += run_game(seed=seed, rules=rules, check=False).ticks
+            dt = time.perf_counter() - t0
+            print(f"  {rules.name:11s}: {ticks:6d} ticks, reglas evaluadas {calls[0]:3d} veces "
+                  f"({calls[0] / games:.0f}/partido), {dt / ticks * 1e6:.2f} us/tick")
+    finally:
+        logic.GameState.apply_minutes = original
+
+
+@bench("stall")
+def bench_stall(stall_s=2.0):
+    """UI trabada 2 s: la bocina de 24s y el fin de período salen a tiempo desde el hilo de relojes."""
+    from sim import check_stall
+    heard = check_stall(stall_s)
+    print(f"  traba de {stall_s:.0f} s: shot0 a {heard['shot0']:.1f} ms (debía 1000), "
+          f"fin a {heard['end']:.1f} ms (debía 1500)")
+
+
+@bench("journal")
+def bench_journal(events=400, fsync_ms=20):
+    """Journal con un disco lento: las mutaciones (con state.lock) no esperan ningún fsync."""
+    from sim import check_journal
+    worst = check_journal(events, fsync_ms)
+    print(f"  {events} mutaciones con fsync de {fsync_ms} ms: peor {worst:.2f} ms con state.lock; recover() igual")
+
+
+@bench("plays")
+def bench_plays(games=200, events=600):
+    """Jugada por jugada: costo por evento y exportación de un torneo a CSV partido a partido."""
+    import os, random, tempfile, tracemalloc
+    from commands import KEYMAP
+    from logic import GameState
+    from plays import PlayLog, CsvSink, export
+    from sim import RANDOM_WEIGHTS, VirtualClock
+    keys = [k for k in RANDOM_WEIGHTS if k != "space"]
+    weights = [RANDOM_WEIGHTS[k] for k in keys]
+    spent = [0.0]
+
+    def tournament():
+        rnd = random.Random(0)
+        for g in range(games):
+            clock = VirtualClock()
+            st = GameState(now=clock)
+            log = PlayLog(now=clock)
+            log.attach(st)
+            t0 = time.perf_counter()
+            for k in rnd.choices(keys, weights, k=events):
+                log.player = rnd.randrange(4, 16)
+                KEYMAP[k].apply(st)
+                clock.advance(1_000_000_000)
+            spent[0] += time.perf_counter() - t0
+            yield f"g{g:04d}", log
+
+    path = os.path.join(tempfile.mkdtemp(), "plays.csv")
+    tracemalloc.start()
+    sink = CsvSink(path)
+    export(tournament(), sink)
+    sink.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rows = sum(1 for _ in open(path, encoding="utf-8")) - 1
+    print(f"  {games} partidos, {rows:,} filas: {spent[0] / (games * events) * 1e6:.1f} us/comando con planilla")
+    print(f"  pico de memoria exportando {peak / 1e6:.1f} MB ({os.path.getsize(path) / 1e6:.1f} MB de CSV)")
+
+
+@bench("metrics")
+def bench_metrics(n=200_000):
+    """Costo de instrumentar: observe() por llamada, % de un frame de 16,7 ms y un GET /metrics."""
+    import random, urllib.request
+    from logic import GameState
+    from metrics import Metrics, MetricsServer
+    m = Metrics()
+    st = GameState()
+    st.add_points(0, 2)
+    m.watch(st)
+    values = [random.Random(0).expovariate(0.5) for _ in range(1000)]
+    t0 = time.perf_counter()
+    for i in range(n):
+        m.render.observe(values[i % 1000])
+    per = (time.perf_counter() - t0) / n
+    # por frame: tick_late + render + (a veces) tecla y audio, más los perf_counter_ns
+    t0 = time.perf_counter()
+    for _ in range(n):
+        time.perf_counter_ns(); time.perf_counter_ns()
+    clock = (time.perf_counter() - t0) / n
+    frame = 4 * per + 3 * clock
+    print(f"  observe(): {per * 1e9:.0f} ns; por frame ~{frame * 1e6:.2f} us = {frame / (1 / 60) * 100:.3f}% de 16,7 ms")
+
+    srv = MetricsServer(m, port=0).start()
+    try:
+        t0 = time.perf_counter()
+        body = urllib.request.urlopen(f"http://127.0.0.1:{srv.port}/metrics", timeout=5).read().decode()
+        dt = (time.perf_counter() - t0) * 1000
+    finally:
+        srv.stop()
+    assert 'marcador_render_ms_bucket{le="+Inf"} %d' % n in body
+    assert 'marcador_mutations_total{op="add_points"} 1' in body
+    print(f"  GET /metrics: {len(body.splitlines())} líneas en {dt:.1f} ms")
+
+
+@bench("archive")
+def bench_archive(games=5000, teams=24, batch=500):
+    """Archivo SQLite: carga de miles de partidos por lotes y consultas de la tabla de posiciones."""
+    import os, random, sqlite3, tempfile
+    from archive import Archive, GameRecord
+    rnd = random.Random(0)
+    names = [f"Equipo {i:02d}" for i in range(teams)]
+    path = os.path.join(tempfile.mkdtemp(), "archive.db")
+    arc = Archive(path)
+    records = []
+    for _ in range(games):
+        home, away = rnd.sample(names, 2)
+        periods = {p: (rnd.randrange(10, 30), rnd.randrange(10, 30)) for p in range(1, 5)}
+        scores = tuple(map(sum, zip(*periods.values())))
+        if scores[0] == scores[1]:
+            periods[4] = (periods[4][0] + 1, periods[4][1])
+            scores = (scores[0] + 1, scores[1])
+        records.append(GameRecord(home, away, scores, periods, 4, (rnd.randrange(15, 25),) * 2,
+                                  (rnd.randrange(3, 6),) * 2, "liga"))
+    t0 = time.perf_counter()
+    for i in range(0, games, batch):
+        arc.save(*records[i:i + batch])
+    arc.standings().result()
+    dt_save = time.perf_counter() - t0
+
+    n = 200
+    t0 = time.perf_counter()
+    for _ in range(n):
+        table = arc.standings().result()
+    dt_q = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        arc.head_to_head(names[0], names[1]).result()
+        arc.averages(names[0]).result()
+    dt_h = (time.perf_counter() - t0) / n
+
+    # El mismo partido guardado dos veces (p.ej. recuperado del journal) deja una sola fila
+    from dataclasses import replace
+    again = replace(records[0], key="20250101-120000")
+    ids = arc.save(again, again).result() + arc.save(again).result()
+    assert ids[0] is not None and ids[1:] == [None, None]
+    table = arc.standings().result()
+    assert sum(r[1] for r in table) == 2 * (games + 1)
+    arc.close()
+
+    # Los agregados tienen que coincidir con recorrer los partidos
+    db = sqlite3.connect(path)
+    slow = dict(db.execute(
+        "SELECT team, sum(w) FROM (SELECT home AS team, home_score > away_score AS w FROM games"
+        " UNION ALL SELECT away, away_score > home_score FROM games) GROUP BY team"))
+    db.close()
+    assert all(slow[row[0]] == row[2] for row in table), "standings no coincide con games"
+    print(f"  {games} partidos en {dt_save * 1000:.0f} ms ({dt_save / games * 1e6:.0f} us/partido, lotes de {batch})")
+    print(f"  posiciones: {dt_q * 1000:.2f} ms; cruce + promedios: {dt_h * 1000:.2f} ms (agregados OK)")
+
+
+@bench("overlay")
+def bench_overlay(frames=3000):
+    """Overlay RGBA en memoria compartida: costo por cuadro a 10 Hz de reloj y con puntos cambiando."""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("  PIL no está instalado, se omite")
+        return
+    import os, tempfile
+    from logic import GameState, NS_PER_TENTH
+    from overlay import OverlayWriter, OverlayReader, REGIONS
+    from sim import VirtualClock
+    clock = VirtualClock()
+    st = GameState(now=clock)
+    st.apply_minutes()
+    st.toggle_game()
+    path = os.path.join(tempfile.mkdtemp(), "overlay.rgba")
+    w = OverlayWriter(st, path)
+    w.frame()
+    w.frame()  # los dos cuadros con todo dibujado (y los atlas armados)
+    reader = OverlayReader(path)
+    torn = 0
+    drawn0 = w.regions_drawn
+    t0 = time.perf_counter()
+    for i in range(frames):
+        clock.advance(NS_PER_TENTH // 6)   # 60 fps
+        if i % 90 == 0:
+            st.add_points(i % 2, 2)
+        w.frame()
+        token, _ = reader.latest()
+        torn += not reader.valid(token)
+    dt = time.perf_counter() - t0
+    w.stop()
+    print(f"  {dt / frames * 1000:.3f} ms/cuadro ({frames / dt:,.0f} fps posibles), "
+          f"{(w.regions_drawn - drawn0) / frames:.2f} regiones/cuadro de {len(REGIONS)}, lecturas rotas {torn}")
+
+
+@bench("replay")
+def bench_replay(seeks=2000):
+    """Graba un partido simulado y lo reconstruye en instantes al azar (checkpoint + bisect)."""
+    import os, random, tempfile
+    from logic import GROUPS
+    from replay import Recorder, Recording, Replayer
+    from sim import run_game
+    path = os.path.join(tempfile.mkdtemp(), "replay.bin")
+    recs = []
+    t0 = time.perf_counter()
+    rep = run_game(seed=3, attach=lambda st: recs.append(Recorder(st, path)))
+    t_game = time.perf_counter() - t0
+    recs[0].close()
+    rec = Recording.load(path)
+    print(f"  {rec.n} eventos grabados ({os.path.getsize(path) / 1024:.0f} KB, "
+          f"checkpoint cada {rec.every}); el partido con grabación tardó {t_game * 1000:.0f} ms")
+
+    # al final del partido el tablero repetido es el real
+    rp = Replayer(rec)
+    rp.seek(rp.length_ns)
+    st = rep.state
+    same = ("scores", "fouls", "minutes", "period", "names")
+    assert rp.state.capture(*same) == st.capture(*same)
+    assert rp.state.game_clock.remaining_ns() == st.game_clock.remaining_ns()
+
+    # saltos al azar contra una reconstrucción desde el primer evento
+    rnd = random.Random(0)
+    worst, t_total = 0.0, 0.0
+    for k in range(seeks):
+        pos = rnd.randrange(rp.length_ns)
+        t0 = time.perf_counter()
+        rp.seek(pos)
+        dt = time.perf_counter() - t0
+        t_total += dt
+        worst = max(worst, dt)
+        if k % 100 == 0:
+            ref = Replayer(rec)
+            for j in range(rp.i + 1):
+                ref._apply(j)
+            ref.clock.ns = rp.clock.ns
+            assert ref.state.capture(*GROUPS) == rp.state.capture(*GROUPS)
+            assert ref.state.time_str() == rp.state.time_str()
+    print(f"  {seeks} saltos: {t_total / seeks * 1e6:.0f} us promedio, peor {worst * 1000:.2f} ms, "
+          f"{rp.restored / seeks:.1f} restauraciones/salto")
+    p = max(rec.by_period)
+    rp.seek_game(p - 1, 4 * 60 + 12)
+    print(f"  período {p - 1} 04:12 -> tablero {rp.state.time_str()} "
+          f"{rp.state.scores[0]}-{rp.state.scores[1]}")
+    os.remove(path)
+
+
+@bench("animation")
+def bench_animation(targets=200, frames=3000):
+    """Línea de tiempo sin Tk: relanzar no apila ni desfasa, y el frame cuesta O(activas)."""
+    from animation import Timeline, Blink, Pulse, Fade, PERIOD_END
+    from sim import VirtualClock
+    clock = VirtualClock()
+    tl = Timeline(now=clock)
+
+    # relanzar el parpadeo a mitad de camino: arranca de cero, una sola animación
+    tl.play("time", PERIOD_END)
+    clock.advance(3 * 250_000_000 + 1)
+    tl.play("time", PERIOD_END)
+    assert len(tl.active) == 1 and tl.frame() == {"time": PERIOD_END.on}
+    seen = []
+    while tl.active:
+        clock.advance(33_000_000)
+        seen += tl.frame().values()
+    assert seen[-1] == PERIOD_END.on and len(seen) == PERIOD_END.times
+    assert not tl.frame()
+
+    anims = (Blink(), Pulse(), Fade(duration_ms=60_000))
+    for k in range(targets):
+        tl.play(k, anims[k % 3])
+    changed = 0
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        clock.advance(33_000_000)
+        changed += len(tl.frame())
+    dt = time.perf_counter() - t0
+    print(f"  relanzar a mitad de camino: 1 animación, {len(seen)} cambios de color, termina en {seen[-1]}")
+    print(f"  {targets} animaciones: {dt / frames * 1e6:.0f} us/frame "
+          f"({dt / frames / targets * 1e9:.0f} ns por animación), {changed / frames:.1f} cambios/frame")
+
+
+@bench("teams")
+def bench_teams(teams=800, queries=2000):
+    """Autocompletado sobre cientos de perfiles: armado del índice y búsquedas difusas."""
+    import os, random, tempfile
+    from teams import Team, TeamStore
+    rnd = random.Random(0)
+    first = ["Club", "Atlético", "Unión", "Sportivo", "Deportivo", "Racing", "Juventud", "Estudiantes"]
+    last = ["San Martín", "Belgrano", "Olimpo", "Peñarol", "Quilmes", "Regatas", "Ferro", "Obras",
+            "Boca Juniors", "Independiente", "Gimnasia", "Argentino", "Central", "Talleres"]
+    path = os.path.join(tempfile.mkdtemp(), "teams.json")
+    store = TeamStore(path)
+    for k in range(teams):
+        store.add(Team(f"{rnd.choice(first)} {rnd.choice(last)} {k}", short=f"T{k}"))
+    store.save()
+    t0 = time.perf_counter()
+    store = TeamStore(path)
+    t_load = time.perf_counter() - t0
+    assert store.search("union")[0].startswith("Unión")
+    assert any(n.startswith("Club Peñarol") for n in store.search("club penarol"))
+    assert store.search("bjuniors")  # iniciales / subsecuencia
+    typed = [t.name[:rnd.randint(1, 10)] for t in rnd.choices(list(store.teams.values()), k=queries)]
+    t0 = time.perf_counter()
+    for q in typed:
+        store.search(q)
+    dt = time.perf_counter() - t0
+    print(f"  {teams} equipos: carga + índice {t_load * 1000:.1f} ms, "
+          f"búsqueda {dt / queries * 1e6:.0f} us promedio (por tecla)")
+    os.remove(path)
+
+
+@bench("remote")
+def bench_remote(controllers=10, per_client=300):
+    """10 tablets a la vez por TCP local: toque -> estado (p99) y compensación de un "parar" tardío."""
+    import asyncio, random
+    from commands import CommandQueue
+    from logic import GameState
+    from remote import RemoteClient, RemoteServer
+    state = GameState()
+    state.apply_minutes()
+    srv = RemoteServer(state, CommandQueue(), host="127.0.0.1", port=0, ping_s=0.05).start()
+    ops = [("add_points", 0, 1), ("add_points", 1, 2), ("add_fouls", 0, 1), ("add_fouls", 0, -1),
+           ("reset_shot_24",), ("reset_shot_14",), ("add_points", 1, -1)]
+
+    async def tablet(seed):
+        rnd = random.Random(seed)
+        c = await RemoteClient("127.0.0.1", srv.port).connect()
+        for _ in range(per_client):
+            for _ in range(rnd.choice((1, 1, 1, 4))):  # a veces ráfagas
+                c.send(*rnd.choice(ops))
+            await asyncio.sleep(rnd.uniform(0, 0.004))
+        while len(c.acked) < per_client and len(c.acked) < c.next_id:
+            await asyncio.sleep(0.01)
+        await c.close()
+        return [c.acked[i] - c.sent[i] for i in c.acked]
+
+    async def late_stop(skew_ns=5_000_000_000, delay_s=0.12):
+        # reloj de la tablet corrido 5 s; el "parar" llega 120 ms después del toque
+        c = await RemoteClient("127.0.0.1", srv.port, now=lambda: time.monotonic_ns() + skew_ns).connect()
+        await asyncio.sleep(0.3)  # unos ping/pong para estimar el offset
+        state.toggle_game()
+        await asyncio.sleep(0.2)
+        t_press = c.now()
+        expected = state.game_clock.remaining_ns()
+        await asyncio.sleep(delay_s)
+        c.send("toggle_game", t=t_press)
+        while not c.acked:
+            await asyncio.sleep(0.005)
+        await c.close()
+        return state.game_clock.remaining_ns() - expected
+
+    async def main():
+        t0 = time.perf_counter()
+        rtts = sum(await asyncio.gather(*(tablet(k) for k in range(controllers))), [])
+        return rtts, time.perf_counter() - t0, await late_stop()
+
+    rtts, dt, err_ns = asyncio.run(main())
+    srv.stop()
+    lat = sorted(srv.latency_ns)
+    q = lambda xs, p: xs[min(len(xs) - 1, int(p * len(xs)))] / 1e6
+    rtts.sort()
+    print(f"  {controllers} tablets, {srv.applied} comandos en {dt:.2f} s, "
+          f"{srv.batches} actualizaciones ({srv.applied / srv.batches:.1f} comandos por ráfaga)")
+    print(f"  toque -> estado: p50 {q(lat, 0.5):.2f} ms, p99 {q(lat, 0.99):.2f} ms; "
+          f"ida y vuelta con ack p99 {q(rtts, 0.99):.2f} ms")
+    print(f"  'parar' que llegó 120 ms tarde con reloj corrido 5 s: error {err_ns / 1e6:+.2f} ms")
+    assert abs(err_ns) < 20_000_000
+
+
+@bench("feed")
+def bench_feed(seconds=2.0, rate_hz=500):
+    """Ráfaga de mutaciones con el reloj corriendo: una escritura por archivo por frame, nunca a medias."""
+    import json, shutil, tempfile, threading
+    import xml.etree.ElementTree as ET
+    from feed import FeedWriter, FRAME_MS
+    from logic import GameState
+    st = GameState()
+    st.apply_minutes()
+    st.toggle_game()
+    d = tempfile.mkdtemp()
+    fw = FeedWriter(st, d).start()
+    reads, bad = [0], [0]
+    done = threading.Event()
+
+    def reader():  # como la gráfica: lee y parsea sin parar
+        while not done.is_set():
+            for fmt, parse in (("json", json.loads), ("xml", ET.fromstring)):
+                try:
+                    with open(fw.paths[fmt], encoding="utf-8") as f:
+                        parse(f.read())
+                    reads[0] += 1
+                except FileNotFoundError:
+                    pass
+                except (ValueError, ET.ParseError):
+                    bad[0] += 1
+
+    th = threading.Thread(target=reader)
+    th.start()
+    t0 = time.perf_counter()
+    n = 0
+    while time.perf_counter() - t0 < seconds:
+        st.add_points(n % 2, 1 if n % 3 else -1)
+        n += 1
+        time.sleep(1 / rate_hz)
+    dt = time.perf_counter() - t0
+    done.set()
+    th.join()
+    fw.stop()
+    frames = dt * 1000 / FRAME_MS
+    print(f"  {n} mutaciones en {dt:.1f} s -> {fw.writes['json']} escrituras por archivo "
+          f"(tope {frames:.0f} frames), {fw.coalesced} juntadas, última tanda {fw.write_ms:.2f} ms")
+    print(f"  {reads[0]} lecturas del lector, {bad[0]} a medio escribir")
+    assert not bad[0] and fw.writes["json"] <= frames + 2
+    shutil.rmtree(d)
+
+
+@bench("frames")
+def bench_frames(minutes=1):
+    """Frames de la UI por minuto y CPU por modo (sin Tk), contra el muestreo fijo de 100 ms."""
+    from logic import GameState, NS_PER_S
+    from render import FieldRenderer
+    from sim import VirtualClock
+    from timing import frame_delay_ms
+
+    def board(clock):
+        st = GameState(now=clock)
+        st.apply_minutes()
+        r = FieldRenderer()
+        for f, get in (("time", GameState.time_str), ("shot", GameState.shot_str),
+                       ("scores", lambda s: tuple(s.scores)), ("period", GameState.period_str)):
+            r.bind(f, get, lambda v: None)
+        return st, r
+
+    def setup(mode, st):
+        if mode in ("1hz", "10hz", "shot<5"):
+            st.toggle_game()
+        if mode == "10hz":
+            st.time_left = 55
+        if mode == "shot<5":
+            st.shot_time = 4
+        if mode != "idle" and not st.shot_running:
+            st.toggle_shot()
+
+    span = minutes * 60 * NS_PER_S
+    print(f"  {'modo':8s} {'frames/min':>10s} {'CPU ms/min':>10s}   fijo 100 ms: frames/min  CPU ms/min")
+    for mode in ("idle", "1hz", "10hz", "shot<5"):
+        rows = []
+        for adaptive in (True, False):
+            clock = VirtualClock()
+            st, r = board(clock)
+            setup(mode, st)
+            frames, missed, shown = 0, 0, st.time_str()
+            cpu0 = time.process_time()
+            while clock.ns < span:
+                _, ms = frame_delay_ms(st) if adaptive else ("", 100)
+                if ms is None:
+                    break  # dormido hasta una tecla: el resto del minuto no cuesta nada
+                clock.advance(ms * 1_000_000)
+                st.poll_game(); st.poll_shot()
+                if mode == "shot<5" and not st.shot_running:
+                    st.reset_shot_14(); st.shot_time = 4  # otra posesión que se va
+                if mode != "shot<5" and st.shot_running and st.shot_clock.remaining_ns() < 11 * NS_PER_S:
+                    st.reset_shot_24()  # sin entrar en los últimos 5 s
+                st.sample_clocks()
+                r.render(st)
+                frames += 1
+                # alineado: cada frame del reloj corriendo llega con el texto ya cambiado
+                if adaptive and mode in ("1hz", "10hz"):
+                    missed += st.time_str() == shown
+                shown = st.time_str()
+            rows.append((frames / minutes, (time.process_time() - cpu0) * 1000 / minutes))
+        (fa, ca), (ff, cf) = rows
+        print(f"  {mode:8s} {fa:10.0f} {ca:10.2f}   {ff:21.0f} {cf:11.2f}")
+        if mode in ("1hz", "10hz"):
+            assert missed == 0, f"{mode}: {missed} frames sin cambio de reloj"
+
+
+@bench("displays")
+def bench_displays(frames=6000):
+    """Varias ventanas del mismo GameState: un RenderPlan compartido vs. un FieldRenderer por ventana."""
+    from logic import GameState
+    from render import BOARD, FieldRenderer, RenderPlan
+    from sim import VirtualClock
+
+    def play(clock, st, render):
+        # último minuto a 10 Hz con puntos y faltas de vez en cuando
+        st.time_left = 60
+        st.toggle_game()
+        cpu0 = time.perf_counter()
+        for i in range(frames):
+            clock.advance(100_000_000)
+            if st.time_left <= 1:
+                st.time_left = 60
+            if i % 25 == 0:
+                st.add_points(i % 2, 2)
+            if i % 90 == 0:
+                st.add_fouls(i % 2, 1)
+            st.sample_clocks()
+            render(st)
+        return (time.perf_counter() - cpu0) * 1e6 / frames
+
+    print(f"  {'ventanas':>8s} {'plan µs/frame':>14s} {'getters':>8s}   {'uno por ventana':>15s} {'getters':>8s}")
+    base = None
+    for n in (1, 2, 3, 6):
+        shown = [{} for _ in range(n)]   # lo que tendría cada widget (config() de mentira)
+
+        clock = VirtualClock()
+        st = GameState(now=clock)
+        plan = RenderPlan()
+        for seen in shown:
+            v = plan.view()
+            for key, _, _ in BOARD:
+                v.bind(key, lambda val, seen=seen, key=key: seen.__setitem__(key, val))
+        us = play(clock, st, plan.render)
+        assert all(seen == shown[0] for seen in shown) and shown[0]["time"] == st.time_str()
+        st_plan = plan.stats()
+        assert all(v["updates"] + v["skipped"] == frames * len(BOARD) for v in st_plan["views"].values())
+
+        clock = VirtualClock()
+        st = GameState(now=clock)
+        evals = [0]
+        def counted(get):
+            def f(s):
+                evals[0] += 1
+                return get(s)
+            return f
+        renderers = []
+        for seen in shown:
+            r = FieldRenderer()
+            for key, field, get in BOARD:
+                r.bind(field, counted(get), lambda val, seen=seen, key=key: seen.__setitem__(key, val))
+            renderers.append(r)
+        us_old = play(clock, st, lambda s: [r.render(s) for r in renderers])
+
+        base = base or us
+        print(f"  {n:8d} {us:14.2f} {plan.evals:8d}   {us_old:15.2f} {evals[0]:8d}")
+        if n > 1:
+            print(f"  {'':8s} +{(us - base) / (n - 1):.2f} µs por ventana extra (sólo sus apply)")
+        assert plan.evals <= evals[0] // n + len(BOARD)
+
+
+@bench("led")
+def bench_led(steps=1500, step_ms=2):
+    """Tablero LED por pty y por TCP local: frames/s, bytes, latencia y un enlace lento que no frena el render."""
+    import os, select, socket, threading
+    from logic import GameState
+    from render import RenderPlan
+    from sim import VirtualClock
+    from led import BAUD, SEGMENTS, FrameReader, LedDriver, SerialLink, TcpLink, encode, segment
+
+    def drive(driver):
+        # el reloj virtual avanza una décima por render: el texto del reloj cambia siempre
+        clock = VirtualClock()
+        st = GameState(now=clock)
+        st.apply_minutes()
+        plan = RenderPlan()
+        driver.attach(plan)
+        st.time_left = 60    # último minuto: cambian las décimas
+        st.toggle_game()
+        worst = 0
+        t0 = time.perf_counter()
+        for i in range(steps):
+            clock.advance(100_000_000)
+            if st.time_left <= 1:
+                st.time_left = 60
+            if i % 40 == 0:
+                st.add_points(i % 2, 2)
+            if i % 150 == 0:
+                st.add_fouls(i % 2, 1)
+            st.sample_clocks()
+            r0 = time.perf_counter_ns()
+            plan.render(st)
+            worst = max(worst, time.perf_counter_ns() - r0)
+            time.sleep(step_ms / 1000)
+        dt = time.perf_counter() - t0
+        driver.stop()
+        return dt, worst / 1e6, {SEGMENTS[k][0]: segment(k, v) for k, v in plan.values().items() if k in SEGMENTS}
+
+    def receiver(read):
+        reader, shown, done = FrameReader(), {}, threading.Event()
+        def loop():
+            while True:
+                data = read()
+                if not data:
+                    break
+                for _, segs in reader.feed(data):
+                    shown.update(segs)
+            done.set()
+        threading.Thread(target=loop, daemon=True).start()
+        return reader, shown, done
+
+    def report(name, driver, dt, worst, reader, shown, expected):
+        lat = sorted(driver.latency_ns)
+        full = len(encode(0, expected)) * driver.changes
+        print(f"  {name:5s}: {driver.frames / dt:5.1f} frames/s (tope {1e9 / driver.interval_ns:.0f}), "
+              f"{driver.bytes / dt:6.0f} B/s, {driver.coalesced} cambios juntados; "
+              f"latencia p50 {lat[len(lat) // 2] / 1e6:.1f} ms p99 {lat[int(len(lat) * 0.99)] / 1e6:.1f} ms; "
+              f"render peor {worst:.2f} ms")
+        print(f"         {driver.bytes} bytes vs {full} con el tablero entero por cambio; "
+              f"{reader.frames} frames recibidos, {reader.bad} bytes malos")
+        assert shown == expected and not reader.bad and driver.frames / dt <= 1e9 / driver.interval_ns * 1.1
+
+    # pty: el "controlador" lee del lado maestro
+    master, slave = os.openpty()
+    alive = [True]
+    def read_pty():
+        while alive[0]:
+            if select.select([master], [], [], 0.1)[0]:
+                return os.read(master, 4096)
+        return b""
+    reader, shown, done = receiver(read_pty)
+    drv = LedDriver(lambda: SerialLink(os.ttyname(slave), BAUD), max_fps=20).start()
+    dt, worst, expected = drive(drv)
+    time.sleep(0.2)
+    alive[0] = False
+    done.wait(1)
+    report("pty", drv, dt, worst, reader, shown, expected)
+    os.close(master); os.close(slave)
+
+    # TCP local
+    srv = socket.create_server(("127.0.0.1", 0))
+    conns = []
+    def read_tcp():
+        if not conns:
+            conns.append(srv.accept()[0])
+        return conns[0].recv(4096)
+    reader, shown, done = receiver(read_tcp)
+    drv = LedDriver(lambda: TcpLink(*srv.getsockname()), max_fps=30).start()
+    dt, worst, expected = drive(drv)
+    done.wait(2)
+    report("tcp", drv, dt, worst, reader, shown, expected)
+    srv.close()
+
+    # Enlace lento (9600 baudios simulados): el render no se entera
+    class SlowLink:
+        def __init__(self):
+            self.shown = {}
+            self.reader = FrameReader()
+        def write(self, data):
+            time.sleep(len(data) * 10 / BAUD)
+            for _, segs in self.reader.feed(data):
+                self.shown.update(segs)
+        def close(self):
+            pass
+    link = SlowLink()
+    drv = LedDriver(lambda: link, max_fps=50).start()
+    dt, worst, expected = drive(drv)
+    print(f"  lento: {drv.frames / dt:.1f} frames/s, {drv.coalesced} cambios juntados, render peor {worst:.2f} ms")
+    assert link.shown == expected and worst < 5
+
+
+@bench("undo")
+def bench_undo(steps=20_000):
+    """Miles de comandos, después deshacer y rehacer todo: costo por paso y memoria por entrada."""
+    import random, tracemalloc
+    from commands import KEYMAP, CommandQueue, History, Undo, Redo
+    from logic import GameState
+    from sim import RANDOM_WEIGHTS, VirtualClock
+    rnd = random.Random(0)
+    keys = [k for k in RANDOM_WEIGHTS if k != "space"]
+    cmds = [KEYMAP[k] for k in rnd.choices(keys, [RANDOM_WEIGHTS[k] for k in keys], k=steps)]
+    UNDONE = ("scores", "fouls", "minutes", "period")  # los relojes no se rebobinan
+    st = GameState(now=VirtualClock())
+    q = CommandQueue(History(limit=steps))
+    start = st.capture(*UNDONE)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for c in cmds:
+        q.push(c)
+    q.drain(st)
+    t_run = time.perf_counter() - t0
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    end = st.capture(*UNDONE)
+
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        q.push(Undo())
+    q.drain(st)
+    t_undo = time.perf_counter() - t0
+    assert st.capture(*UNDONE) == start
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        q.push(Redo())
+    q.drain(st)
+    t_redo = time.perf_counter() - t0
+    assert st.capture(*UNDONE) == end
+
+    # deshacer un cambio de período equivocado devuelve también los relojes de ese período
+    clock = VirtualClock()
+    st = GameState(now=clock)
+    q = CommandQueue()
+    st.toggle_game(); st.toggle_shot()
+    clock.advance(30 * 1_000_000_000)
+    st.toggle_game(); st.toggle_shot()
+    shown = (st.time_str(), st.shot_str())
+    q.push(KEYMAP["<Return>"]); q.drain(st)
+    assert (st.time_str(), st.shot_str()) != shown
+    q.push(Undo()); q.drain(st)
+    assert st.period == 1 and (st.time_str(), st.shot_str()) == shown and not st.running
+
+    us = lambda t: t / steps * 1e6
+    print(f"  {steps} comandos: {us(t_run):.1f} us/comando, undo {us(t_undo):.1f} us, redo {us(t_redo):.1f} us")
+    print(f"  historial: {mem / steps:.0f} B/entrada, estado restaurado OK")
+
+
+def main(argv):
+    names = argv or list(BENCHES)
+    for name in names:
+        print(f"[{name}] {BENCHES[name].__doc__}")
+        BENCHES[name]()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,210 @@
+# broadcast.py
+"""
+Espejado del marcador por la red local (UDP).
+- Publisher: corre en el proceso que tiene el GameState. Cada frame publica
+  sólo los campos cuya versión cambió (delta) con un número de secuencia,
+  y cada `keyframe_s` el estado completo para quien se sume tarde.
+- Subscriber + MirrorState: lado de las pantallas espejo; reciben el
+  stream y exponen lo mismo que lee el render (scores, time_str(), ...).
+Protocolo: datagramas JSON compactos {"s": seq, "k": 1?, "f": {campo: valor}}.
+El cliente manda b"hello" para suscribirse (y como keepalive) y b"key"
+para pedir un keyframe si detecta un hueco en la secuencia.
+"""
+import asyncio, json, queue, threading, time
+
+from logic import FIELDS
+
+PORT   = 47474
+HELLO  = b"hello"
+KEYREQ = b"key"
+
+# Lo que viaja por cada campo: ya formateado, el espejo no necesita relojes
+READERS = {
+    "scores":  lambda s: list(s.scores),
+    "fouls":   lambda s: list(s.fouls),
+    "minutes": lambda s: list(s.minutes),
+    "time":    lambda s: s.time_str(),
+    "shot":    lambda s: s.shot_str(),
+    "period":  lambda s: s.period_str(),
+    "names":   lambda s: list(s.team_names),
+}
+
+def encode(seq, fields, keyframe=False) -> bytes:
+    msg = {"s": seq, "f": fields}
+    if keyframe:
+        msg["k"] = 1
+    return json.dumps(msg, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _run_loop(loop, ready, setup):
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(setup())
+    ready.set()
+    loop.run_forever()
+
+
+class _Protocol(asyncio.DatagramProtocol):
+    def __init__(self, on_datagram):
+        self.on_datagram = on_datagram
+
+    def datagram_received(self, data, addr):
+        self.on_datagram(data, addr)
+
+
+class Publisher:
+    """
+    publish(state) se llama desde el hilo de Tk; el envío a los clientes
+    ocurre en el loop asyncio de un hilo propio, así la red nunca frena la UI.
+    """
+    def __init__(self, host="0.0.0.0", port=PORT, keyframe_s=2.0, client_ttl_s=10.0):
+        self.host, self.port = host, port
+        self.keyframe_s = keyframe_s
+        self.client_ttl_s = client_ttl_s
+        self.seq = 0
+        self.clients = {}      # addr -> último hello (monotónico)
+        self.sent = 0          # datagramas enviados
+        self._seen = {}
+        self._want_key = True
+        self._last_key = 0.0
+        self.loop = asyncio.new_event_loop()
+        self.transport = None
+
+    def start(self):
+        async def setup():
+            self.transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: _Protocol(self._on_datagram), local_addr=(self.host, self.port))
+        ready = threading.Event()
+        threading.Thread(target=_run_loop, args=(self.loop, ready, setup),
+                         name="broadcast", daemon=True).start()
+        ready.wait()
+        self.port = self.transport.get_extra_info("sockname")[1]
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # ---------- Hilo de Tk ----------
+    def publish(self, state):
+        """Publica el delta de este frame; devuelve los bytes enviados o None."""
+        now = time.monotonic()
+        key = self._want_key or now - self._last_key >= self.keyframe_s
+        versions = state.versions
+        changed = [f for f in FIELDS if self._seen.get(f) != versions[f]]
+        if not changed and not key:
+            return None
+        self._seen.update(versions)
+        if key:
+            self._want_key = False
+            self._last_key = now
+        self.seq += 1
+        msg = encode(self.seq, {f: READERS[f](state) for f in (FIELDS if key else changed)}, key)
+        self.loop.call_soon_threadsafe(self._fanout, msg)
+        return msg
+
+    # ---------- Hilo de red ----------
+    def _on_datagram(self, data, addr):
+        if data == HELLO:
+            if addr not in self.clients:
+                self._want_key = True  # el que llega tarde se sincroniza en el próximo frame
+            self.clients[addr] = time.monotonic()
+        elif data == KEYREQ:
+            self._want_key = True
+
+    def _fanout(self, msg):
+        limit = time.monotonic() - self.client_ttl_s
+        for addr, seen in list(self.clients.items()):
+            if seen < limit:
+                del self.clients[addr]
+                continue
+            self.transport.sendto(msg, addr)
+            self.sent += 1
+
+
+class MirrorState:
+    """
+    Estado de sólo lectura armado desde el stream. Tiene lo mismo que
+    FieldRenderer lee de GameState (versions, scores, time_str(), ...).
+    """
+    def __init__(self):
+        self.team_names = ["Team 1", "Team 2"]
+        self.scores = [0, 0]
+        self.fouls = [0, 0]
+        self.minutes = [0, 0]
+        self._time, self._shot, self._period = "--:--", "--", ""
+        self.versions = dict.fromkeys(FIELDS, 0)
+        self.seq = 0
+        self.synced = False
+
+    def time_str(self):   return self._time
+    def shot_str(self):   return self._shot
+    def period_str(self): return self._period
+    def sample_clocks(self): pass
+
+    _ATTRS = {"scores": "scores", "fouls": "fouls", "minutes": "minutes", "names": "team_names",
+              "time": "_time", "shot": "_shot", "period": "_period"}
+
+    def apply(self, msg) -> bool:
+        """Aplica un mensaje; devuelve False si falta un delta y hay que pedir keyframe."""
+        if not msg.get("k") and (not self.synced or msg["s"] != self.seq + 1):
+            self.synced = False
+            return False
+        for f, value in msg["f"].items():
+            setattr(self, self._ATTRS[f], value)
+            self.versions[f] += 1
+        self.seq = msg["s"]
+        self.synced = True
+        return True
+
+
+class Subscriber:
+    """Cliente UDP: recibe en un hilo propio y deja los mensajes en una cola para el frame de Tk."""
+    def __init__(self, host, port=PORT, hello_s=3.0):
+        self.addr = (host, port)
+        self.hello_s = hello_s
+        self.queue = queue.SimpleQueue()
+        self.bad = 0    # datagramas descartados por JSON inválido
+        self.loop = asyncio.new_event_loop()
+        self.transport = None
+
+    def start(self):
+        async def setup():
+            self.transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: _Protocol(lambda data, addr: self.queue.put(data)),
+                remote_addr=self.addr)
+            self.loop.create_task(self._keepalive())
+        ready = threading.Event()
+        threading.Thread(target=_run_loop, args=(self.loop, ready, setup),
+                         name="mirror", daemon=True).start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _keepalive(self):
+        while True:
+            self.transport.sendto(HELLO)
+            await asyncio.sleep(self.hello_s)
+
+    def request_keyframe(self):
+        self.loop.call_soon_threadsafe(self.transport.sendto, KEYREQ)
+
+    def drain(self, state) -> int:
+        """Aplica en `state` lo recibido desde el último frame (hilo de Tk)."""
+        applied, lost = 0, False
+        while True:
+            try:
+                data = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                msg = json.loads(data)
+            except ValueError:  # datagrama cortado o corrupto: se salta, el seq pide keyframe
+                self.bad += 1
+                continue
+            if state.apply(msg):
+                applied += 1
+            else:
+                lost = True
+        if lost and not state.synced:
+            self.request_keyframe()
+        return applied
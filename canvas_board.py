@@ -0,0 +1,261 @@
+# canvas_board.py
+"""
+Backend de dibujo alternativo: todo el tablero en UN tk.Canvas.
+- Los números (puntos, tiempo, 24s, faltas, minutos) son sprites de
+  siete segmentos pre-renderizados con PIL por (carácter, alto, color).
+- Cambiar un número sólo hace itemconfig(image=...) en los dígitos que
+  cambiaron: no hay rasterizado de fuentes ni propagación de geometría.
+- Flechas de posesión y bandera de faltas son ítems del mismo canvas.
+Los objetos expuestos imitan lo que Scoreboard usa de los Label
+(config(text=..., fg=...), cget("fg")) y de ArrowIndicator.
+"""
+import tkinter as tk
+
+# Segmentos encendidos por carácter (a=arriba, sentido horario, g=medio)
+SEGMENTS = {
+    "0": "abcdef", "1": "bc", "2": "abdeg", "3": "abcdg", "4": "bcfg",
+    "5": "acdfg", "6": "acdefg", "7": "abc", "8": "abcdefg", "9": "abcdfg",
+    "-": "g", " ": "",
+}
+DIM = "#141414"          # segmento apagado (se ve como en un tablero LED)
+HEIGHT_STEP = 4          # los altos se redondean para no generar sprites de más
+RELAYOUT_MS = 16
+
+
+class SpriteCache:
+    """Sprites PhotoImage de siete segmentos, uno por (carácter, alto, color)."""
+    def __init__(self, master, bg="#000000"):
+        self.master = master
+        self.bg = bg
+        self._cache = {}
+        self.rendered = 0
+
+    def cell_width(self, height):
+        return int(height * 0.58)
+
+    def get(self, ch, height, color):
+        key = (ch, height, color)
+        img = self._cache.get(key)
+        if img is None:
+            img = self._cache[key] = self._render(ch, height, color)
+            self.rendered += 1
+        return img
+
+    def _render(self, ch, h, color):
+        from PIL import Image, ImageDraw, ImageTk
+        w = self.cell_width(h)
+        im = Image.new("RGB", (w, h), self.bg)
+        d = ImageDraw.Draw(im)
+        t = max(2, h // 9)          # grosor del segmento
+        m = max(1, t // 2)          # margen
+        x0, x1 = m, w - m - 1
+        y0, ym, y1 = m, h // 2, h - m - 1
+
+        def hseg(y):
+            return [(x0 + t // 2, y), (x0 + t, y - t // 2), (x1 - t, y - t // 2),
+                    (x1 - t // 2, y), (x1 - t, y + t // 2), (x0 + t, y + t // 2)]
+
+        def vseg(x, ya, yb):
+            return [(x, ya + t // 2), (x + t // 2, ya + t), (x + t // 2, yb - t),
+                    (x, yb - t // 2), (x - t // 2, yb - t), (x - t // 2, ya + t)]
+
+        if ch in (":", "."):
+            r = t // 2 + 1
+            cx = w // 2
+            dots = [(cx, int(h * 0.33)), (cx, int(h * 0.67))] if ch == ":" else [(cx, y1 - r)]
+            for cx, cy in dots:
+                d.rectangle([cx - r, cy - r, cx + r, cy + r], fill=color)
+        else:
+            polys = {
+                "a": hseg(y0 + t // 2), "g": hseg(ym), "d": hseg(y1 - t // 2),
+                "f": vseg(x0 + t // 2, y0, ym), "b": vseg(x1 - t // 2, y0, ym),
+                "e": vseg(x0 + t // 2, ym, y1), "c": vseg(x1 - t // 2, ym, y1),
+            }
+            lit = SEGMENTS.get(ch, "")
+            for seg, pts in polys.items():
+                d.polygon(pts, fill=color if seg in lit else DIM)
+        return ImageTk.PhotoImage(im, master=self.master)
+
+
+class DigitRow:
+    """Fila de dígitos alineada a la derecha; se comporta como un Label para el render."""
+    def __init__(self, board, cells, fg):
+        self.board = board
+        self.cells = cells
+        self.fg = fg
+        self.text = ""
+        self.height = 0
+        self._shown = [None] * cells          # (carácter, alto, color) de cada ítem
+        self.items = [board.create_image(0, 0, anchor="nw") for _ in range(cells)]
+
+    def place(self, cx, cy, height):
+        """Centra la fila en (cx, cy) con dígitos de `height` px."""
+        self.height = height
+        cw = self.board.sprites.cell_width(height)
+        x = cx - cw * self.cells / 2
+        for k, item in enumerate(self.items):
+            self.board.coords(item, x + k * cw, cy - height / 2)
+        self._draw()
+
+    def config(self, text=None, fg=None):
+        if text is not None:
+            self.text = str(text)
+        if fg is not None:
+            self.fg = fg
+        self._draw()
+
+    configure = config
+
+    def cget(self, key):
+        return {"text": self.text, "fg": self.fg}[key]
+
+    def _draw(self):
+        if not self.height:
+            return
+        chars = self.text[-self.cells:].rjust(self.cells)
+        for k, ch in enumerate(chars):
+            key = (ch, self.height, self.fg)
+            if self._shown[k] != key:        # sólo los dígitos que cambiaron
+                self._shown[k] = key
+                self.board.itemconfig(self.items[k], image=self.board.sprites.get(ch, self.height, self.fg))
+                self.board.item_updates += 1
+
+
+class TextItem:
+    """Texto del canvas con la interfaz mínima de un Label."""
+    def __init__(self, board, font, fg, text=""):
+        self.board = board
+        self.item = board.create_text(0, 0, text=text, font=font, fill=fg)
+
+    def place(self, x, y, anchor="center"):
+        self.board.coords(self.item, x, y)
+        self.board.itemconfig(self.item, anchor=anchor)
+
+    def config(self, text=None, fg=None):
+        kw = {}
+        if text is not None:
+            kw["text"] = text
+        if fg is not None:
+            kw["fill"] = fg
+        self.board.itemconfig(self.item, **kw)
+        self.board.item_updates += 1
+
+    configure = config
+
+    def cget(self, key):
+        return self.board.itemcget(self.item, {"fg": "fill"}.get(key, key))
+
+
+class CanvasArrow:
+    """Flecha de posesión dibujada en el canvas (misma API que ArrowIndicator)."""
+    def __init__(self, board, side, active="#00d4ff", inactive="#303030", command=None):
+        self.board = board
+        self.side = side
+        self.on = False
+        self.active, self.inactive = active, inactive
+        self.command = command
+        self.item = board.create_polygon(0, 0, 0, 0, 0, 0, fill=inactive, outline="")
+        board.tag_bind(self.item, "<Button-1>", self._click)
+
+    def place(self, cx, cy, size):
+        m = size / 2
+        if self.side == "left":
+            pts = [cx - m, cy, cx + m, cy - m, cx + m, cy + m]
+        else:
+            pts = [cx + m, cy, cx - m, cy - m, cx - m, cy + m]
+        self.board.coords(self.item, *pts)
+
+    def set_on(self, value: bool):
+        self.on = bool(value)
+        self.board.itemconfig(self.item, fill=self.active if self.on else self.inactive)
+
+    def toggle(self):
+        self.set_on(not self.on)
+
+    def is_on(self) -> bool:
+        return self.on
+
+    def _click(self, _evt=None):
+        self.toggle()
+        if self.command:
+            self.command(self, self.on)
+
+
+class CanvasFlag:
+    def __init__(self, board, image):
+        self.board = board
+        self.item = board.create_image(0, 0, image=image, anchor="w", state="hidden")
+
+    def place(self, x, y):
+        self.board.coords(self.item, x, y)
+
+    def set_visible(self, on):
+        self.board.itemconfig(self.item, state="normal" if on else "hidden")
+        self.board.item_updates += 1
+
+
+class CanvasBoard(tk.Canvas):
+    """
+    Tablero completo en un Canvas. Expone los mismos nombres que el
+    layout de Labels (score_left, time_lbl, arrow_left, ...).
+    """
+    def __init__(self, parent, fonts, flag_img, on_arrow_left=None, on_arrow_right=None):
+        super().__init__(parent, bg="#000", highlightthickness=0)
+        self.sprites = SpriteCache(self)
+        self.item_updates = 0
+        f_small, f_medium, f_red = fonts
+        green, gold, white = "#00ff7f", "#ffd700", "white"
+
+        self.arrow_left  = CanvasArrow(self, "left",  command=on_arrow_left)
+        self.arrow_right = CanvasArrow(self, "right", command=on_arrow_right)
+        self.score_left  = DigitRow(self, 3, green)
+        self.score_right = DigitRow(self, 3, green)
+        self.foul_left_value  = DigitRow(self, 1, green)
+        self.foul_right_value = DigitRow(self, 1, green)
+        self.minutes_left_value  = DigitRow(self, 1, green)
+        self.minutes_right_value = DigitRow(self, 1, green)
+        self.time_lbl = DigitRow(self, 5, white)
+        self.shot_lbl = DigitRow(self, 2, gold)
+        self.period_lbl  = TextItem(self, f_red, gold, "1º")
+        self.names_label = TextItem(self, f_medium, white)
+        self._captions = [TextItem(self, f_small, green, t)
+                          for t in ("Faltas:", "Minutos:", "Faltas:", "Minutos:")]
+        self.flag_left  = CanvasFlag(self, flag_img)
+        self.flag_right = CanvasFlag(self, flag_img)
+
+        self._relayout_job = None
+        self._size = None
+        self.bind("<Configure>", self._on_configure)
+
+    def _on_configure(self, event):
+        if self._relayout_job is None:
+            self._relayout_job = self.after(RELAYOUT_MS, self._relayout)
+
+    def _relayout(self):
+        self._relayout_job = None
+        w, h = max(self.winfo_width(), 1), max(self.winfo_height(), 1)
+        if (w, h) == self._size:
+            return
+        self._size = (w, h)
+        q = lambda px: max(HEIGHT_STEP, int(px) // HEIGHT_STEP * HEIGHT_STEP)
+
+        for side, x in (("left", w * 0.1), ("right", w * 0.9)):
+            arrow = self.arrow_left if side == "left" else self.arrow_right
+            arrow.place(x, h * 0.12, min(w * 0.12, h * 0.16))
+            score = self.score_left if side == "left" else self.score_right
+            score.place(x, h * 0.45, q(min(h * 0.25, w * 0.18 / 3 / 0.58)))
+
+        small = q(h * 0.07)
+        for k, (x, fouls, mins, flag) in enumerate((
+                (w * 0.1, self.foul_left_value, self.minutes_left_value, self.flag_left),
+                (w * 0.9, self.foul_right_value, self.minutes_right_value, self.flag_right))):
+            self._captions[2 * k].place(x - small * 0.6, h * 0.72, "e")
+            self._captions[2 * k + 1].place(x - small * 0.6, h * 0.84, "e")
+            fouls.place(x, h * 0.72, small)
+            mins.place(x, h * 0.84, small)
+            flag.place(x + small * 0.6, h * 0.72)
+
+        self.period_lbl.place(w * 0.5, h * 0.10)
+        self.time_lbl.place(w * 0.5, h * 0.36, q(min(h * 0.30, w * 0.55 / 5 / 0.58)))
+        self.names_label.place(w * 0.5, h * 0.62)
+        self.shot_lbl.place(w * 0.5, h * 0.82, q(h * 0.18))
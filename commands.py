@@ -0,0 +1,174 @@
+# commands.py
+"""
+Capa de comandos del operador.
+- Cada tecla arma un comando tipado (AddPoints, NextPeriod, ...).
+- CommandQueue junta los comandos y se vacía UNA vez por frame: una ráfaga
+  de teclas (auto-repeat) cuesta un solo render.
+- Los de relojes aceptan `at`: el instante en que se pidieron (comandos
+  remotos, ver remote.py); sin `at` se aplican al vaciar la cola.
+- History guarda, por comando, una copia chica e inmutable sólo de los
+  grupos que toca (GameState.capture): deshacer/rehacer es O(1) y cada paso
+  ocupa unas decenas de bytes, aunque haya miles. Sólo ResetShot guarda un
+  reloj: deshacer un minuto o un cambio de período no rebobina el tiempo.
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Command(ABC):
+    groups = ()  # grupos de GameState que guarda el historial; vacío = no se deshace
+
+    @abstractmethod
+    def apply(self, state):
+        """Aplica el comando a `state` (GameState)."""
+
+
+@dataclass(frozen=True)
+class AddPoints(Command):
+    team: int
+    pts: int
+    groups = ("scores",)
+
+    def apply(self, state):
+        state.add_points(self.team, self.pts)
+
+
+@dataclass(frozen=True)
+class AddFouls(Command):
+    team: int
+    count: int
+    groups = ("fouls",)
+
+    def apply(self, state):
+        state.add_fouls(self.team, self.count)
+
+
+@dataclass(frozen=True)
+class AddMinutes(Command):
+    team: int
+    count: int
+    groups = ("minutes",)  # el 24s en 60 queda aunque se deshaga
+
+    def apply(self, state):
+        state.add_minutes(self.team, self.count)
+
+
+@dataclass(frozen=True)
+class ResetShot(Command):
+    seconds: int
+    at: Optional[int] = None
+    groups = ("shot",)  # deshacer un reinicio equivocado devuelve el 24s que corría
+
+    def apply(self, state):
+        state.reset_shot_14(self.at) if self.seconds == 14 else state.reset_shot_24(self.at)
+
+
+@dataclass(frozen=True)
+class NextPeriod(Command):
+    # con los relojes: un Enter equivocado devuelve el tiempo que quedaba (el cambio los detiene siempre)
+    groups = ("period", "fouls", "minutes", "time", "shot")
+
+    def apply(self, state):
+        state.next_period()
+
+
+# Los relojes no se deshacen: el tiempo corrido no vuelve
+@dataclass(frozen=True)
+class ToggleClocks(Command):
+    at: Optional[int] = None
+
+    def apply(self, state):
+        state.toggle_game(self.at)
+        state.toggle_shot(self.at)
+
+
+@dataclass(frozen=True)
+class ToggleShot(Command):
+    at: Optional[int] = None
+
+    def apply(self, state):
+        state.toggle_shot(self.at)
+
+
+# Deshacer/rehacer actúan sobre el historial, no son comandos del estado
+@dataclass(frozen=True)
+class Undo:
+    def apply(self, history, state) -> bool:
+        return history.undo(state)
+
+
+@dataclass(frozen=True)
+class Redo:
+    def apply(self, history, state) -> bool:
+        return history.redo(state)
+
+
+# Teclas del operador (las mismas de siempre) -> comando
+KEYMAP = {
+    "<space>":   ToggleClocks(),
+    "<Return>":  NextPeriod(),
+    "z": AddPoints(0, +1), "x": AddPoints(0, -1),
+    "n": AddPoints(1, +1), "m": AddPoints(1, -1),
+    "a": AddFouls(0, +1),  "s": AddFouls(0, -1),
+    "k": AddFouls(1, +1),  "l": AddFouls(1, -1),
+    "q": AddMinutes(0, +1), "w": AddMinutes(0, -1),
+    "o": AddMinutes(1, +1), "p": AddMinutes(1, -1),
+    "2": ResetShot(14), "3": ResetShot(24),
+    "<Shift_L>": ToggleShot(),
+    "<Control-z>": Undo(), "<Control-y>": Redo(), "<Control-Z>": Redo(),
+}
+
+
+class History:
+    def __init__(self, limit=5000):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = deque(maxlen=limit)
+
+    def run(self, cmd, state):
+        if not cmd.groups:
+            cmd.apply(state)
+            return
+        before = state.capture(*cmd.groups)
+        cmd.apply(state)
+        self.undo_stack.append((cmd, before))
+        self.redo_stack.clear()
+
+    def undo(self, state) -> bool:
+        if not self.undo_stack:
+            return False
+        cmd, before = self.undo_stack.pop()
+        self.redo_stack.append((cmd, state.capture(*cmd.groups)))
+        state.restore(before)
+        return True
+
+    def redo(self, state) -> bool:
+        if not self.redo_stack:
+            return False
+        cmd, after = self.redo_stack.pop()
+        self.undo_stack.append((cmd, state.capture(*cmd.groups)))
+        state.restore(after)
+        return True
+
+
+class CommandQueue:
+    """push() desde los handlers de teclas; drain() una vez por frame."""
+    def __init__(self, history=None):
+        self.pending = deque()  # append/popleft de deque son seguros entre hilos
+        self.history = history or History()
+
+    def push(self, cmd):
+        self.pending.append(cmd)
+
+    def drain(self, state) -> int:
+        n = 0
+        while self.pending:
+            cmd = self.pending.popleft()
+            if isinstance(cmd, (Undo, Redo)):
+                cmd.apply(self.history, state)
+            else:
+                self.history.run(cmd, state)
+            n += 1
+        return n
@@ -0,0 +1,469 @@
+# courts.py
+"""
+Modo servidor: muchas canchas en un solo proceso.
+- CourtTable guarda el estado de todas las canchas en columnas array()
+  (dos entradas por cancha para lo que es por equipo o por reloj).
+- Court es una vista con __slots__ sobre una fila; se lee igual que GameState.
+- CourtServer tiene UN heap de timers para todas las canchas: cuando un reloj
+  arranca se agenda cuándo vencen shot10/shot5/shot0 y el fin de período,
+  y sólo se despierta cuando algo vence. Detener o cambiar un reloj sube su
+  generación y los timers viejos se descartan al salir del heap.
+- El reglamento es el de GameState (rules.RuleSet compilado a Schedule):
+  largo de períodos y alargues, 24s/14s, minutos al empezar cada período y
+  el recorte tardío. Cada cancha puede tener el suyo.
+- `python courts.py --courts 8 --rules fiba` lo levanta como servidor: una
+  línea JSON por mensaje, como remote.py, con el número de cancha.
+    cliente -> {"court": 3, "op": "add_points", "args": [0, 2]}
+    cliente -> {"court": 3, "op": "state"}   servidor -> {"court": 3, "state": {...}}
+    servidor -> {"court": 3, "event": "shot0"} (a todos los conectados)
+  Cada mesa tiene su cola de salida y su hilo que escribe: el scheduler sólo
+  encola (nunca toca un socket con el lock) y una mesa que no lee se corta.
+"""
+from array import array
+import argparse, heapq, hmac, json, queue, socket, socketserver, threading, time
+
+from logic import NS_PER_S, clamp, clock_str
+from rules import LEAGUE, RULESETS, compile_rules
+
+PORT = 47476
+OUTBOX = 256        # mensajes sin salir por mesa; más que eso es una mesa que no lee
+GAME, SHOT = 0, 1
+SHOT_MARKS = (("shot10", 10 * NS_PER_S), ("shot5", 5 * NS_PER_S), ("shot0", 0))
+
+# flags por cancha
+F_BEEP10, F_BEEP5, F_PENALIZED = 1, 2, 4
+BEEP_FLAG = {"shot10": F_BEEP10, "shot5": F_BEEP5}
+
+
+class CourtTable:
+    def __init__(self):
+        self.n = 0
+        self.names   = []           # (izq, der) por cancha
+        self.scores  = array("h")   # [2i + equipo]
+        self.fouls   = array("b")
+        self.minutes = array("b")
+        self.period  = array("h")   # [i]
+        self.sched   = array("B")   # [i] índice en CourtServer.schedules
+        self.flags   = array("B")
+        self.left    = array("q")   # [2i + GAME|SHOT] restante al último start/stop
+        self.t0      = array("q")   # referencia monotónica del start; -1 = detenido
+        self.gen     = array("I")   # generación del reloj (invalida timers)
+
+    def add(self, left, right, sched, game_ns, shot_ns) -> int:
+        self.names.append((left, right))
+        self.scores.extend((0, 0))
+        self.fouls.extend((0, 0))
+        self.minutes.extend((0, 0))
+        self.period.append(1)
+        self.sched.append(sched)
+        self.flags.append(0)
+        self.left.extend((game_ns, shot_ns))
+        self.t0.extend((-1, -1))
+        self.gen.extend((0, 0))
+        self.n += 1
+        return self.n - 1
+
+
+class Court:
+    """Vista de sólo lectura de una cancha (misma API de lectura que GameState)."""
+    __slots__ = ("_srv", "i")
+
+    def __init__(self, server, i):
+        self._srv = server
+        self.i = i
+
+    @property
+    def team_names(self):
+        return list(self._srv.table.names[self.i])
+
+    @property
+    def scores(self):
+        t = self._srv.table.scores
+        return [t[2 * self.i], t[2 * self.i + 1]]
+
+    @property
+    def fouls(self):
+        t = self._srv.table.fouls
+        return [t[2 * self.i], t[2 * self.i + 1]]
+
+    @property
+    def minutes(self):
+        t = self._srv.table.minutes
+        return [t[2 * self.i], t[2 * self.i + 1]]
+
+    @property
+    def period(self):
+        return self._srv.table.period[self.i]
+
+    @property
+    def rules(self):
+        return self._srv.schedule(self.i).rules
+
+    @property
+    def running(self):
+        return self._srv.table.t0[2 * self.i + GAME] >= 0
+
+    @property
+    def shot_running(self):
+        return self._srv.table.t0[2 * self.i + SHOT] >= 0
+
+    @property
+    def time_left(self):
+        return -(-self._srv.remaining_ns(self.i, GAME) // NS_PER_S)
+
+    @property
+    def shot_time(self):
+        return -(-self._srv.remaining_ns(self.i, SHOT) // NS_PER_S)
+
+    def time_str(self) -> str:
+        return clock_str(self._srv.remaining_ns(self.i, GAME))
+
+    def shot_str(self) -> str:
+        return f"{clamp(self.shot_time, 0, 99):02d}"
+
+    def period_str(self) -> str:
+        return self._srv.schedule(self.i).period_str(self.period)
+
+
+class CourtServer:
+    """
+    Todas las canchas con un solo scheduler.
+    - on_event(court, evento): "shot10", "shot5", "shot0", "end", "minutes"
+    - Uso con hilo propio: start() y después submit(court, "add_points", 0, 2)
+    - Uso manual (tests/bench con reloj virtual): llamar run_due() y next_due()
+    - rules: reglamento de las canchas nuevas (add_court puede pedir otro)
+    """
+    def __init__(self, now=time.monotonic_ns, on_event=None, rules=LEAGUE):
+        self.now = now
+        self.rules = rules
+        self.schedules = []   # Schedule compilados, compartidos por las canchas
+        self.table = CourtTable()
+        self.on_event = on_event or (lambda court, evt: None)
+        self.heap = []
+        self._seq = 0
+        self.fired = 0    # timers que dispararon
+        self.stale = 0    # timers descartados por reloj modificado
+        self.lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def add_court(self, left="Team 1", right="Team 2", rules=None) -> Court:
+        sched = compile_rules(rules or self.rules)
+        if sched not in self.schedules:
+            self.schedules.append(sched)
+        i = self.table.add(left, right, self.schedules.index(sched),
+                           sched.period_ns(1), sched.rules.shot_s * NS_PER_S)
+        self._period_start(i)
+        return Court(self, i)
+
+    def schedule(self, i):
+        return self.schedules[self.table.sched[i]]
+
+    def court(self, i) -> Court:
+        return Court(self, i)
+
+    # ---------- Relojes ----------
+    def remaining_ns(self, i, k) -> int:
+        j = 2 * i + k
+        t0 = self.table.t0[j]
+        if t0 < 0:
+            return self.table.left[j]
+        return max(0, self.table.left[j] - (self.now() - t0))
+
+    def _start(self, i, k):
+        j = 2 * i + k
+        if self.table.t0[j] < 0 and self.table.left[j] > 0:  # en 0 no arranca (como logic.Clock)
+            self.table.t0[j] = self.now()
+            self.table.gen[j] += 1
+            self._schedule(i, k)
+
+    def _stop_clock(self, i, k):
+        j = 2 * i + k
+        if self.table.t0[j] >= 0:
+            self.table.left[j] = self.remaining_ns(i, k)
+            self.table.t0[j] = -1
+            self.table.gen[j] += 1
+
+    def _set(self, i, k, seconds):
+        j = 2 * i + k
+        self.table.left[j] = seconds * NS_PER_S
+        self.table.gen[j] += 1
+        if self.table.t0[j] >= 0:
+            self.table.t0[j] = self.now()
+            self._schedule(i, k)
+
+    def _push(self, due, i, k, evt, arg=None):
+        self._seq += 1
+        heapq.heappush(self.heap, (due, self._seq, i, k, self.table.gen[2 * i + k], evt, arg))
+
+    def _schedule(self, i, k):
+        j = 2 * i + k
+        end = self.table.t0[j] + self.table.left[j]
+        if k == SHOT:
+            for evt, mark in SHOT_MARKS:
+                if not self.table.flags[i] & BEEP_FLAG.get(evt, 0):
+                    self._push(end - mark, i, k, evt)
+        else:
+            self._push(end, i, k, "end")
+            if not self.table.flags[i] & F_PENALIZED:
+                for m, (mark_ns, _) in enumerate(self.schedule(i).marks(self.table.period[i])):
+                    self._push(end - mark_ns, i, k, "minutes", m)
+
+    # ---------- Minutos (las transiciones de rules.Schedule, sobre las columnas) ----------
+    def _transition(self, i, tr) -> bool:
+        t = self.table
+        a, b = 2 * i, 2 * i + 1
+        old = (t.minutes[a], t.minutes[b])
+        if tr.kind == "set":
+            new = (tr.value, tr.value)
+        else:
+            if tr.kind == "cut":  # recorte tardío: una sola vez, como Transition.apply
+                over = [v > tr.value for v in old]
+                if t.flags[i] & F_PENALIZED or not (all(over) if tr.joint else any(over)):
+                    return False
+                t.flags[i] |= F_PENALIZED
+            new = tuple(min(v, tr.value) for v in old)
+        t.minutes[a], t.minutes[b] = new
+        return new != old
+
+    def _period_start(self, i):
+        for tr in self.schedule(i).starts(self.table.period[i]):
+            self._transition(i, tr)
+
+    # ---------- Scheduler ----------
+    def next_due(self):
+        """ns monotónico del próximo timer vigente, o None si no hay relojes corriendo."""
+        heap, gen = self.heap, self.table.gen
+        while heap and gen[2 * heap[0][2] + heap[0][3]] != heap[0][4]:
+            heapq.heappop(heap)
+            self.stale += 1
+        return heap[0][0] if heap else None
+
+    def run_due(self, now=None) -> int:
+        """Dispara todo lo vencido hasta `now`; devuelve cuántos eventos salieron."""
+        now = self.now() if now is None else now
+        heap, t = self.heap, self.table
+        fired = 0
+        while heap and heap[0][0] <= now:
+            due, _, i, k, g, evt, arg = heapq.heappop(heap)
+            if t.gen[2 * i + k] != g:
+                self.stale += 1
+                continue
+            if evt in BEEP_FLAG:
+                t.flags[i] |= BEEP_FLAG[evt]
+            elif evt == "minutes":
+                _, tr = self.schedule(i).marks(t.period[i])[arg]
+                if not self._transition(i, tr):
+                    continue
+            else:  # shot0 / end: el reloj se detiene en 0
+                self._stop_clock(i, k)
+                t.left[2 * i + k] = 0
+            fired += 1
+            self.on_event(i, evt)
+        self.fired += fired
+        return fired
+
+    # ---------- Comandos (mismas reglas que GameState) ----------
+    def add_points(self, i, team, pts):
+        j = 2 * i + team
+        self.table.scores[j] = max(0, self.table.scores[j] + pts)
+
+    def add_fouls(self, i, team, count):
+        j = 2 * i + team
+        self.table.fouls[j] = clamp(self.table.fouls[j] + count, 0, 5)
+
+    def add_minutes(self, i, team, count):
+        if count < 0:
+            self._set(i, SHOT, 60)
+            self._start(i, SHOT)
+        j = 2 * i + team
+        self.table.minutes[j] = clamp(self.table.minutes[j] + count, 0, self.schedule(i).rules.max_minutes)
+
+    def toggle_game(self, i):
+        self._stop_clock(i, GAME) if self.table.t0[2 * i] >= 0 else self._start(i, GAME)
+
+    def toggle_shot(self, i):
+        self._stop_clock(i, SHOT) if self.table.t0[2 * i + 1] >= 0 else self._start(i, SHOT)
+
+    def _reset_shot(self, i, seconds):
+        self.table.flags[i] &= ~(F_BEEP10 | F_BEEP5)
+        self._set(i, SHOT, seconds)
+        self._start(i, SHOT)
+
+    def reset_shot_24(self, i):
+        self._reset_shot(i, self.schedule(i).rules.shot_s)
+
+    def reset_shot_14(self, i):
+        self._reset_shot(i, self.schedule(i).rules.shot_reset_s)
+
+    def reset_time(self, i):
+        sched = self.schedule(i)
+        self._stop_clock(i, GAME)
+        self._stop_clock(i, SHOT)
+        self.table.flags[i] &= ~(F_BEEP10 | F_BEEP5)
+        self._set(i, SHOT, sched.rules.shot_s)
+        self._set(i, GAME, sched.period_ns(self.table.period[i]) // NS_PER_S)
+
+    def next_period(self, i):
+        t = self.table
+        t.period[i] += 1
+        t.fouls[2 * i] = t.fouls[2 * i + 1] = 0
+        self._period_start(i)
+        self.reset_time(i)
+
+    # ---------- Hilo propio ----------
+    def submit(self, i, op, *args):
+        """Aplica un comando desde cualquier hilo y despierta al scheduler."""
+        with self.lock:
+            getattr(self, op)(i, *args)
+        self._wake.set()
+
+    def serve_forever(self):
+        while not self._stop.is_set():
+            with self.lock:
+                self.run_due()
+                due = self.next_due()
+            timeout = None if due is None else max(0.0, (due - self.now()) / NS_PER_S)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="courts", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+# ---------- Modo servidor ----------
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.outbox = queue.Queue(OUTBOX)
+        self.writer = threading.Thread(target=self._write_loop, name="court-client", daemon=True)
+        self.writer.start()
+
+    def handle(self):
+        srv = self.server
+        try:
+            if srv.token is not None:
+                hello = json.loads(self.rfile.readline() or b"{}")
+                if not isinstance(hello, dict) or not hmac.compare_digest(str(hello.get("hello", "")), srv.token):
+                    self._send({"error": "token"})
+                    return
+            srv.clients.add(self)
+            for line in self.rfile:
+                try:
+                    self._send(srv.handle(json.loads(line)))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    self._send({"error": str(e)})
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            srv.clients.discard(self)
+
+    def finish(self):
+        try:
+            self.outbox.put_nowait(None)  # lo encolado sale antes de cerrar
+        except queue.Full:
+            self._drop()
+        self.writer.join(timeout=2)
+        if self.writer.is_alive():
+            self._drop()
+            self.writer.join()
+        super().finish()
+
+    def _send(self, msg):
+        """No bloquea: si la mesa no lee y se llena su cola, se la corta."""
+        try:
+            self.outbox.put_nowait(msg)
+        except queue.Full:
+            self._drop()
+
+    def _write_loop(self):
+        while True:
+            msg = self.outbox.get()
+            if msg is None:
+                return
+            try:
+                self.wfile.write(json.dumps(msg, ensure_ascii=False).encode() + b"\n")
+            except (OSError, ValueError):
+                self._drop()
+                return
+
+    def _drop(self):
+        self.server.clients.discard(self)
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)  # destraba la lectura y la escritura
+        except OSError:
+            pass
+
+
+class CourtService(socketserver.ThreadingTCPServer):
+    """
+    CourtServer con su hilo + TCP para las mesas de control de cada cancha.
+    Sin token sólo escucha en la máquina (127.0.0.1).
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, courts, host="127.0.0.1", port=PORT, token=None):
+        if token is None and host not in ("127.0.0.1", "localhost", "::1"):
+            raise ValueError("para escuchar en la red hace falta --token")
+        from remote import OPS   # mismos comandos y validaciones que las tablets
+        self.ops = {op: OPS[op][0] for op in OPS if hasattr(CourtServer, op)}
+        self.courts = courts
+        self.token = token
+        self.clients = set()
+        courts.on_event = self._on_event
+        super().__init__((host, port), _Handler)
+
+    def handle(self, msg):
+        from feed import snapshot
+        i, op, args = msg["court"], msg["op"], msg.get("args") or []
+        if not isinstance(i, int) or not 0 <= i < self.courts.table.n:
+            raise ValueError(f"cancha inexistente: {i!r}")
+        if op == "state":
+            with self.courts.lock:
+                return {"court": i, "state": snapshot(self.courts.court(i))}
+        checks = self.ops.get(op)
+        if checks is None:
+            raise ValueError(f"operación desconocida: {op!r}")
+        if len(args) != len(checks) or not all(isinstance(a, int) and ok(a) for ok, a in zip(checks, args)):
+            raise ValueError(f"argumentos inválidos para {op}: {args!r}")
+        self.courts.submit(i, op, *args)
+        return {"court": i, "ok": op}
+
+    def _on_event(self, i, evt):
+        # corre en el hilo del scheduler con courts.lock: sólo encola, un cliente caído no lo frena
+        for client in list(self.clients):
+            client._send({"court": i, "event": evt})
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Servidor de canchas del torneo")
+    ap.add_argument("--courts", type=int, default=8, help="cantidad de canchas")
+    ap.add_argument("--rules", choices=RULESETS, default=LEAGUE.name,
+                    help="reglamento: períodos, 24s y minutos")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--token", metavar="CLAVE",
+                    help="clave que tienen que mandar las mesas (obligatoria fuera de 127.0.0.1)")
+    args = ap.parse_args()
+    courts = CourtServer(rules=RULESETS[args.rules])
+    for n in range(args.courts):
+        courts.add_court(f"Local {n + 1}", f"Visita {n + 1}")
+    try:
+        service = CourtService(courts, args.host, args.port, args.token)
+    except ValueError as e:
+        ap.error(str(e))
+    courts.start()
+    print(f"{args.courts} canchas ({args.rules}) en {args.host}:{args.port}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        courts.stop()
+        service.server_close()
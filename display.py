@@ -0,0 +1,110 @@
+# display.py
+"""
+Ventanas extra del tablero en el mismo proceso: la pared, la vista previa
+del operador, la pantalla del banco.
+- Cada DisplayWindow es un Toplevel con su layout, tamaño y colores, y una
+  vista (PlanView) del RenderPlan del Scoreboard: time_str(), shot_str(),
+  period_str() y las banderas de faltas se calculan una vez por frame para
+  todas las ventanas; cada una sólo hace sus config().
+- Sólo muestran: teclas, menús y animaciones quedan en la ventana principal.
+- Tk no rota ventanas: "portrait" apila el tablero para un monitor girado
+  desde el sistema.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+# clave del plan -> (fila, columna, columnas que ocupa, fuente)
+LAYOUTS = {
+    "wide": {
+        "score_left": (0, 0, 1, "big"),  "period": (0, 1, 1, "mid"),  "score_right": (0, 2, 1, "big"),
+        "fouls_left": (1, 0, 1, "mid"),  "time":   (1, 1, 1, "big"),  "fouls_right": (1, 2, 1, "mid"),
+        "flag_left":  (2, 0, 1, "mid"),  "shot":   (2, 1, 1, "mid"),  "flag_right":  (2, 2, 1, "mid"),
+        "names":      (3, 0, 3, "small"),
+    },
+    "compact": {   # vista previa del operador: una franja
+        "score_left": (0, 0, 1, "mid"), "time": (0, 1, 1, "mid"), "score_right": (0, 2, 1, "mid"),
+        "fouls_left": (1, 0, 1, "small"), "shot": (1, 1, 1, "small"), "fouls_right": (1, 2, 1, "small"),
+        "period":     (2, 1, 1, "small"),
+    },
+    "portrait": {
+        "period":     (0, 0, 2, "mid"),
+        "time":       (1, 0, 2, "big"),
+        "shot":       (2, 0, 2, "mid"),
+        "score_left": (3, 0, 1, "big"),  "score_right": (3, 1, 1, "big"),
+        "fouls_left": (4, 0, 1, "mid"),  "fouls_right": (4, 1, 1, "mid"),
+        "flag_left":  (5, 0, 1, "mid"),  "flag_right":  (5, 1, 1, "mid"),
+        "names":      (6, 0, 2, "small"),
+    },
+}
+FONT_SIZES = {"big": 140, "mid": 64, "small": 28}
+# esquema -> color de cada grupo de claves
+SCHEMES = {
+    "clasico":   {"bg": "#000", "score": "#00ff7f", "time": "white", "shot": "#ffd700",
+                  "text": "white", "flag": "#ff2b2b"},
+    "contraste": {"bg": "#000", "score": "#ffff00", "time": "#ffff00", "shot": "#ffffff",
+                  "text": "#ffffff", "flag": "#ff0000"},
+    "claro":     {"bg": "#ffffff", "score": "#006b2e", "time": "#000000", "shot": "#b8860b",
+                  "text": "#000000", "flag": "#d00000"},
+}
+ROLE = {"score_left": "score", "score_right": "score", "fouls_left": "score", "fouls_right": "score",
+        "time": "time", "shot": "shot", "period": "shot", "names": "text",
+        "flag_left": "flag", "flag_right": "flag"}
+FLAG = "■"
+
+
+def parse_display(txt):
+    """"LAYOUT[:ESQUEMA][@GEOMETRÍA]" (ej: portrait:claro@1080x1920+1920+0) -> kwargs de DisplayWindow."""
+    spec, _, geometry = txt.partition("@")
+    layout, _, scheme = spec.partition(":")
+    layout, scheme = layout or "wide", scheme or "clasico"
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout desconocido: {layout!r} ({', '.join(LAYOUTS)})")
+    if scheme not in SCHEMES:
+        raise ValueError(f"esquema desconocido: {scheme!r} ({', '.join(SCHEMES)})")
+    return {"layout": layout, "scheme": scheme, "geometry": geometry or None}
+
+
+class DisplayWindow(tk.Toplevel):
+    """
+    DisplayWindow(app, plan, layout, scheme, geometry, scale): se dibuja sola
+    con app.plan.render(); "f" pantalla completa, al cerrarla suelta su vista.
+    """
+    def __init__(self, master, plan, layout="wide", scheme="clasico", geometry=None, scale=1.0,
+                 title="Marcador"):
+        super().__init__(master)
+        self.plan = plan
+        self.layout = layout
+        colors = SCHEMES[scheme]
+        self.title(f"{title} ({layout})")
+        self.configure(bg=colors["bg"])
+        if geometry:
+            self.geometry(geometry)
+        self.fullscreen = False
+        self.fonts = {role: tkfont.Font(self, family="Arial", size=max(8, int(size * scale)), weight="bold")
+                      for role, size in FONT_SIZES.items()}
+
+        self.view = plan.view(f"{layout}-{id(self):x}")
+        spec = LAYOUTS[layout]
+        for r in {row for row, *_ in spec.values()}:
+            self.grid_rowconfigure(r, weight=1)
+        for c in range(max(col + span for _, col, span, _ in spec.values())):
+            self.grid_columnconfigure(c, weight=1, uniform="cols")
+        for key, (row, col, span, font) in spec.items():
+            label = tk.Label(self, bg=colors["bg"], fg=colors[ROLE[key]], font=self.fonts[font])
+            label.grid(row=row, column=col, columnspan=span)
+            if key.startswith("flag_"):
+                label.config(text=FLAG)
+                self.view.bind(key, lambda on, w=label: w.grid() if on else w.grid_remove())
+            else:
+                self.view.bind(key, lambda v, w=label: w.config(text=v))
+
+        self.bind("f", self.toggle_fullscreen)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def toggle_fullscreen(self, event=None):
+        self.fullscreen = not self.fullscreen
+        self.attributes("-fullscreen", self.fullscreen)
+
+    def close(self):
+        self.plan.drop(self.view)
+        self.destroy()
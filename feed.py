@@ -0,0 +1,134 @@
+# feed.py
+"""
+Archivos de datos para la gráfica de la transmisión (fuentes de datos tipo
+vMix/CasparCG que leen un archivo cada tanto).
+- Un mismo "snapshot" del tablero (puntos, tiempo, 24s, período, nombres,
+  faltas, minutos) sale en JSON, XML y CSV.
+- Cada archivo se escribe entero en un .tmp y se renombra encima
+  (os.replace): el programa que lee nunca ve uno a medio escribir.
+- Escribe un hilo propio: se despierta con cada mutación de GameState y,
+  mientras corre el reloj, una vez por frame. Lo que cambió dentro de un
+  frame sale en UNA escritura por archivo; si nada cambió no se toca el disco.
+"""
+from xml.sax.saxutils import escape
+import csv, io, json, os, threading, time
+
+FRAME_MS = 100      # como ui.SAMPLE_MS: el reloj no cambia de texto más seguido
+IDLE_S = 1.0        # relojes detenidos: sólo las mutaciones despiertan al hilo
+
+FIELDS = ("team1_name", "team2_name", "team1_score", "team2_score", "team1_fouls", "team2_fouls",
+          "team1_minutes", "team2_minutes", "period", "time", "shot", "running")
+
+
+def snapshot(state) -> dict:
+    return {
+        "team1_name": state.team_names[0], "team2_name": state.team_names[1],
+        "team1_score": state.scores[0], "team2_score": state.scores[1],
+        "team1_fouls": state.fouls[0], "team2_fouls": state.fouls[1],
+        "team1_minutes": state.minutes[0], "team2_minutes": state.minutes[1],
+        "period": state.period_str(), "time": state.time_str(), "shot": state.shot_str(),
+        "running": int(state.running),
+    }
+
+
+def to_json(snap) -> str:
+    return json.dumps(snap, ensure_ascii=False, separators=(",", ":"))
+
+
+def to_xml(snap) -> str:
+    body = "".join(f"<{k}>{escape(str(snap[k]))}</{k}>" for k in FIELDS)
+    return f'<?xml version="1.0" encoding="utf-8"?>\n<scoreboard>{body}</scoreboard>\n'
+
+
+def to_csv(snap) -> str:
+    out = io.StringIO()
+    w = csv.writer(out, lineterminator="\n")
+    w.writerow(FIELDS)
+    w.writerow(snap[k] for k in FIELDS)
+    return out.getvalue()
+
+
+FORMATS = {"json": to_json, "xml": to_xml, "csv": to_csv}
+
+
+def write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class FeedWriter:
+    """
+    FeedWriter(state, carpeta).start(): deja marcador.json/.xml/.csv al día.
+    - writes[fmt]: escrituras hechas; coalesced: mutaciones que salieron juntas con otras
+    - errors: escrituras fallidas (p.ej. el lector tiene el archivo abierto en
+      Windows); se reintenta en el próximo frame
+    """
+    def __init__(self, state, directory, formats=tuple(FORMATS), name="marcador", frame_ms=FRAME_MS):
+        self.state = state
+        self.paths = {fmt: os.path.join(directory, f"{name}.{fmt}") for fmt in formats}
+        self.frame_s = frame_ms / 1000
+        os.makedirs(directory, exist_ok=True)
+        self.writes = dict.fromkeys(formats, 0)
+        self.changes = 0            # mutaciones vistas
+        self.batches = 0            # tandas escritas (una por frame a lo sumo)
+        self.errors = 0
+        self.write_ms = 0.0         # duración de la última tanda
+        self._last = None           # snapshot ya escrito
+        self._failed = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        state.subscribe(self._on_change)
+
+    @property
+    def coalesced(self) -> int:
+        return max(0, self.changes - self.batches)
+
+    def _on_change(self, state, op, args):
+        self.changes += 1
+        self._wake.set()
+
+    def write(self) -> bool:
+        """Escribe si el tablero cambió desde la última vez (corre en el hilo, o a mano)."""
+        with self.state.lock:
+            snap = snapshot(self.state)
+        if snap == self._last and not self._failed:
+            return False
+        t0 = time.perf_counter()
+        self._failed = False
+        for fmt, path in self.paths.items():
+            try:
+                write_atomic(path, FORMATS[fmt](snap))
+                self.writes[fmt] += 1
+            except OSError:
+                self.errors += 1
+                self._failed = True
+        self._last = snap
+        self.batches += 1
+        self.write_ms = (time.perf_counter() - t0) * 1000
+        return True
+
+    def run(self):
+        while not self._stop.is_set():
+            self.write()
+            # a lo sumo una tanda por frame: lo que llegue mientras tanto sale junto
+            self._stop.wait(self.frame_s)
+            st = self.state
+            if not (st.running or st.shot_running or self._failed):
+                self._wake.wait(IDLE_S)
+            self._wake.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self.state.unsubscribe(self._on_change)
+        self.write()  # lo último que quedó
@@ -0,0 +1,247 @@
+# journal.py
+import os, queue, struct, threading, time
+
+# Registro fijo: seq, op, a, b, reloj juego (ns), 24s (ns), flags, largo del payload
+RECORD = struct.Struct("<IBhhqqBH")
+# Snapshot: magic, seq, período, puntos, faltas, minutos, relojes, flags, largo de nombres
+SNAPSHOT = struct.Struct("<4sIHhhBBBBqqBHH")
+MAGIC = b"MRC1"
+
+# flags de estado que no salen de los argumentos
+F_RUNNING, F_SHOT_RUNNING, F_BEEP10, F_BEEP5, F_HAVING, F_PENALIZED = 1, 2, 4, 8, 16, 32
+
+# Código de cada mutación. "clock" agrupa lo que sólo cambia relojes: al
+# reproducir basta con restaurar los relojes que trae el registro.
+# Lo que no está en la tabla (p.ej. next_period, que depende del reloj en
+# el momento) se guarda como "state" con el estado completo de payload.
+OPS = {
+    "clock": 1, "set_game_time_from_text": 1, "set_shot_time": 1,
+    "toggle_game": 1, "toggle_shot": 1,
+    "set_names": 2, "set_points": 3, "add_points": 4, "add_fouls": 5,
+    "add_minutes": 6, "apply_minutes": 7, "reset_scores": 8, "reset_time": 9,
+    "reset_shot_24": 10, "reset_shot_14": 11, "reset_all": 12,
+    "state": 13,
+}
+OP_STATE = OPS["state"]
+TWO_INTS = {OPS[n] for n in ("set_points", "add_points", "add_fouls", "add_minutes")}
+
+def _set_minutes(state, a, b):
+    state.minutes = [a, b]
+    state._touch("minutes")
+
+REPLAY = {
+    1:  lambda s, a, b, p: None,
+    2:  lambda s, a, b, p: s.set_names(*p.decode("utf-8").split("\0")),
+    3:  lambda s, a, b, p: s.set_points(a, b),
+    4:  lambda s, a, b, p: s.add_points(a, b),
+    5:  lambda s, a, b, p: s.add_fouls(a, b),
+    6:  lambda s, a, b, p: s.add_minutes(a, b),
+    7:  lambda s, a, b, p: _set_minutes(s, a, b),
+    8:  lambda s, a, b, p: s.reset_scores(),
+    9:  lambda s, a, b, p: s.reset_time(),
+    10: lambda s, a, b, p: s.reset_shot_24(),
+    11: lambda s, a, b, p: s.reset_shot_14(),
+    12: lambda s, a, b, p: s.reset_all(),
+}
+
+def _flags(state) -> int:
+    return ((F_RUNNING if state.running else 0)
+            | (F_SHOT_RUNNING if state.shot_running else 0)
+            | (F_BEEP10 if state.shot_beep10_done else 0)
+            | (F_BEEP5 if state.shot_beep5_done else 0)
+            | (F_HAVING if state.minutes_having else 0)
+            | (F_PENALIZED if state.minutes_penalized else 0))
+
+def _restore_clocks(state, game_ns, shot_ns, flags):
+    # Tras una caída no sabemos cuánto duró el corte: los relojes vuelven
+    # detenidos con lo último que se guardó, y el oficial los reanuda.
+    state.game_clock.stop(); state.game_clock.set_ns(game_ns)
+    state.shot_clock.stop(); state.shot_clock.set_ns(shot_ns)
+    state.shot_beep10_done   = bool(flags & F_BEEP10)
+    state.shot_beep5_done    = bool(flags & F_BEEP5)
+    state.minutes_having     = bool(flags & F_HAVING)
+    state.minutes_penalized  = bool(flags & F_PENALIZED)
+    state._touch("time", "shot")
+
+def encode_state(state, seq=0) -> bytes:
+    left, right = (n.encode("utf-8") for n in state.team_names)
+    head = SNAPSHOT.pack(
+        MAGIC, seq, state.period, *state.scores, *state.fouls, *state.minutes,
+        state.game_clock.remaining_ns(), state.shot_clock.remaining_ns(),
+        _flags(state), len(left), len(right))
+    return head + left + right
+
+def decode_state(buf, state) -> int:
+    """Carga un estado completo en `state` y devuelve su número de secuencia."""
+    (magic, seq, period, s0, s1, f0, f1, m0, m1,
+     game_ns, shot_ns, flags, nl, nr) = SNAPSHOT.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError("Snapshot inválido")
+    base = SNAPSHOT.size
+    state.team_names = [bytes(buf[base:base + nl]).decode("utf-8"),
+                        bytes(buf[base + nl:base + nl + nr]).decode("utf-8")]
+    state.period = period
+    state.scores = [s0, s1]
+    state.fouls = [f0, f1]
+    state.minutes = [m0, m1]
+    _restore_clocks(state, game_ns, shot_ns, flags)
+    state._touch("scores", "fouls", "minutes", "period", "names")
+    return seq
+
+
+class Journal:
+    """
+    Journal de sólo-agregar con snapshots periódicos.
+    - attach(state): registra cada mutación de `state` como un registro binario
+    - Los registros se acumulan y se hace fsync cada `sync_every` registros o
+      cada `sync_ms` (llamando tick() una vez por frame)
+    - Cada `snapshot_s` segundos se escribe un snapshot atómico y se vacía el
+      journal; recover() carga el snapshot y reproduce la cola del journal.
+    - record() y tick() corren con state.lock: sólo arman los bytes. El disco
+      (write, fsync, replace, truncate) lo toca un hilo propio, en orden.
+    """
+    def __init__(self, directory, sync_every=32, sync_ms=250, snapshot_s=30):
+        os.makedirs(directory, exist_ok=True)
+        self.log_path  = os.path.join(directory, "journal.bin")
+        self.snap_path = os.path.join(directory, "snapshot.bin")
+        self.sync_every = sync_every
+        self.sync_ns = sync_ms * 1_000_000
+        self.snapshot_ns = int(snapshot_s * 1_000_000_000)
+        self.seq = 0
+        self._buf = bytearray()
+        self._pending = 0
+        self._f = None
+        self._jobs = None      # (bytes del journal, bytes del snapshot o None) para el hilo
+        self._writer = None
+        self._last_sync = self._last_snap = time.monotonic_ns()
+
+    # ---------- Recuperación ----------
+    def recover(self, state) -> int:
+        """Deja `state` como estaba antes de cerrar/caerse. Devuelve registros reproducidos."""
+        snap_seq = 0
+        if os.path.exists(self.snap_path):
+            with open(self.snap_path, "rb") as f:
+                snap_seq = decode_state(f.read(), state)
+        self.seq = snap_seq
+
+        replayed, good = 0, 0
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "rb") as f:
+                data = memoryview(f.read())
+            off = 0
+            while off + RECORD.size <= len(data):
+                seq, op, a, b, game_ns, shot_ns, flags, plen = RECORD.unpack_from(data, off)
+                end = off + RECORD.size + plen
+                if end > len(data):
+                    break  # registro cortado por la caída
+                payload = data[off + RECORD.size:end]
+                if seq > snap_seq:
+                    if op == OP_STATE:
+                        decode_state(payload, state)
+                    else:
+                        REPLAY[op](state, a, b, bytes(payload))
+                        _restore_clocks(state, game_ns, shot_ns, flags)
+                    self.seq = seq
+                    replayed += 1
+                off = good = end
+
+        self._f = open(self.log_path, "ab")
+        self._f.truncate(good)  # descarta la cola rota, si la hay
+        return replayed
+
+    # ---------- Escritura ----------
+    def attach(self, state):
+        if self._f is None:
+            self._f = open(self.log_path, "ab")
+        if self._writer is None:
+            self._jobs = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop, name="journal", daemon=True)
+            self._writer.start()
+        state.subscribe(self.record)
+
+    def record(self, state, op, args):
+        self.seq += 1
+        code = OPS.get(op, OP_STATE)
+        a = b = 0
+        payload = b""
+        if code == OP_STATE:
+            payload = encode_state(state, self.seq)
+        elif code == OPS["set_names"]:
+            payload = "\0".join(state.team_names).encode("utf-8")
+        elif code == OPS["apply_minutes"]:
+            a, b = state.minutes
+        elif code in TWO_INTS:
+            a, b = args
+        self._buf += RECORD.pack(
+            self.seq, code, a, b,
+            state.game_clock.remaining_ns(), state.shot_clock.remaining_ns(),
+            _flags(state), len(payload))
+        self._buf += payload
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.flush()
+
+    def flush(self):
+        """Entrega lo acumulado al hilo de escritura (fsync incluido); no espera al disco."""
+        self._submit()
+
+    def _submit(self, snap=None):
+        data, self._buf = bytes(self._buf), bytearray()
+        self._pending = 0
+        self._last_sync = time.monotonic_ns()
+        if self._writer is None:
+            self._write(data, snap)  # sin attach(): nadie más está escribiendo
+        else:
+            self._jobs.put((data, snap))
+
+    def _write_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._write(*job)
+
+    def _write(self, data, snap):
+        if data:
+            self._f.write(data)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        if snap is None:
+            return
+        tmp = self.snap_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(snap)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snap_path)
+        # Lo anterior ya está en el snapshot; si caemos antes de truncar,
+        # recover() salta los registros con seq <= seq del snapshot.
+        self._f.truncate(0)
+
+    def tick(self, state):
+        """Llamar seguido (lo hace timing.ClockThread): fsync por lotes y snapshot periódico."""
+        now = time.monotonic_ns()
+        if self._pending and now - self._last_sync >= self.sync_ns:
+            self.flush()
+        if now - self._last_snap >= self.snapshot_ns:
+            self.snapshot(state)
+
+    def snapshot(self, state):
+        # el estado se codifica acá (con state.lock); el hilo lo escribe después del journal
+        self._submit(encode_state(state, self.seq))
+        self._last_snap = time.monotonic_ns()
+
+    def close(self, state=None):
+        if self._f is None:
+            return
+        if state is not None:
+            with state.lock:
+                self.snapshot(state)
+        else:
+            self.flush()
+        if self._writer is not None:
+            self._jobs.put(None)
+            self._writer.join()
+            self._writer = None
+        self._f.close()
+        self._f = None
@@ -0,0 +1,311 @@
+# led.py
+"""
+Salida a tableros LED físicos (controladores por RS-485/serie o por TCP).
+- El tablero LED es una vista más del RenderPlan (como una DisplayWindow):
+  los textos ya calculados se cortan en segmentos de ancho fijo (reloj,
+  24s, período, puntos, faltas, banderas) y se mandan en un frame binario.
+- Frame: AA 55 | largo u16 | seq u8 | n u8 | n × (segmento u8, largo u8,
+  ASCII) | CRC-16/CCITT u16 del cuerpo. Big endian.
+- Un hilo propio escribe: lo que cambió mientras tanto sale en UN frame,
+  nunca más de max_fps frames por segundo (lo que aguanta el controlador) y
+  sólo con los segmentos distintos de lo ya enviado. Cada keyframe_s va el
+  tablero entero (un controlador que se reinició se pone al día solo).
+- La cola es un dict por segmento: a lo sumo len(SEGMENTS) entradas, por
+  más lento que sea el enlace. update() nunca espera al puerto.
+"""
+from binascii import crc_hqx
+from collections import deque
+import os, re, socket, threading, time
+
+MAGIC = b"\xaa\x55"
+MAX_FPS = 20
+KEYFRAME_S = 5.0
+RETRY_S = 2.0      # reintento de abrir el enlace después de un error
+BAUD = 9600
+
+# clave del plan (render.BOARD) -> (segmento, ancho)
+SEGMENTS = {
+    "time":        (1, 5),
+    "shot":        (2, 2),
+    "period":      (3, 4),      # "   1" ... "OT 1"
+    "score_left":  (4, 3),
+    "score_right": (5, 3),
+    "fouls_left":  (6, 2),
+    "fouls_right": (7, 2),
+    "flag_left":   (8, 1),
+    "flag_right":  (9, 1),
+}
+
+
+def segment(key, value) -> bytes:
+    """Texto del segmento: ASCII, alineado a la derecha y recortado a su ancho ("1º" -> "   1")."""
+    width = SEGMENTS[key][1]
+    if isinstance(value, bool):
+        text = "1" if value else "0"
+    else:
+        text = re.sub(r"[^0-9A-Za-z:. -]", "", str(value))
+    return text.rjust(width)[-width:].encode("ascii")
+
+
+def encode(seq, segments) -> bytes:
+    """Frame con {segmento: bytes}."""
+    body = bytes((seq & 0xFF, len(segments))) + b"".join(
+        bytes((sid, len(data))) + data for sid, data in sorted(segments.items()))
+    return MAGIC + len(body).to_bytes(2, "big") + body + crc_hqx(body, 0xFFFF).to_bytes(2, "big")
+
+
+def decode(body) -> tuple:
+    """(seq, {segmento: bytes}) del cuerpo de un frame (sin encabezado ni CRC)."""
+    seq, n = body[0], body[1]
+    segs, i = {}, 2
+    for _ in range(n):
+        sid, size = body[i], body[i + 1]
+        segs[sid] = bytes(body[i + 2:i + 2 + size])
+        i += 2 + size
+    if i != len(body):
+        raise ValueError("largo de segmentos inválido")
+    return seq, segs
+
+
+class FrameReader:
+    """Lado del controlador (para probar con una pty o un socket): feed(bytes) -> frames completos."""
+    def __init__(self):
+        self.buf = bytearray()
+        self.frames = 0
+        self.bad = 0      # bytes descartados buscando el próximo AA 55 / CRC inválido
+
+    def feed(self, data) -> list:
+        buf = self.buf
+        buf += data
+        out = []
+        while True:
+            start = buf.find(MAGIC)
+            if start < 0:
+                self.bad += max(0, len(buf) - 1)
+                del buf[:max(0, len(buf) - 1)]
+                return out
+            if start:
+                self.bad += start
+                del buf[:start]
+            if len(buf) < 4:
+                return out
+            size = int.from_bytes(buf[2:4], "big")
+            if len(buf) < 6 + size:
+                return out
+            body = bytes(buf[4:4 + size])
+            if crc_hqx(body, 0xFFFF) != int.from_bytes(buf[4 + size:6 + size], "big"):
+                self.bad += 1
+                del buf[:1]  # no era un frame: se busca el próximo AA 55
+                continue
+            del buf[:6 + size]
+            try:
+                out.append(decode(body))
+                self.frames += 1
+            except (ValueError, IndexError):
+                self.bad += 1
+
+
+# ---------- Enlaces ----------
+class TcpLink:
+    """Controlador por red (o un stand-in local)."""
+    def __init__(self, host, port, timeout=2.0):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def write(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class SerialLink:
+    """Puerto serie / RS-485 (o una pty): pyserial si está instalado; si no, termios (POSIX)."""
+    def __init__(self, path, baud=BAUD):
+        self.fd = self.port = None
+        try:
+            import serial
+        except ImportError:
+            serial = None
+        if serial is not None:
+            self.port = serial.Serial(path, baud, write_timeout=2)
+            return
+        import termios, tty
+        self.fd = os.open(path, os.O_WRONLY | os.O_NOCTTY)
+        tty.setraw(self.fd)
+        attrs = termios.tcgetattr(self.fd)
+        attrs[4] = attrs[5] = getattr(termios, f"B{baud}")
+        termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+
+    def write(self, data):
+        if self.port is not None:
+            self.port.write(data)
+            return
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def close(self):
+        if self.port is not None:
+            self.port.close()
+        elif self.fd is not None:
+            os.close(self.fd)
+
+
+def open_link(spec):
+    """"tcp:HOST:PUERTO" o "RUTA[@BAUDIOS]" (/dev/ttyUSB0@19200, COM3)."""
+    if spec.startswith("tcp:"):
+        host, _, port = spec[4:].rpartition(":")
+        return TcpLink(host or "127.0.0.1", int(port))
+    path, _, baud = spec.partition("@")
+    return SerialLink(path, int(baud or BAUD))
+
+
+# ---------- Driver ----------
+class LedDriver:
+    """
+    LedDriver(lambda: open_link(spec)).start(); attach(plan) lo suma como vista.
+    - frames / bytes / segments: lo escrito; coalesced: cambios que salieron
+      juntos con otros (o pisados por uno más nuevo antes de salir)
+    - latency_ns: cambio en el tablero -> frame escrito; observe_latency(ms)
+    - errors: escrituras o aperturas fallidas; se reintenta cada RETRY_S
+    """
+    def __init__(self, opener, max_fps=MAX_FPS, keyframe_s=KEYFRAME_S, now=time.monotonic_ns):
+        self.opener = opener
+        self.interval_ns = int(1e9 / max_fps)
+        self.keyframe_ns = int(keyframe_s * 1e9)
+        self.now = now
+        self.link = None
+        self.view = None
+        self.seq = 0
+        self.frames = self.bytes = self.segments = 0
+        self.changes = 0
+        self.errors = 0
+        self.latency_ns = deque(maxlen=4096)
+        self.observe_latency = None
+        self._lock = threading.Lock()
+        self._pending = {}       # clave -> (bytes, primer cambio sin enviar)
+        self._shown = {}         # clave -> bytes (lo último que debería mostrar el tablero)
+        self._sent = {}          # segmento -> bytes ya escritos al controlador
+        self._last_frame = 0
+        self._last_key = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def coalesced(self) -> int:
+        return max(0, self.changes - self.segments)
+
+    def attach(self, plan):
+        self.view = plan.view("led")
+        for key in SEGMENTS:
+            self.view.bind(key, lambda v, key=key: self.update(key, v))
+        return self
+
+    def detach(self, plan):
+        plan.drop(self.view)
+
+    def update(self, key, value):
+        """Corre en el hilo que renderiza (Tk): sólo anota, no toca el puerto."""
+        data = segment(key, value)
+        with self._lock:
+            prev = self._pending.get(key)
+            self._pending[key] = (data, prev[1] if prev else self.now())
+            self.changes += 1
+        self._wake.set()
+
+    # ---------- Hilo de escritura ----------
+    def run(self):
+        while not self._stop.is_set():
+            now = self.now()
+            self._wake.wait(max(0.0, (self._last_key + self.keyframe_ns - now) / 1e9))
+            # tope de frames por segundo: lo que llegue mientras tanto sale junto
+            wait = self._last_frame + self.interval_ns - self.now()
+            if wait > 0 and self._stop.wait(wait / 1e9):
+                break
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> bool:
+        """Escribe un frame si hay algo distinto (o toca keyframe)."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        for key, (data, _) in batch.items():
+            self._shown[key] = data
+        now = self.now()
+        keyframe = self.link is None or now - self._last_key >= self.keyframe_ns
+        if self.link is None and not self._open():
+            self._requeue(batch)
+            return False
+        segs = {}
+        for key, data in (self._shown.items() if keyframe else ((k, d) for k, (d, _) in batch.items())):
+            sid = SEGMENTS[key][0]
+            if keyframe or self._sent.get(sid) != data:
+                segs[sid] = data
+        if not segs:
+            if keyframe:
+                self._last_key = now  # nada que mostrar todavía
+            return False
+        frame = encode(self.seq, segs)
+        try:
+            self.link.write(frame)
+        except OSError:
+            self.errors += 1
+            self._close()
+            self._requeue(batch)
+            return False
+        done = self.now()
+        self.seq = (self.seq + 1) & 0xFF
+        self._sent.update(segs)
+        self.frames += 1
+        self.bytes += len(frame)
+        self.segments += len(batch)
+        self._last_frame = done
+        if keyframe:
+            self._last_key = done
+        for _, t0 in batch.values():
+            self.latency_ns.append(done - t0)
+            if self.observe_latency:
+                self.observe_latency((done - t0) / 1e6)
+        return True
+
+    def _requeue(self, batch):
+        with self._lock:
+            for key, item in batch.items():
+                self._pending.setdefault(key, item)
+
+    def _open(self) -> bool:
+        if self.now() - self._last_frame < RETRY_S * 1e9 and self.errors:
+            return False
+        try:
+            self.link = self.opener()
+        except OSError:
+            self.errors += 1
+            self._last_frame = self.now()  # el próximo intento, en RETRY_S
+            return False
+        self._sent = {}  # tablero recién conectado: no se sabe qué muestra
+        return True
+
+    def _close(self):
+        if self.link is not None:
+            try:
+                self.link.close()
+            except OSError:
+                pass
+        self.link = None
+        self._last_frame = self.now()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="led", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        if self.link is not None:
+            self.flush()  # lo último que quedó
+        self._close()
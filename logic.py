@@ -1,24 +1,112 @@
 # logic.py
+from collections import Counter
 from dataclasses import dataclass, field
-import re
+from typing import Callable
+import functools, re, threading, time
+
+from rules import LEAGUE, RuleSet, compile_rules
 
 START_SECONDS = 10 * 60  # 10:00
 START_24SG    = 24
+NS_PER_S      = 1_000_000_000
+NS_PER_TENTH  = NS_PER_S // 10
+
+# Campos con versión propia: la UI repinta sólo lo que cambió
+FIELDS = ("scores", "fouls", "minutes", "time", "shot", "period", "names")
 
 def clamp(n, lo, hi): 
     return max(lo, min(hi, n))
 
+def mutation(fn):
+    """
+    Marca un método de GameState como mutación: al terminar avisa a los
+    suscriptores con (state, nombre, args). Las llamadas anidadas (p.ej.
+    next_period -> reset_time) sólo notifican la operación exterior.
+    Corre con state.lock tomado: el hilo de relojes (timing.py) y la UI
+    no se pisan.
+    """
+    @functools.wraps(fn)
+    def wrapper(self, *args):
+        with self.lock:
+            self._depth += 1
+            try:
+                result = fn(self, *args)
+            finally:
+                self._depth -= 1
+            self._emit(fn.__name__, args)
+            return result
+    return wrapper
+
+def clock_str(remaining_ns: int) -> str:
+    # Último minuto en décimas (SS.d), el resto en MM:SS (redondeo hacia arriba)
+    t = -(-remaining_ns // NS_PER_TENTH)
+    if t < 600:
+        return f"{t // 10:02d}.{t % 10}"
+    secs = -(-remaining_ns // NS_PER_S)
+    return f"{secs // 60:02d}:{secs % 60:02d}"
+
+class Clock:
+    """
+    Reloj de cuenta regresiva sin deriva.
+    Guarda lo que quedaba en el último start/stop y la referencia monotónica
+    del start; el tiempo restante se calcula al leerlo, nunca se acumula.
+    - now: función que devuelve nanosegundos monotónicos (inyectable)
+    """
+    __slots__ = ("_now", "_left_ns", "_t0")
+
+    def __init__(self, seconds=0, now=time.monotonic_ns):
+        self._now = now
+        self._left_ns = int(seconds * NS_PER_S)
+        self._t0 = None  # None = detenido
+
+    @property
+    def running(self) -> bool:
+        return self._t0 is not None
+
+    def remaining_ns(self) -> int:
+        if self._t0 is None:
+            return self._left_ns
+        return max(0, self._left_ns - (self._now() - self._t0))
+
+    # at: instante (mismo reloj que now) en que se pidió, si fue antes de
+    # ahora (p.ej. un comando remoto que tardó en llegar, ver remote.py)
+    # Un reloj en 0 no arranca: la bocina ya sonó y no tiene que volver a sonar
+    def start(self, at=None):
+        if self._t0 is None and self._left_ns > 0:
+            now = self._now()
+            self._t0 = now if at is None else min(int(at), now)
+
+    def stop(self, at=None):
+        if self._t0 is not None:
+            if at is None:
+                self._left_ns = self.remaining_ns()
+            else:
+                at = max(self._t0, min(int(at), self._now()))
+                self._left_ns = max(0, self._left_ns - (at - self._t0))
+            self._t0 = None
+
+    def set_ns(self, ns: int):
+        self._left_ns = max(0, int(ns))
+        if self._t0 is not None:
+            self._t0 = self._now()
+
+    def set(self, seconds):
+        self.set_ns(seconds * NS_PER_S)
+
+    # Redondeo hacia arriba: el reloj muestra 0 sólo cuando realmente terminó
+    def seconds(self) -> int:
+        return -(-self.remaining_ns() // NS_PER_S)
+
+    def tenths(self) -> int:
+        return -(-self.remaining_ns() // NS_PER_TENTH)
+
 @dataclass
 class GameState:
     team_names: list[str] = field(default_factory=lambda: ["Team 1", "Team 2"])
     scores:     list[int] = field(default_factory=lambda: [0, 0])
     period:     int = 1
-    time_left:  int = START_SECONDS
-    shot_time:  int = START_24SG
     fouls:      list[int] = field(default_factory=lambda: [0, 0])
     minutes:    list[int] = field(default_factory=lambda: [0, 0])  
-    running:       bool = False
-    shot_running:  bool = False
     minutes_having: bool = False
     minutes_penalized: bool = False
     red_flag_team1: bool = False
@@ -27,6 +115,82 @@ class GameState:
     shot_beep10_done: bool = False
     shot_beep5_done:  bool = False
 
+    # fuente de tiempo monotónico en ns (se puede inyectar un reloj virtual)
+    now: Callable[[], int] = field(default=time.monotonic_ns, repr=False, compare=False)
+
+    # reglamento (ver rules.py); se compila una vez a un calendario de transiciones
+    rules: RuleSet = field(default=LEAGUE, repr=False, compare=False)
+
+    # versión por campo: sube cada vez que cambia lo que se muestra
+    versions: dict[str, int] = field(default_factory=lambda: dict.fromkeys(FIELDS, 0),
+                                     repr=False, compare=False)
+
+    def __post_init__(self):
+        self.schedule = compile_rules(self.rules)
+        self.game_clock = Clock(self.rules.period_s, self.now)
+        self.shot_clock = Clock(self.rules.shot_s, self.now)
+        self._rules_period = None   # período para el que están armadas las marcas
+        self._marks, self._mark_i = (), 0
+        self._next_mark_ns = -1     # próximo vencimiento del reglamento (ns restantes)
+        self._shown_clocks = (None, None)
+        self._listeners = []
+        self._depth = 0
+        self.lock = threading.RLock()
+        self.op_counts = Counter()  # mutaciones por operación (metrics.py las exporta)
+
+    def _touch(self, *names):
+        for n in names:
+            self.versions[n] += 1
+
+    # ---------- Suscriptores (journal, etc.) ----------
+    def subscribe(self, fn):
+        """fn(state, op, args) se llama después de cada mutación."""
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        self._listeners.remove(fn)
+
+    def _emit(self, op, args=()):
+        if self._depth == 0:
+            self.op_counts[op] += 1
+            for fn in self._listeners:
+                fn(self, op, args)
+
+    # ---------- Relojes (se leen, no se descuentan) ----------
+    @property
+    def time_left(self) -> int:
+        return self.game_clock.seconds()
+
+    @time_left.setter
+    def time_left(self, secs: int):
+        self.game_clock.set(secs)
+        self._touch("time")
+
+    @property
+    def shot_time(self) -> int:
+        return self.shot_clock.seconds()
+
+    @shot_time.setter
+    def shot_time(self, secs: int):
+        self.shot_clock.set(secs)
+        self._touch("shot")
+
+    @property
+    def running(self) -> bool:
+        return self.game_clock.running
+
+    @running.setter
+    def running(self, value: bool):
+        self.game_clock.start() if value else self.game_clock.stop()
+
+    @property
+    def shot_running(self) -> bool:
+        return self.shot_clock.running
+
+    @shot_running.setter
+    def shot_running(self, value: bool):
+        self.shot_clock.start() if value else self.shot_clock.stop()
+
     # ---------- Util ----------
     @staticmethod
     def format_mmss(secs: int) -> str:
@@ -44,140 +208,265 @@ class GameState:
 
     # ---------- Lecturas para la UI ----------
     def time_str(self) -> str:
-        return self.format_mmss(self.time_left)
+        return clock_str(self.game_clock.remaining_ns())
 
     def shot_str(self) -> str:
         return f"{clamp(int(self.shot_time), 0, 99):02d}"
 
     def period_str(self) -> str:
-        return f"{self.period}º" if self.period <= 4 else f"OT {self.period - 4}"
+        return self.schedule.period_str(self.period)
     
     # ---------- Mutaciones de estado (sin Tk) ----------
+    @mutation
     def set_names(self, left: str, right: str):
         self.team_names = [left.strip() or "Team 1", right.strip() or "Team 2"]
+        self._touch("names")
 
+    @mutation
     def set_game_time_from_text(self, mmss: str):
         self.time_left = self.parse_mmss(mmss)
 
+    @mutation
     def set_shot_time(self, seconds_text: str):
         if not re.fullmatch(r"\d{1,2}", seconds_text):
             raise ValueError("24SG debe ser 0–99")
         v = int(seconds_text)
-        if v > 24:
-            raise ValueError("24SG máximo 24")
+        if v > self.rules.shot_s:
+            raise ValueError(f"24SG máximo {self.rules.shot_s}")
         self.shot_time = v
 
+    @mutation
     def set_points(self, left: int, right: int):
         self.scores = [clamp(left, 0, 99), clamp(right, 0, 99)]
+        self._touch("scores")
 
+    @mutation
     def add_points(self, team: int, pts: int):
         self.scores[team] = max(0, self.scores[team] + pts)
+        self._touch("scores")
         
+    @mutation
     def add_fouls(self, team: int, count: int):
         self.fouls[team] = max(0, min(5, self.fouls[team] + count))
+        self._touch("fouls")
 
+    # ---------- Reglamento (las transiciones vienen de rules.Schedule) ----------
     def apply_minutes(self):
-        if self.period <= 2 and not self.minutes_having:
-            self.minutes[0] += 2
-            self.minutes[1] += 2
-            self.minutes_having = True
-
-        elif self.period == 3 and self.minutes_having:
-            self.minutes[0] = 3
-            self.minutes[1] = 3
-            
-        if (
-            self.period == 4
-            and self.minutes[0] == 3
-            and self.minutes[1] == 3
-            and self.time_left < 2 * 60
-            and not self.minutes_penalized
-        ):
-            self.minutes[0] -= 1
-            self.minutes[1] -= 1
-            self.minutes_penalized = True
+        """Aplica lo que ya venció: la asignación de un partido nuevo y las marcas cruzadas."""
+        before = tuple(self.minutes)
+        if not self.minutes_having:
+            self._period_start()
+        if self.period != self._rules_period:
+            self._arm_rules()
+        left = self.game_clock.remaining_ns()
+        while left <= self._next_mark_ns:
+            _, transition = self._marks[self._mark_i]
+            transition.apply(self)
+            self._mark_i += 1
+            self._next_mark_ns = self._marks[self._mark_i][0] if self._mark_i < len(self._marks) else -1
+
+        if tuple(self.minutes) != before:
+            self._touch("minutes")
+            self._emit("apply_minutes")
+
+    def _period_start(self):
+        for transition in self.schedule.starts(self.period):
+            transition.apply(self)
+        self._touch("minutes")
 
+    def _arm_rules(self):
+        self._rules_period = self.period
+        self._marks = self.schedule.marks(self.period)
+        self._mark_i = 0
+        self._next_mark_ns = self._marks[0][0] if self._marks else -1
+
+    @mutation
     def add_minutes(self, team: int, count: int):
         if count < 0:
             self.shot_time = 60
             self.shot_running= True
-            self.tick_shot_1s()
-        self.minutes[team] = max(0, min(5, self.minutes[team] + count))
+        self.minutes[team] = clamp(self.minutes[team] + count, 0, self.rules.max_minutes)
+        self._touch("minutes")
         
+    @mutation
     def reset_scores(self):
         self.scores = [0, 0]
+        self._touch("scores")
 
+    @mutation
     def reset_time(self):
-        self.time_left = START_SECONDS
+        self.time_left = self.schedule.period_ns(self.period) // NS_PER_S
+        self._arm_rules()
         self.reset_shot_24()
         self.running = False
         self.shot_running = False
 
-    def reset_shot_24(self):
-        self.shot_time = 24
-        self.shot_running = True
-        self.shot_beep10_done = self.shot_beep5_done = False
+    @mutation
+    def reset_shot_24(self, at=None):
+        self._reset_shot(self.rules.shot_s, at)
+
+    @mutation
+    def reset_shot_14(self, at=None):
+        self._reset_shot(self.rules.shot_reset_s, at)
 
-    def reset_shot_14(self):
-        self.shot_time = 14
-        self.shot_running = True
+    def _reset_shot(self, seconds, at):
+        self.shot_clock.stop()
+        self.shot_time = seconds
+        self.shot_clock.start(at)  # corre desde `at` si el pedido llegó tarde
         self.shot_beep10_done = self.shot_beep5_done = False
 
+    @mutation
     def next_period(self):
         self.period += 1
         self.fouls = [0, 0]
-        self.apply_minutes() 
+        self._touch("period", "fouls")
+        self._period_start()
         self.reset_time()
 
+    @mutation
     def reset_all(self):
         self.scores = [0, 0]
         self.team_names = ["Team 1", "Team 2"]
         self.period = 1
         self.fouls = [0, 0]
-        self.minutes = [2, 2]
+        self.minutes_having = self.minutes_penalized = False
+        self._period_start()
+        self._touch("scores", "names", "period", "fouls")
         self.reset_time()
+
+    # ---------- Copias chicas para deshacer (ver commands.History) ----------
+    def capture(self, *groups):
+        """Tupla inmutable con los grupos pedidos (ver GROUPS: 'scores', 'fouls', 'time', ...)."""
+        return tuple((g, _CAPTURE[g](self)) for g in groups)
+
+    @mutation
+    def restore(self, captured):
+        for g, value in captured:
+            _RESTORE[g](self, value)
+            self._touch(g)
     
-    # ---------- “Ticks” de 1 segundo (la UI los llama con after) ----------
+    # ---------- Muestreo de relojes (la UI los consulta cada frame) ----------
+    def sample_clocks(self):
+        """Sube la versión de 'time'/'shot' sólo si cambió el texto que se ve."""
+        t, sh = self.time_str(), self.shot_str()
+        shown_t, shown_sh = self._shown_clocks
+        if t != shown_t:
+            self._touch("time")
+        if sh != shown_sh:
+            self._touch("shot")
+        self._shown_clocks = (t, sh)
+
     # Devuelven flags para que la UI sepa si debe parpadear, etc.
-    def tick_game_1s(self) -> bool:
+    # Con el hilo de relojes (timing.ClockThread) se llaman con state.lock tomado.
+    def poll_game(self) -> bool:
         if not self.running:
             return False
-        if self.time_left > 0:
-            self.apply_minutes() 
-            self.time_left -= 1
+        left = self.game_clock.remaining_ns()
+        # El reglamento sólo se consulta al cruzar una marca o cambiar de período
+        if left <= self._next_mark_ns or self.period != self._rules_period:
+            self.apply_minutes()
+        if left > 0:
             return False
-        else:
-            self.running = False
-            return True  # llegó a 0
+        self.game_clock.stop()
+        self._emit("clock")
+        return True  # llegó a 0
 
-    def tick_shot_1s(self):
+    def poll_shot(self):
         if not self.shot_running:
             return None
 
+        secs = self.shot_time
         evt = None
-        # Marca eventos, pero NO retornes aún
-        if self.shot_time == 10 and not self.shot_beep10_done:
+        if secs <= 10 and not self.shot_beep10_done:
             self.shot_beep10_done = True
             evt = "shot10"
-        if self.shot_time == 5 and not self.shot_beep5_done:
+        if secs <= 5 and not self.shot_beep5_done:
             self.shot_beep5_done = True
-            # si ya venía "shot10", mantén el primero o prioriza "shot5"
-            evt = evt or "shot5"
+            # si la UI se atrasó y se saltó el de 10, prioriza "shot5"
+            evt = "shot5"
 
-        # Ahora sí, avanza el reloj
-        if self.shot_time > 0:
-            self.shot_time -= 1
+        if secs > 0:
             return evt
 
         # Llegó a 0
-        self.shot_running = False
+        self.shot_clock.stop()
+        self._emit("clock")
         return "shot0"
 
-    def toggle_game(self):
-        self.running = not self.running
-        
+    def next_due_ns(self):
+        """ns hasta lo próximo que poll_game/poll_shot tienen que ver (None: relojes detenidos)."""
+        due = []
+        if self.running:
+            left = self.game_clock.remaining_ns()
+            due.append(left)
+            if self._next_mark_ns >= 0:
+                due.append(left - self._next_mark_ns)
+        if self.shot_running:
+            left = self.shot_clock.remaining_ns()
+            due.append(left)
+            if not self.shot_beep10_done:
+                due.append(left - 10 * NS_PER_S)
+            if not self.shot_beep5_done:
+                due.append(left - 5 * NS_PER_S)
+        return max(0, min(due)) if due else None
 
-    def toggle_shot(self):
-        self.shot_running = not self.shot_running
-        
-            
+    def next_frame_ns(self):
+        """ns hasta que cambie el texto de algún reloj en pantalla (None: ambos detenidos)."""
+        due = []
+        if self.running:
+            left = self.game_clock.remaining_ns()
+            step = NS_PER_TENTH if left <= 60 * NS_PER_S else NS_PER_S  # último minuto en décimas
+            due.append(left % step or step)
+        if self.shot_running:
+            left = self.shot_clock.remaining_ns()
+            due.append(left % NS_PER_S or NS_PER_S)
+        return min(due) if due else None
+
+    @mutation
+    def toggle_game(self, at=None):
+        _toggle(self.game_clock, at)
+
+    @mutation
+    def toggle_shot(self, at=None):
+        _toggle(self.shot_clock, at)
+
+
+def _toggle(clock, at):
+    clock.stop(at) if clock.running else clock.start(at)
+
+
+def _restore_clock(clock, value):
+    remaining_ns, running = value
+    clock.stop()
+    clock.set_ns(remaining_ns)
+    if running:
+        clock.start()
+
+def _restore_shot(state, value):
+    *clock, state.shot_beep10_done, state.shot_beep5_done = value
+    _restore_clock(state.shot_clock, clock)
+
+def _restore_minutes(state, value):
+    minutes, state.minutes_having, state.minutes_penalized = value
+    state.minutes = list(minutes)
+
+_CAPTURE = {
+    "scores":  lambda s: tuple(s.scores),
+    "fouls":   lambda s: tuple(s.fouls),
+    "minutes": lambda s: (tuple(s.minutes), s.minutes_having, s.minutes_penalized),
+    "period":  lambda s: s.period,
+    "time":    lambda s: (s.game_clock.remaining_ns(), s.running),
+    "shot":    lambda s: (s.shot_clock.remaining_ns(), s.shot_running,
+                          s.shot_beep10_done, s.shot_beep5_done),
+    "names":   lambda s: tuple(s.team_names),
+}
+_RESTORE = {
+    "scores":  lambda s, v: setattr(s, "scores", list(v)),
+    "fouls":   lambda s, v: setattr(s, "fouls", list(v)),
+    "minutes": _restore_minutes,
+    "period":  lambda s, v: setattr(s, "period", v),
+    "time":    lambda s, v: _restore_clock(s.game_clock, v),
+    "shot":    _restore_shot,
+    "names":   lambda s, v: setattr(s, "team_names", list(v)),
+}
+GROUPS = tuple(_CAPTURE)  # todo lo que capture()/restore() saben copiar
@@ -0,0 +1,136 @@
+# metrics.py
+"""
+Métricas de funcionamiento en vivo.
+- Histogram: cubetas fijas en ms; observe() es una búsqueda binaria y un
+  incremento, pensado para llamarse varias veces por frame.
+- Metrics junta los histogramas y contadores del marcador y los escribe en
+  formato de texto de Prometheus.
+- MetricsServer sirve GET /metrics en un hilo aparte (http.server se importa
+  recién al arrancarlo).
+"""
+from bisect import bisect_left
+from collections import Counter
+import threading
+
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000, 2500)
+PORT = 9477
+
+
+class Histogram:
+    __slots__ = ("name", "help", "bounds", "counts", "sum", "count")
+
+    def __init__(self, name, help, bounds=BUCKETS_MS):
+        self.name = name
+        self.help = help
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # la última es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, ms):
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.sum += ms
+        self.count += 1
+
+    def quantile(self, q) -> float:
+        """Estimación por cubetas (borde superior); alcanza para el overlay."""
+        if not self.count:
+            return 0.0
+        target, acc = q * self.count, 0
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            acc += n
+            if acc >= target:
+                return bound if bound != float("inf") else self.bounds[-1]
+        return self.bounds[-1]
+
+    def exposition(self, prefix):
+        name = f"{prefix}_{self.name}"
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} histogram"]
+        acc = 0
+        for bound, n in zip(self.bounds, self.counts):
+            acc += n
+            lines.append(f'{name}_bucket{{le="{bound}"}} {acc}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum:.3f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class Metrics:
+    """Histogramas del marcador (en ms) + contadores de mutaciones de GameState."""
+    PREFIX = "marcador"
+
+    def __init__(self):
+        self.tick_late   = Histogram("tick_late_ms", "Atraso del muestreo de relojes respecto de lo pedido a after()")
+        self.render      = Histogram("render_ms", "Duración de _refresh_all por frame")
+        self.key_latency = Histogram("key_to_render_ms", "Tecla -> render terminado en pantalla")
+        self.audio       = Histogram("audio_cue_ms", "Evento -> inicio del audio (incluye el buffer del mixer)")
+        self.event_late  = Histogram("clock_event_late_ms", "Atraso de fin de período / 24s en el hilo de relojes")
+        self.remote      = Histogram("remote_command_ms", "Comando remoto: toque en la tablet -> aplicado al estado")
+        self.led         = Histogram("led_frame_ms", "Cambio en el tablero -> frame escrito al controlador LED")
+        self.histograms = (self.tick_late, self.render, self.key_latency, self.audio, self.event_late,
+                           self.remote, self.led)
+        self.wakeups = Counter()   # frames de la UI por modo ("idle", "1hz", "10hz", ...)
+        self.state = None
+
+    def watch(self, state):
+        """Exporta los contadores de mutaciones de `state` (GameState.op_counts)."""
+        self.state = state
+
+    def exposition(self) -> str:
+        lines = []
+        for h in self.histograms:
+            lines += h.exposition(self.PREFIX)
+        if self.wakeups:
+            name = f"{self.PREFIX}_ui_wakeups_total"
+            lines += [f"# HELP {name} Frames de la UI por modo del planificador", f"# TYPE {name} counter"]
+            lines += [f'{name}{{mode="{mode}"}} {n}' for mode, n in sorted(self.wakeups.items())]
+        counts = getattr(self.state, "op_counts", None)
+        if counts:
+            name = f"{self.PREFIX}_mutations_total"
+            lines += [f"# HELP {name} Mutaciones de GameState por operación", f"# TYPE {name} counter"]
+            lines += [f'{name}{{op="{op}"}} {n}' for op, n in sorted(counts.items())]
+        return "\n".join(lines) + "\n"
+
+    def overlay_text(self) -> str:
+        lines = [f"{h.name:20s} p50 {h.quantile(0.5):6.2f}  p99 {h.quantile(0.99):6.2f}  n={h.count}"
+                 for h in self.histograms]
+        lines.append("wakeups " + "  ".join(f"{m}={n}" for m, n in sorted(self.wakeups.items())))
+        return "\n".join(lines)
+
+
+class MetricsServer:
+    """GET /metrics en host:port (por defecto sólo local)."""
+    def __init__(self, metrics, host="127.0.0.1", port=PORT):
+        self.metrics = metrics
+        self.host, self.port = host, port
+        self.httpd = None
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.exposition().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
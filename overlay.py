@@ -0,0 +1,239 @@
+# overlay.py
+"""
+Salida de video sin ventana: el "score bug" para OBS/vMix en memoria compartida.
+- El archivo mapeado (en /dev/shm si existe) tiene un encabezado y DOS
+  cuadros RGBA. Se dibuja en el de atrás y se publica cambiando `front`;
+  un consumidor local lee el de adelante con mmap, sin copias.
+- Cada cuadro lleva un contador tipo seqlock: impar mientras se escribe.
+  El lector compara el contador antes y después de leer.
+- Los caracteres salen de un atlas de glifos pre-renderizado con PIL; un
+  texto se "dibuja" copiando filas del atlas (slices de memoryview).
+- Sólo se redibujan las regiones cuyo texto cambió respecto de lo que ese
+  cuadro ya tenía; nunca se copia el cuadro entero.
+"""
+import mmap, os, struct, tempfile, threading, time
+
+# magic, versión, ancho, alto, stride, front, (reservado), seq cuadro 0, seq cuadro 1
+HEADER = struct.Struct("<4sHHHIB3xQQ")
+MAGIC = b"MRCO"
+VERSION = 1
+FRONT_OFF = 14                      # offset del byte `front` dentro del encabezado
+SEQ_OFF = (HEADER.size - 16, HEADER.size - 8)
+DATA_OFF = 64                       # los cuadros arrancan alineados
+
+WIDTH, HEIGHT = 960, 96
+BG    = (10, 10, 10, 230)
+WHITE = (255, 255, 255, 255)
+GREEN = (0, 255, 127, 255)
+GOLD  = (255, 215, 0, 255)
+RED   = (255, 43, 43, 255)
+CHARSET = "".join(chr(c) for c in range(32, 127)) + "ºáéíóúñÁÉÍÓÚÑ"
+
+# región -> (getter, x, y, ancho, alto, tamaño de letra, alineación, color)
+REGIONS = {
+    "name_left":   (lambda s: s.team_names[0][:14],   8,   8, 248, 36, 28, "left",   WHITE),
+    "score_left":  (lambda s: str(s.scores[0]),     256,   4, 112, 88, 72, "right",  GREEN),
+    "fouls_left":  (lambda s: f"F {s.fouls[0]}",      8,  52, 120, 36, 26, "left",   GREEN),
+    "flag_left":   (lambda s: s.fouls[0] >= 5,      132,  56,  28, 28,  0, "box",    RED),
+    "period":      (lambda s: s.period_str(),       384,   4, 192, 30, 26, "center", GOLD),
+    "time":        (lambda s: s.time_str(),         384,  34, 192, 60, 54, "center", WHITE),
+    "shot":        (lambda s: s.shot_str(),         576,  30,  64, 60, 48, "center", GOLD),
+    "score_right": (lambda s: str(s.scores[1]),     640,   4, 112, 88, 72, "left",   GREEN),
+    "flag_right":  (lambda s: s.fouls[1] >= 5,      800,  56,  28, 28,  0, "box",    RED),
+    "fouls_right": (lambda s: f"F {s.fouls[1]}",    832,  52, 120, 36, 26, "right",  GREEN),
+    "name_right":  (lambda s: s.team_names[1][:14], 704,   8, 248, 36, 28, "right",  WHITE),
+}
+
+
+def default_path():
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "marcador_overlay.rgba")
+
+
+class GlyphAtlas:
+    """Todos los caracteres de CHARSET en una tira RGBA (tamaño y color fijos)."""
+    def __init__(self, size, color, bg=BG):
+        from PIL import Image, ImageDraw, ImageFont
+        font = None
+        for name in ("arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf"):
+            try:
+                font = ImageFont.truetype(name, size)
+                break
+            except OSError:
+                pass
+        if font is None:
+            font = ImageFont.load_default(size)
+        ascent, descent = font.getmetrics()
+        self.height = ascent + descent
+        self.x, self.w = {}, {}
+        x = 0
+        for ch in CHARSET:
+            self.x[ch] = x
+            self.w[ch] = max(1, int(round(font.getlength(ch))))
+            x += self.w[ch]
+        img = Image.new("RGBA", (x, self.height), bg)
+        draw = ImageDraw.Draw(img)
+        for ch in CHARSET:
+            draw.text((self.x[ch], 0), ch, font=font, fill=color)
+        self.stride = x * 4
+        self.pixels = memoryview(img.tobytes())
+
+    def width(self, text):
+        return sum(self.w.get(ch, self.w["?"]) for ch in text)
+
+
+class OverlayWriter:
+    """
+    Dibuja `state` (GameState, MirrorState o Court) en el archivo mapeado.
+    - frame(): un cuadro ahora (devuelve cuántas regiones se redibujaron)
+    - start(fps): hilo propio a fps fijos; stop() lo frena
+    """
+    def __init__(self, state, path=None, width=WIDTH, height=HEIGHT):
+        self.state = state
+        self.path = path or default_path()
+        self.width, self.height = width, height
+        self.stride = width * 4
+        self.frame_size = self.stride * height
+        size = DATA_OFF + 2 * self.frame_size
+
+        with open(self.path, "w+b") as f:
+            f.truncate(size)
+            self.map = mmap.mmap(f.fileno(), size)
+        self.mv = memoryview(self.map)
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, VERSION, width, height, self.stride, 0, 0, 0)
+        self.seq = [0, 0]
+        self.front = 0
+
+        self._atlases = {}
+        self._bg_row = bytes(BG) * width
+        self.shown = [{}, {}]       # por cuadro: región -> valor ya dibujado
+        for b in (0, 1):
+            self._fill(b, 0, 0, width, height, self._bg_row)
+        self.frames = 0
+        self.regions_drawn = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _atlas(self, size, color):
+        key = (size, color)
+        if key not in self._atlases:
+            self._atlases[key] = GlyphAtlas(size, color)
+        return self._atlases[key]
+
+    # ---------- Dibujo ----------
+    def _base(self, b):
+        return DATA_OFF + b * self.frame_size
+
+    def _fill(self, b, x, y, w, h, row):
+        mv, stride = self.mv, self.stride
+        off = self._base(b) + y * stride + x * 4
+        chunk = row[:w * 4]
+        for _ in range(h):
+            mv[off:off + w * 4] = chunk
+            off += stride
+
+    def _draw_text(self, b, text, x, y, w, h, size, align, color):
+        self._fill(b, x, y, w, h, self._bg_row)
+        atlas = self._atlas(size, color)
+        tw = min(atlas.width(text), w)
+        if align == "right":
+            cx = x + w - tw
+        elif align == "center":
+            cx = x + (w - tw) // 2
+        else:
+            cx = x
+        rows = min(atlas.height, h)
+        top = y + (h - rows) // 2
+        mv, stride, src = self.mv, self.stride, atlas.pixels
+        base = self._base(b) + top * stride
+        for ch in text:
+            if ch not in atlas.x:
+                ch = "?"
+            gw = min(atlas.w[ch], x + w - cx)
+            if gw <= 0:
+                break
+            d = base + cx * 4
+            s = atlas.x[ch] * 4
+            for _ in range(rows):
+                mv[d:d + gw * 4] = src[s:s + gw * 4]
+                d += stride
+                s += atlas.stride
+            cx += gw
+
+    def _draw_box(self, b, on, x, y, w, h, color):
+        self._fill(b, x, y, w, h, bytes(color if on else BG) * w)
+
+    def frame(self) -> int:
+        """Dibuja el cuadro de atrás con lo que cambió y lo publica."""
+        st = self.state
+        b = 1 - self.front
+        shown = self.shown[b]
+        seq_off = SEQ_OFF[b]
+        self.seq[b] += 1                                    # impar: escribiendo
+        struct.pack_into("<Q", self.map, seq_off, self.seq[b])
+        drawn = 0
+        for name, (getter, x, y, w, h, size, align, color) in REGIONS.items():
+            value = getter(st)
+            if shown.get(name) == value:
+                continue
+            if align == "box":
+                self._draw_box(b, value, x, y, w, h, color)
+            else:
+                self._draw_text(b, value, x, y, w, h, size, align, color)
+            shown[name] = value
+            drawn += 1
+        self.seq[b] += 1                                    # par: cuadro completo
+        struct.pack_into("<Q", self.map, seq_off, self.seq[b])
+        self.map[FRONT_OFF] = b
+        self.front = b
+        self.frames += 1
+        self.regions_drawn += drawn
+        return drawn
+
+    # ---------- Hilo ----------
+    def start(self, fps=30):
+        period = 1.0 / fps
+
+        def run():
+            nxt = time.perf_counter()
+            while not self._stop.is_set():
+                self.frame()
+                nxt += period
+                delay = nxt - time.perf_counter()
+                if delay < 0:           # atrasado: no acumula cuadros pendientes
+                    nxt, delay = time.perf_counter(), 0
+                self._stop.wait(delay)
+
+        self._thread = threading.Thread(target=run, name="overlay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.mv.release()
+        self.map.close()
+
+
+class OverlayReader:
+    """Lado del consumidor: latest() da un memoryview del cuadro publicado (sin copiar)."""
+    def __init__(self, path=None):
+        with open(path or default_path(), "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, self.stride, _, _, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("no es un overlay del marcador")
+        self.frame_size = self.stride * self.height
+        self.mv = memoryview(self.map)
+
+    def latest(self):
+        """(seq, memoryview RGBA) del cuadro de adelante; usar valid(seq) al terminar de leerlo."""
+        b = self.map[FRONT_OFF]
+        seq = struct.unpack_from("<Q", self.map, SEQ_OFF[b])[0]
+        off = DATA_OFF + b * self.frame_size
+        return (b, seq), self.mv[off:off + self.frame_size]
+
+    def valid(self, token) -> bool:
+        b, seq = token
+        return seq % 2 == 0 and struct.unpack_from("<Q", self.map, SEQ_OFF[b])[0] == seq
@@ -0,0 +1,259 @@
+# plays.py
+"""
+Jugada por jugada (play-by-play) y planilla (box score).
+- PlayLog guarda cada evento en columnas array() (como courts.CourtTable):
+  reloj, período, equipo, jugador, tipo, valor y el marcador después.
+- Índices por equipo, por (equipo, jugador) y por período: listas de filas.
+- Planilla, parciales por período y rachas se actualizan al agregar cada
+  fila (O(1) por evento), nunca recorriendo el partido.
+- Exportación por streaming a CSV o Parquet (pyarrow, opcional): se escribe
+  partido por partido, así un torneo entero no tiene que estar en memoria.
+Se engancha a GameState con attach(): los puntos salen de la diferencia de
+marcador, así también quedan registradas las correcciones y los deshacer.
+"""
+from array import array
+import csv, os, time
+
+from logic import clock_str
+
+KINDS = ("points", "foul", "timeout")
+POINTS, FOUL, TIMEOUT = range(3)
+FOUL_TYPES = ("", "personal", "technical", "unsportsmanlike", "disqualifying")
+NO_PLAYER = -1
+LOOKBACK = 8  # filas hacia atrás para atribuir una corrección a su jugador
+
+# columna -> typecode de array (y tipo de pyarrow al exportar)
+COLUMNS = {
+    "wall_ns": "q", "game_ns": "q", "period": "h", "team": "b", "player": "b",
+    "kind": "B", "value": "h", "detail": "B", "score0": "h", "score1": "h",
+}
+CSV_HEADER = ("game", "period", "clock", "team", "player", "kind", "value", "detail",
+              "score0", "score1")
+
+
+class BoxLine:
+    """Una línea de la planilla: puntos, libres, dobles, triples y faltas."""
+    __slots__ = ("points", "ft", "fg2", "fg3", "fouls")
+
+    def __init__(self):
+        self.points = self.ft = self.fg2 = self.fg3 = self.fouls = 0
+
+    def add(self, kind, value):
+        if kind == POINTS:
+            self.points += value
+            sign = 1 if value > 0 else -1
+            made = abs(value)
+            if made == 1:
+                self.ft += sign
+            elif made == 2:
+                self.fg2 += sign
+            elif made == 3:
+                self.fg3 += sign
+        elif kind == FOUL:
+            self.fouls += value
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class PlayLog:
+    def __init__(self, now=time.monotonic_ns):
+        self.now = now
+        self.cols = {name: array(code) for name, code in COLUMNS.items()}
+        self.n = 0
+        # índices: filas de cada equipo / jugador / período
+        self.by_team = ([], [])
+        self.by_player = {}
+        self.by_period = {}
+        # agregados incrementales
+        self.box = {}                        # (equipo, jugador) -> BoxLine
+        self.period_points = {}              # (período, equipo) -> puntos
+        self.run_team, self.run_points = None, 0
+        self.best_run = [0, 0]
+        # número que cargó el operador para el próximo punto/falta (teclado numérico)
+        self.player = NO_PLAYER
+        self.foul_type = FOUL_TYPES.index("personal")
+        self._score = [0, 0]
+        self._fouls = [0, 0]
+        self._period = 1
+        self._spilled = 0
+
+    # ---------- Alta de eventos ----------
+    def add(self, state, team, player, kind, value, detail=0) -> int:
+        """Agrega una fila con el reloj y el marcador de `state`; devuelve su número."""
+        return self._append((self.now(), state.game_clock.remaining_ns(), state.period, team, player,
+                             kind, value, detail, state.scores[0], state.scores[1]))
+
+    def _append(self, row) -> int:
+        """Fila en el orden de COLUMNS, con sus índices y agregados."""
+        i = self.n
+        for col, v in zip(self.cols.values(), row):
+            col.append(v)
+        self.n += 1
+
+        _, _, period, team, player, kind, value = row[:7]
+        self.by_team[team].append(i)
+        self.by_player.setdefault((team, player), []).append(i)
+        self.by_period.setdefault(period, []).append(i)
+        line = self.box.get((team, player))
+        if line is None:
+            line = self.box[(team, player)] = BoxLine()
+        line.add(kind, value)
+        if kind == POINTS:
+            key = (period, team)
+            self.period_points[key] = self.period_points.get(key, 0) + value
+            self._update_run(team, value)
+        return i
+
+    def _update_run(self, team, pts):
+        if pts > 0 and self.run_team != team:
+            self.run_team, self.run_points = team, 0
+        if self.run_team == team:
+            self.run_points = max(0, self.run_points + pts)
+            self.best_run[team] = max(self.best_run[team], self.run_points)
+
+    def type_digit(self, d):
+        """Carga el número del jugador del próximo evento, dígito a dígito (0–99)."""
+        self.player = (max(self.player, 0) * 10 + d) % 100
+
+    def _take_player(self):
+        p, self.player = self.player, NO_PLAYER
+        return p
+
+    def _corrected_player(self, team, kind, value):
+        """Jugador de la última fila de `team` que `value` deshace (si la hay cerca)."""
+        rows = self.by_team[team]
+        c = self.cols
+        for i in reversed(rows[-LOOKBACK:]):
+            if c["kind"][i] == kind and c["value"][i] == -value:
+                return c["player"][i]
+        return NO_PLAYER
+
+    # ---------- Enganche con GameState ----------
+    def attach(self, state):
+        self._score = list(state.scores)
+        self._fouls = list(state.fouls)
+        self._period = state.period
+        state.subscribe(self.on_mutation)
+
+    def on_mutation(self, state, op, args):
+        if op in ("reset_all", "reset_scores"):  # partido nuevo, no son jugadas
+            self._score = list(state.scores)
+        if state.period != self._period:  # período nuevo: las faltas de equipo vuelven a 0
+            self._period = state.period
+            self._fouls = list(state.fouls)
+
+        for team in (0, 1):
+            delta = state.scores[team] - self._score[team]
+            if delta:
+                self._score[team] = state.scores[team]
+                if op == "add_points" and delta > 0:
+                    player = self._take_player()
+                else:
+                    player = self._corrected_player(team, POINTS, delta)
+                self.add(state, team, player, POINTS, delta)
+
+        if op == "add_fouls":
+            team, count = args
+            player = self._take_player() if count > 0 else self._corrected_player(team, FOUL, count)
+            self.add(state, team, player, FOUL, count, self.foul_type if count > 0 else 0)
+        elif op == "add_minutes" and args[1] < 0:
+            team = args[0]
+            self.add(state, team, NO_PLAYER, TIMEOUT, -args[1])
+        elif op == "restore":
+            for team in (0, 1):
+                delta = state.fouls[team] - self._fouls[team]
+                if delta:
+                    self.add(state, team, self._corrected_player(team, FOUL, delta), FOUL, delta)
+        self._fouls = list(state.fouls)
+
+    # ---------- Lecturas ----------
+    def box_score(self, team):
+        """[(jugador, {puntos, ft, fg2, fg3, faltas})] ordenado por número."""
+        return sorted((p, line.as_dict()) for (t, p), line in self.box.items() if t == team)
+
+    def splits(self):
+        """{período: (puntos equipo 0, puntos equipo 1)}"""
+        periods = sorted({p for p, _ in self.period_points})
+        return {p: (self.period_points.get((p, 0), 0), self.period_points.get((p, 1), 0))
+                for p in periods}
+
+    def row(self, i) -> dict:
+        return {name: col[i] for name, col in self.cols.items()}
+
+    def rows(self, start=0, stop=None):
+        c = self.cols
+        for i in range(start, self.n if stop is None else stop):
+            yield tuple(c[name][i] for name in COLUMNS)
+
+    # ---------- Persistencia (partido en curso, ver ui._save_game) ----------
+    def dump(self) -> dict:
+        return {"rows": [list(r) for r in self.rows()], "spilled": self._spilled}
+
+    def load(self, data):
+        """Vuelve a cargar lo de dump() en un PlayLog vacío (antes de attach())."""
+        for row in data.get("rows", ()):
+            self._append(tuple(row))
+        self._spilled = min(data.get("spilled", 0), self.n)
+
+    # ---------- Exportación ----------
+    def spill(self, sink, game=""):
+        """Manda a `sink` las filas que todavía no salieron."""
+        sink.write(self, game, self._spilled, self.n)
+        self._spilled = self.n
+
+
+class CsvSink:
+    """CSV que crece partido a partido; una fila por evento."""
+    def __init__(self, path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.f = open(path, "a", newline="", encoding="utf-8")
+        self.w = csv.writer(self.f)
+        if new:
+            self.w.writerow(CSV_HEADER)
+
+    def write(self, log, game, start, stop):
+        c = log.cols
+        for i in range(start, stop):
+            self.w.writerow((game, c["period"][i], clock_str(c["game_ns"][i]), c["team"][i],
+                             "" if c["player"][i] == NO_PLAYER else c["player"][i],
+                             KINDS[c["kind"][i]], c["value"][i], FOUL_TYPES[c["detail"][i]],
+                             c["score0"][i], c["score1"][i]))
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetSink:
+    """Parquet con un row group por write(); las columnas salen de los array() sin copiarlas."""
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.types = {"q": pa.int64(), "h": pa.int16(), "b": pa.int8(), "B": pa.uint8()}
+        fields = [pa.field("game", pa.string())]
+        fields += [pa.field(name, self.types[code]) for name, code in COLUMNS.items()]
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, log, game, start, stop):
+        pa = self.pa
+        n = stop - start
+        if not n:
+            return
+        arrays = [pa.array([game] * n, pa.string())]
+        for name, code in COLUMNS.items():
+            col = log.cols[name]
+            buf = pa.py_buffer(col)[start * col.itemsize:stop * col.itemsize]
+            arrays.append(pa.Array.from_buffers(self.types[code], n, [None, buf]))
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def export(games, sink):
+    """games: iterable (perezoso) de (id de partido, PlayLog); se escriben de a uno."""
+    for game, log in games:
+        sink.write(log, game, 0, log.n)
@@ -0,0 +1,252 @@
+# remote.py
+"""
+Control remoto del marcador desde tablets en la mesa de control (TCP, red local).
+- Protocolo: una línea JSON por mensaje.
+    cliente -> {"op": "add_points", "args": [0, 2], "t": ns, "id": 7}
+    servidor -> {"ping": ns}   cliente -> {"pong": ns del ping, "t": ns}
+    servidor -> {"ack": [7, 8, ...]} cuando ya están aplicados al estado
+  `t` es el reloj monotónico del cliente en el momento del toque.
+- Cada conexión estima la diferencia entre su reloj y el nuestro con los
+  ping/pong (se queda con la muestra de menor ida y vuelta, como NTP). Un
+  comando de relojes se aplica en el instante en que se tocó, no en el que
+  llegó: un "parar" que tardó 120 ms por Wi-Fi devuelve esos 120 ms.
+- Los comandos entran a la misma CommandQueue que el teclado (historial de
+  deshacer incluido). Todo lo que llega en una vuelta del loop se aplica
+  junto, con state.lock tomado: una ráfaga es una sola actualización.
+"""
+from collections import deque
+import asyncio, hmac, json, threading, time
+
+from broadcast import _run_loop
+from commands import (AddFouls, AddMinutes, AddPoints, NextPeriod, Redo, ResetShot,
+                      ToggleClocks, ToggleShot, Undo)
+
+PORT = 47475
+PING_S = 2.0
+MAX_COMP_MS = 750   # no se reescribe más que esto del pasado (un reloj de tablet roto)
+SAMPLES = 8         # muestras de ping/pong que se miran para el offset
+LOOPBACK = ("127.0.0.1", "localhost", "::1")
+
+_team = lambda v: v in (0, 1)
+# op -> (validadores de args, armado del comando con `at`)
+OPS = {
+    "toggle_game":   ((), lambda at: ToggleClocks(at)),
+    "toggle_shot":   ((), lambda at: ToggleShot(at)),
+    "reset_shot_24": ((), lambda at: ResetShot(24, at)),
+    "reset_shot_14": ((), lambda at: ResetShot(14, at)),
+    "next_period":   ((), lambda at: NextPeriod()),
+    "add_points":    ((_team, lambda v: v in (-3, -2, -1, 1, 2, 3)), lambda at, t, v: AddPoints(t, v)),
+    "add_fouls":     ((_team, lambda v: v in (-1, 1)), lambda at, t, v: AddFouls(t, v)),
+    "add_minutes":   ((_team, lambda v: v in (-1, 1)), lambda at, t, v: AddMinutes(t, v)),
+    "undo":          ((), lambda at: Undo()),
+    "redo":          ((), lambda at: Redo()),
+}
+
+
+def build(msg, at):
+    """Comando de un mensaje {"op", "args"}; ValueError si no es válido."""
+    op, args = msg.get("op"), msg.get("args") or []
+    if op not in OPS:
+        raise ValueError(f"operación desconocida: {op!r}")
+    checks, make = OPS[op]
+    if len(args) != len(checks) or not all(isinstance(a, int) and ok(a) for ok, a in zip(checks, args)):
+        raise ValueError(f"argumentos inválidos para {op}: {args!r}")
+    return make(at, *args)
+
+
+class ClockSync:
+    """Offset reloj del cliente - reloj local, de la muestra con menor ida y vuelta."""
+    def __init__(self):
+        self.samples = deque(maxlen=SAMPLES)   # (rtt, offset)
+        self.offset = None
+        self.rtt = None
+
+    def add(self, sent_ns, client_ns, recv_ns):
+        rtt = recv_ns - sent_ns
+        self.samples.append((rtt, client_ns - (sent_ns + recv_ns) // 2))
+        self.rtt, self.offset = min(self.samples)
+
+    def to_local(self, client_ns, now_ns):
+        """Instante local de `client_ns`, recortado a [now - MAX_COMP_MS, now]."""
+        if self.offset is None:
+            return now_ns
+        return max(now_ns - MAX_COMP_MS * 1_000_000, min(now_ns, client_ns - self.offset))
+
+
+class RemoteServer:
+    """
+    - commands: la CommandQueue de la UI; se vacía acá (con state.lock)
+    - on_applied: fn() después de cada ráfaga aplicada, en el hilo de red y ya
+      sin state.lock (la UI lo usa para despertarse y repintar)
+    - token: si se da, la primera línea de cada tablet es {"hello": token}.
+      Sin token sólo escucha en la máquina (127.0.0.1); con token, en la red.
+    """
+    def __init__(self, state, commands, host=None, port=PORT, token=None, ping_s=PING_S,
+                 now=time.monotonic_ns):
+        if host is None:
+            host = "127.0.0.1" if token is None else "0.0.0.0"
+        elif token is None and host not in LOOPBACK:
+            raise ValueError("para escuchar en la red hace falta un token")
+        self.state = state
+        self.commands = commands
+        self.host, self.port = host, port
+        self.token = token
+        self.ping_s = ping_s
+        self.now = now
+        self.applied = 0                       # comandos aplicados
+        self.batches = 0                       # actualizaciones de estado (una por ráfaga)
+        self.latency_ns = deque(maxlen=4096)   # toque en la tablet -> aplicado
+        self.observe_latency = None            # fn(ms), p.ej. Metrics.remote.observe
+        self.on_applied = None
+        self.clients = set()
+        self._batch = []                       # (toque en reloj local, writer, id)
+        self._flush_scheduled = False
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+
+    def start(self):
+        async def setup():
+            self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        ready = threading.Event()
+        threading.Thread(target=_run_loop, args=(self.loop, ready, setup),
+                         name="remote", daemon=True).start()
+        ready.wait()
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        if self.server is None:
+            return  # nunca empezó a escuchar
+        async def _stop():
+            self.server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:      # conexiones y pings: terminan limpias antes de parar el loop
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            asyncio.run_coroutine_threadsafe(_stop(), self.loop).result(timeout=2)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # ---------- Hilo de red ----------
+    async def _serve(self, reader, writer):
+        sync = ClockSync()
+        pinger = None
+        try:
+            if self.token is not None:
+                try:
+                    hello = json.loads(await reader.readline() or b"{}")
+                    ok = hmac.compare_digest(str(hello.get("hello", "")), self.token)
+                except (ValueError, AttributeError, TypeError):
+                    ok = False  # saludo que no es JSON o no es un objeto
+                if not ok:
+                    writer.write(b'{"error":"token"}\n')
+                    return
+            self.clients.add(writer)
+            pinger = self.loop.create_task(self._ping(writer))
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                recv = self.now()
+                try:
+                    msg = json.loads(line)
+                    if "pong" in msg:
+                        sync.add(msg["pong"], msg["t"], recv)
+                        continue
+                    at = sync.to_local(msg["t"], recv) if "t" in msg else recv
+                    self.commands.push(build(msg, at))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    writer.write(json.dumps({"error": str(e), "id": _msg_id(line)}).encode() + b"\n")
+                    continue
+                self._batch.append((at, writer, msg.get("id")))
+                if not self._flush_scheduled:
+                    # lo que ya está en los buffers se lee en esta misma vuelta del loop
+                    self._flush_scheduled = True
+                    self.loop.call_soon(self._flush)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            if pinger:
+                pinger.cancel()
+            self.clients.discard(writer)
+            writer.close()
+
+    async def _ping(self, writer):
+        while True:
+            writer.write(json.dumps({"ping": self.now()}).encode() + b"\n")
+            await asyncio.sleep(self.ping_s)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        batch, self._batch = self._batch, []
+        with self.state.lock:
+            self.applied += self.commands.drain(self.state)
+        self.batches += 1
+        now = self.now()
+        acks = {}
+        for at, writer, msg_id in batch:
+            self.latency_ns.append(now - at)
+            if self.observe_latency:
+                self.observe_latency((now - at) / 1e6)
+            if msg_id is not None:
+                acks.setdefault(writer, []).append(msg_id)
+        for writer, ids in acks.items():
+            if writer in self.clients:
+                writer.write(json.dumps({"ack": ids}).encode() + b"\n")
+        if self.on_applied:  # después de los ack: que la UI no los demore
+            self.on_applied()
+
+
+def _msg_id(line):
+    try:
+        return json.loads(line).get("id")
+    except (ValueError, AttributeError):
+        return None
+
+
+class RemoteClient:
+    """Tablet (o prueba de carga): contesta los ping solo; send() marca la hora del toque."""
+    def __init__(self, host, port=PORT, token=None, now=time.monotonic_ns):
+        self.host, self.port, self.token = host, port, token
+        self.now = now
+        self.next_id = 0
+        self.acked = {}          # id -> hora local del ack
+        self.sent = {}           # id -> hora local del toque
+        self.reader = self.writer = None
+        self._task = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        if self.token is not None:
+            self._write({"hello": self.token})
+        self._task = asyncio.get_running_loop().create_task(self._read())
+        return self
+
+    def _write(self, msg):
+        self.writer.write(json.dumps(msg, separators=(",", ":")).encode() + b"\n")
+
+    async def _read(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            msg = json.loads(line)
+            if "ping" in msg:
+                self._write({"pong": msg["ping"], "t": self.now()})
+            elif "ack" in msg:
+                t = self.now()
+                for i in msg["ack"]:
+                    self.acked[i] = t
+
+    def send(self, op, *args, t=None):
+        self.next_id += 1
+        t = self.now() if t is None else t
+        self.sent[self.next_id] = t
+        self._write({"op": op, "args": list(args), "t": t, "id": self.next_id})
+        return self.next_id
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        self.writer.close()
@@ -0,0 +1,186 @@
+# render.py
+class FieldRenderer:
+    """
+    Repintado incremental a partir de las versiones por campo de GameState.
+    - bind(field, getter, apply): getter(state) calcula el valor a mostrar y
+      apply(valor) actualiza UN widget. Sólo se evalúa getter si la versión
+      del campo cambió, y sólo se llama apply si el valor es distinto.
+    - last_updates / last_skipped: widgets tocados / saltados en el último frame.
+    """
+    def __init__(self):
+        self._binds = []   # [campo, getter, apply, último valor]
+        self._seen = {}    # campo -> versión ya pintada
+        self.frames = 0
+        self.updates = 0
+        self.skipped = 0
+        self.last_updates = 0
+        self.last_skipped = 0
+
+    def bind(self, field, getter, apply):
+        self._binds.append([field, getter, apply, object()])
+        self._seen.pop(field, None)  # fuerza el primer pintado del campo
+
+    def render(self, state, force=False) -> int:
+        versions = state.versions
+        changed = {f for f, v in versions.items() if force or self._seen.get(f) != v}
+        updates = 0
+        for b in self._binds:
+            if b[0] not in changed:
+                continue
+            value = b[1](state)
+            if value != b[3]:
+                b[3] = value
+                b[2](value)
+                updates += 1
+        self._seen.update(versions)
+
+        self.frames += 1
+        self.last_updates = updates
+        self.last_skipped = len(self._binds) - updates
+        self.updates += updates
+        self.skipped += self.last_skipped
+        return updates
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "last_updates": self.last_updates,
+            "last_skipped": self.last_skipped,
+        }
+
+
+# Lo que muestra cualquier ventana del tablero: (clave, campo de GameState, valor)
+BOARD = (
+    ("score_left",   "scores",  lambda s: str(s.scores[0])),
+    ("score_right",  "scores",  lambda s: str(s.scores[1])),
+    ("minutes_left", "minutes", lambda s: str(s.minutes[0])),
+    ("minutes_right", "minutes", lambda s: str(s.minutes[1])),
+    ("names",        "names",   lambda s: f"{s.team_names[0]} - {s.team_names[1]}"),
+    ("period",       "period",  lambda s: s.period_str()),
+    ("time",         "time",    lambda s: s.time_str()),
+    ("shot",         "shot",    lambda s: s.shot_str()),
+    ("fouls_left",   "fouls",   lambda s: str(s.fouls[0])),
+    ("fouls_right",  "fouls",   lambda s: str(s.fouls[1])),
+    ("flag_left",    "fouls",   lambda s: s.fouls[0] >= 5),   # bandera de 5 faltas visible
+    ("flag_right",   "fouls",   lambda s: s.fouls[1] >= 5),
+)
+
+_UNSET = object()
+
+
+class PlanView:
+    """
+    Los widgets de UNA ventana: bind(clave, apply) y nada que calcular.
+    - last_updates / last_skipped: widgets tocados / saltados en el último frame.
+    """
+    def __init__(self, name=""):
+        self.name = name
+        self._applies = {}   # clave -> [apply]
+        self._binds = 0
+        self.fresh = True    # todavía no pintó: el próximo frame le llega todo
+        self.updates = 0
+        self.skipped = 0
+        self.last_updates = 0
+        self.last_skipped = 0
+
+    def bind(self, key, apply):
+        self._applies.setdefault(key, []).append(apply)
+        self._binds += 1
+        self.fresh = True
+
+    def apply(self, values) -> int:
+        n = 0
+        for key, value in values.items():
+            for fn in self._applies.get(key, ()):
+                fn(value)
+                n += 1
+        self.fresh = False
+        self.last_updates = n
+        self.last_skipped = self._binds - n
+        self.updates += n
+        self.skipped += self.last_skipped
+        return n
+
+    def stats(self) -> dict:
+        return {
+            "updates": self.updates,
+            "skipped": self.skipped,
+            "last_updates": self.last_updates,
+            "last_skipped": self.last_skipped,
+        }
+
+
+class RenderPlan:
+    """
+    Repintado de varias ventanas del mismo GameState (pared, vista previa,
+    banco) con un solo cálculo por frame.
+    - key(clave, campo, getter): un valor del tablero (BOARD trae los de siempre)
+    - view(nombre) -> PlanView de una ventana; drop(vista) cuando se cierra
+    - render(state): como FieldRenderer, evalúa getter sólo si cambió la
+      versión de su campo, pero UNA vez para todas las vistas; a cada vista
+      le pasa los valores que cambiaron. Sumar una ventana cuesta sus apply.
+    - evals: getters evaluados (no crece con las vistas)
+    """
+    def __init__(self, keys=BOARD):
+        self._keys = {}      # clave -> [campo, getter, último valor]
+        self._fields = {}    # campo -> [claves]
+        self._seen = {}      # campo -> versión ya calculada
+        self.views = []
+        self.frames = 0
+        self.evals = 0
+        for key in keys:
+            self.key(*key)
+
+    def key(self, name, field, getter):
+        if name not in self._keys:
+            self._fields.setdefault(field, []).append(name)
+        self._keys[name] = [field, getter, _UNSET]
+        self._seen.pop(field, None)  # se calcula en el próximo frame
+
+    def view(self, name=""):
+        v = PlanView(name)
+        self.views.append(v)
+        return v
+
+    def drop(self, view):
+        if view in self.views:
+            self.views.remove(view)
+
+    def values(self) -> dict:
+        return {name: k[2] for name, k in self._keys.items() if k[2] is not _UNSET}
+
+    def render(self, state, force=False) -> int:
+        versions = state.versions
+        changed = {}
+        for field, version in versions.items():
+            if not force and self._seen.get(field) == version:
+                continue
+            for name in self._fields.get(field, ()):
+                k = self._keys[name]
+                value = k[1](state)
+                self.evals += 1
+                if value != k[2]:
+                    k[2] = changed[name] = value
+        self._seen.update(versions)
+        self.frames += 1
+
+        full = None
+        updates = 0
+        for v in self.views:
+            if v.fresh:
+                full = full or self.values()
+                updates += v.apply(full)
+            else:
+                updates += v.apply(changed)  # sin cambios: cuenta todos sus widgets como saltados
+        return updates
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "evals": self.evals,
+            "updates": sum(v.updates for v in self.views),
+            "skipped": sum(v.skipped for v in self.views),
+            "views": {v.name: v.stats() for v in self.views},
+        }
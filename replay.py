@@ -0,0 +1,245 @@
+# replay.py
+"""
+Repetición de un partido: qué mostraba el tablero en cualquier momento.
+- Recorder escucha cada mutación de GameState (incluido "clock", cuando un
+  reloj llega a 0) y guarda la hora, la operación y una copia chica de los
+  grupos que cambiaron (GameState.capture) más los dos relojes.
+- Los segundos intermedios no se guardan: cada evento trae cuánto quedaba y
+  si el reloj corría, y entre dos eventos el reloj avanza solo (logic.Clock).
+- Cada `every` eventos se guarda el estado completo (checkpoint). El evento
+  i se reconstruye desde el checkpoint i // every y a lo sumo every-1
+  restauraciones: buscar un instante es un bisect sobre la hora.
+- El archivo (DATA_DIR/replay-<partido>.bin) es MAGIC, un encabezado y
+  bloques de `every` eventos; cada uno es su largo (u32, como los registros
+  de journal.py) y JSON. Abrir una repetición ajena no ejecuta nada.
+- El disco lo toca un hilo propio: on_mutation corre con state.lock (a veces
+  en el hilo de relojes) y sólo le pasa el bloque ya armado.
+"""
+from array import array
+from bisect import bisect_right
+import json, os, queue, struct, threading, time
+
+from logic import GROUPS, GameState, NS_PER_S
+from rules import LEAGUE, RULESETS
+
+EVERY = 64
+VERSION = 2
+MAGIC = b"MRP2"
+BLOCK = struct.Struct("<I")  # largo del bloque JSON que sigue
+ALWAYS = ("time", "shot")  # los relojes van en todos los eventos
+
+
+class Recording:
+    """Eventos en columnas array() (como plays.PlayLog) + sus capturas."""
+    def __init__(self, rules=LEAGUE.name, every=EVERY, started_at=""):
+        self.rules = rules
+        self.every = every
+        self.started_at = started_at
+        self.wall = array("q")       # hora del evento (ns, reloj de GameState.now)
+        self.period = array("h")
+        self.game_ns = array("q")    # reloj de juego en ese momento
+        self.running = array("b")
+        self.ops = []
+        self.caps = []               # checkpoint completo cada `every`; si no, sólo lo que cambió
+        self.by_period = {}          # período -> eventos
+
+    @property
+    def n(self) -> int:
+        return len(self.ops)
+
+    def add(self, wall, op, period, game_ns, running, cap):
+        i = self.n
+        self.wall.append(wall)
+        self.period.append(period)
+        self.game_ns.append(game_ns)
+        self.running.append(running)
+        self.ops.append(op)
+        self.caps.append(cap)
+        self.by_period.setdefault(period, []).append(i)
+        return i
+
+    def index_at(self, wall_ns) -> int:
+        """Último evento que ya había pasado en `wall_ns` (-1: antes del primero)."""
+        return bisect_right(self.wall, wall_ns) - 1
+
+    def wall_at(self, period, remaining_ns):
+        """
+        Hora en que el reloj del período `period` mostraba `remaining_ns`
+        (la última vez, si se corrigió el reloj). None si nunca pasó.
+        """
+        for i in reversed(self.by_period.get(period, ())):
+            left = self.game_ns[i]
+            if left < remaining_ns:
+                continue
+            t = self.wall[i] + (left - remaining_ns if self.running[i] else 0)
+            # si el evento siguiente cambió el reloj antes de llegar, el último instante previo
+            if i + 1 < self.n and t >= self.wall[i + 1]:
+                t = max(self.wall[i], self.wall[i + 1] - 1)
+            return t
+        return None
+
+    # ---------- Archivo ----------
+    def header(self):
+        return {"version": VERSION, "rules": self.rules, "every": self.every,
+                "started_at": self.started_at}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            head = _read_block(f) if f.read(len(MAGIC)) == MAGIC else None
+            if not isinstance(head, dict) or head.get("version") != VERSION:
+                raise ValueError("no es una repetición del marcador")
+            rec = cls(head["rules"], head["every"], head["started_at"])
+            while True:
+                rows = _read_block(f)
+                if rows is None:
+                    break  # fin, o el último bloque quedó a medio escribir
+                for wall, op, period, game_ns, running, cap in rows:
+                    rec.add(wall, op, period, game_ns, running, tuple((g, v) for g, v in cap))
+        return rec
+
+
+def _write_block(f, data):
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    f.write(BLOCK.pack(len(raw)) + raw)
+
+
+def _read_block(f):
+    head = f.read(BLOCK.size)
+    if len(head) < BLOCK.size:
+        return None
+    raw = f.read(BLOCK.unpack(head)[0])
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except ValueError:  # incluye UnicodeDecodeError: bloque cortado
+        return None
+
+
+class Recorder:
+    """Engancha una Recording a `state`; con `path` la va guardando en disco (en su hilo)."""
+    def __init__(self, state, path=None, every=EVERY):
+        self.state = state
+        self.path = path
+        self.rec = Recording(state.rules.name, every, time.strftime("%Y-%m-%d %H:%M:%S"))
+        self._versions = None
+        self._pending = []
+        self._f = None
+        self._blocks = None
+        if path:
+            self._f = open(path, "wb")
+            self._f.write(MAGIC)
+            _write_block(self._f, self.rec.header())
+            self._blocks = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop, name="replay", daemon=True)
+            self._writer.start()
+        with state.lock:
+            self.on_mutation(state, "start", ())
+            state.subscribe(self.on_mutation)
+
+    def on_mutation(self, state, op, args):
+        rec = self.rec
+        v = state.versions
+        if rec.n % rec.every == 0:
+            if self._pending:
+                self._flush()
+            groups = GROUPS
+        else:
+            groups = [g for g in GROUPS if g in ALWAYS or v[g] != self._versions[g]]
+        self._versions = dict(v)
+        row = (state.now(), op, state.period, state.game_clock.remaining_ns(),
+               state.running, state.capture(*groups))
+        rec.add(*row)
+        if self._f:
+            self._pending.append(row)
+
+    def _flush(self):
+        # con state.lock tomado: sólo se entrega el bloque, el hilo lo escribe
+        self._blocks.put(self._pending)
+        self._pending = []
+
+    def _write_loop(self):
+        while True:
+            rows = self._blocks.get()
+            if rows is None:
+                return
+            _write_block(self._f, rows)
+            self._f.flush()
+
+    def close(self):
+        self.state.unsubscribe(self.on_mutation)
+        if self._f:
+            if self._pending:
+                self._flush()
+            self._blocks.put(None)
+            self._writer.join()
+            self._f.close()
+            self._f = None
+
+
+class Replayer:
+    """
+    GameState propio manejado por un reloj virtual: seek() lo deja como
+    estaba en ese instante (ns desde el primer evento).
+    """
+    def __init__(self, recording):
+        from sim import VirtualClock
+        self.rec = recording
+        self.clock = VirtualClock(recording.wall[0] if recording.n else 0)
+        rules = RULESETS.get(recording.rules, LEAGUE)
+        self.state = GameState(now=self.clock, rules=rules)
+        self.i = -1          # último evento aplicado
+        self.restored = 0    # restauraciones hechas (para el bench)
+        if recording.n:
+            self.seek(0)
+
+    @property
+    def length_ns(self) -> int:
+        return self.rec.wall[-1] - self.rec.wall[0] if self.rec.n else 0
+
+    @property
+    def pos_ns(self) -> int:
+        return self.clock.ns - self.rec.wall[0] if self.rec.n else 0
+
+    def _apply(self, i):
+        self.clock.ns = self.rec.wall[i]
+        self.state.restore(self.rec.caps[i])
+        self.restored += 1
+
+    def seek(self, pos_ns):
+        """Estado del tablero `pos_ns` después del primer evento (se recorta al partido)."""
+        rec = self.rec
+        if not rec.n:
+            return
+        pos_ns = max(0, min(int(pos_ns), self.length_ns))
+        wall = rec.wall[0] + pos_ns
+        self._goto(max(0, rec.index_at(wall)), wall)
+
+    def _goto(self, i, wall):
+        every = self.rec.every
+        start = i - i % every           # el checkpoint trae todo
+        if 0 <= self.i <= i:
+            start = max(start, self.i + 1)  # hacia adelante: sigue desde donde está
+        with self.state.lock:
+            for j in range(start, i + 1):
+                self._apply(j)
+            self.i = i
+            self.clock.ns = wall
+
+    def seek_game(self, period, remaining_s) -> bool:
+        """Salta al momento en que el período `period` mostraba `remaining_s`."""
+        wall = self.rec.wall_at(period, int(remaining_s * NS_PER_S))
+        if wall is None:
+            return False
+        self.seek(wall - self.rec.wall[0])
+        return True
+
+    def step(self, n=1):
+        """Salta `n` eventos (negativo: hacia atrás)."""
+        if not self.rec.n:
+            return
+        i = max(0, min(self.rec.n - 1, self.i + n))
+        self._goto(i, self.rec.wall[i])  # por índice: varios eventos pueden compartir la hora
+
+
+def replay_path(data_dir, game_id):
+    return os.path.join(data_dir, f"replay-{game_id}.bin")
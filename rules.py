@@ -0,0 +1,104 @@
+# rules.py
+"""
+Reglamentos (liga, FIBA, NBA, formativas) compilados a un calendario.
+- RuleSet describe el reglamento: largo de períodos y alargues, 24s/14s y
+  cómo se reparten y recortan los minutos (tiempos muertos).
+- compile_rules() lo convierte UNA vez en un Schedule: por período, qué
+  transiciones van al empezar y a qué ns del reloj vencen las demás.
+- GameState sólo compara el reloj contra el próximo vencimiento; las reglas
+  se aplican cuando se cruza ese borde, no en cada tick.
+"""
+from dataclasses import dataclass
+import functools
+from typing import Optional
+
+NS_PER_S = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    periods: int = 4                 # períodos regulares; después vienen los alargues
+    period_s: int = 10 * 60
+    overtime_s: int = 10 * 60
+    shot_s: int = 24
+    shot_reset_s: int = 14
+    first_half: int = 2              # minutos por equipo al empezar el partido
+    second_half: Optional[int] = 3   # ... al empezar el segundo tiempo (None: se conservan)
+    overtime: Optional[int] = None   # ... en cada alargue
+    last_period_cap: Optional[int] = None  # tope al empezar el último período
+    late_cut_s: int = 0              # a falta de estos segundos del último período...
+    late_cap: int = 2                # ... nadie se queda con más de late_cap minutos
+    late_cut_joint: bool = False     # liga: el recorte sólo va si los dos equipos tienen de más
+    max_minutes: int = 5             # tope al sumar minutos a mano
+
+
+LEAGUE = RuleSet("liga", overtime_s=10 * 60, late_cut_s=2 * 60, late_cut_joint=True)
+FIBA   = RuleSet("fiba", overtime_s=5 * 60, overtime=1, late_cut_s=2 * 60)
+NBA    = RuleSet("nba", period_s=12 * 60, overtime_s=5 * 60, first_half=7, second_half=None,
+                 overtime=2, max_minutes=7, last_period_cap=4, late_cut_s=3 * 60)
+YOUTH  = RuleSet("formativas", period_s=8 * 60, overtime_s=3 * 60, overtime=1)
+
+RULESETS = {r.name: r for r in (LEAGUE, FIBA, NBA, YOUTH)}
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Cambio de minutos: 'set' (ambos a value, marca minutes_having),
+    'cap' (cada uno a lo sumo value) o 'cut' (recorte tardío, una sola vez)."""
+    kind: str
+    value: int
+    joint: bool = False
+
+    def apply(self, state):
+        m = state.minutes
+        if self.kind == "set":
+            state.minutes = [self.value, self.value]
+            state.minutes_having = True
+        elif self.kind == "cap":
+            state.minutes = [min(v, self.value) for v in m]
+        elif not state.minutes_penalized:  # cut
+            over = [v > self.value for v in m]
+            if all(over) if self.joint else any(over):
+                state.minutes = [min(v, self.value) for v in m]
+                state.minutes_penalized = True
+
+
+class Schedule:
+    """Reglamento compilado. marks(p) va ordenado por vencimiento (ns restantes, de mayor a menor)."""
+    def __init__(self, rules: RuleSet):
+        self.rules = rules
+        last = rules.periods
+        second = last // 2 + 1
+        starts = {p: [] for p in range(1, last + 1)}
+        starts[1].append(Transition("set", rules.first_half))
+        if rules.second_half is not None:
+            starts[second].append(Transition("set", rules.second_half))
+        if rules.last_period_cap is not None:
+            starts[last].append(Transition("cap", rules.last_period_cap))
+        self._starts = {p: tuple(ts) for p, ts in starts.items()}
+        self._ot_starts = (Transition("set", rules.overtime),) if rules.overtime is not None else ()
+
+        self._marks = {}
+        if rules.late_cut_s:
+            self._marks[last] = ((rules.late_cut_s * NS_PER_S,
+                                  Transition("cut", rules.late_cap, rules.late_cut_joint)),)
+
+    def starts(self, period):
+        return self._starts.get(period, self._ot_starts if period > self.rules.periods else ())
+
+    def marks(self, period):
+        return self._marks.get(period, ())
+
+    def period_ns(self, period) -> int:
+        secs = self.rules.period_s if period <= self.rules.periods else self.rules.overtime_s
+        return secs * NS_PER_S
+
+    def period_str(self, period) -> str:
+        last = self.rules.periods
+        return f"{period}º" if period <= last else f"OT {period - last}"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_rules(rules: RuleSet) -> Schedule:
+    return Schedule(rules)
@@ -0,0 +1,289 @@
+# sim.py
+"""
+Simulación sin Tk de partidos completos sobre GameState con un reloj virtual.
+Sirve para revisar la lógica de punta a punta en milisegundos:
+    from sim import run_game
+    rep = run_game(seed=1)       # 4 períodos + alargue con comandos al azar
+    print(rep.summary())
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+import random, time
+
+from commands import KEYMAP
+from logic import GROUPS, GameState, NS_PER_S, START_SECONDS
+from rules import LEAGUE
+
+# Pesos de las teclas en los partidos al azar (sumar puntos es lo más común)
+RANDOM_WEIGHTS = {
+    "z": 30, "n": 30, "x": 2, "m": 2, "a": 8, "k": 8, "s": 1, "l": 1,
+    "q": 1, "o": 1, "w": 1, "p": 1, "2": 6, "3": 12, "space": 6,
+}
+
+
+class InvariantError(AssertionError):
+    pass
+
+
+class VirtualClock:
+    """Fuente de ns monotónicos que sólo avanza con advance(); se pasa como GameState(now=...)."""
+    def __init__(self, start_ns=0):
+        self.ns = start_ns
+
+    def __call__(self) -> int:
+        return self.ns
+
+    def advance(self, ns: int):
+        self.ns += int(ns)
+
+
+def press(state: GameState, key: str):
+    """Aplica el comando de la tecla (mismo KEYMAP que Scoreboard._bind_keys)."""
+    cmd = KEYMAP[key] if key in KEYMAP else KEYMAP[f"<{key}>"]
+    cmd.apply(state)
+
+
+def random_script(seed=0, periods=5, per_period=120, period_s=START_SECONDS):
+    """Lista de (período, segundo del período, tecla) generada al azar."""
+    rnd = random.Random(seed)
+    keys, weights = zip(*RANDOM_WEIGHTS.items())
+    script = []
+    for p in range(1, periods + 1):
+        times = sorted(rnd.uniform(0, period_s) for _ in range(per_period))
+        script += [(p, t, k) for t, k in zip(times, rnd.choices(keys, weights, k=per_period))]
+    return script
+
+
+class ShotAudit:
+    """
+    Cuenta los eventos de 24s por posesión. Después de reset_shot_24/14
+    (avisos rearmados) cada aviso debe salir exactamente una vez al cruzar
+    su umbral; en cualquier otro caso, como mucho una vez.
+    """
+    def __init__(self, state):
+        self.rearmed = False
+        self.counts = Counter()
+        self.start = self.low = state.shot_time
+        state.subscribe(self._on_op)
+
+    def _on_op(self, state, op, args):
+        if op in ("reset_shot_24", "reset_shot_14", "reset_time", "next_period", "reset_all"):
+            self._new_possession(state, rearmed=True)
+        elif op in ("set_shot_time", "add_minutes") and state.shot_time > self.low:
+            self._new_possession(state, rearmed=False)
+
+    def _new_possession(self, state, rearmed):
+        self.close()
+        self.rearmed = rearmed
+        self.start = self.low = state.shot_time
+
+    def tick(self, state, evt):
+        """Llamar después de cada poll_shot(); sólo cuenta lo que poll_shot pudo ver."""
+        if state.shot_running or evt:
+            self.low = min(self.low, state.shot_time)
+        if evt:
+            self.counts[evt] += 1
+
+    def close(self):
+        for evt, n in self.counts.items():
+            if n > 1:
+                raise InvariantError(f"{evt} se disparó {n} veces en una posesión")
+        if self.rearmed:
+            for evt, limit in (("shot10", 10), ("shot5", 5), ("shot0", 0)):
+                crossed = self.start > limit and self.low <= limit
+                # shot0 reemplaza al aviso que se haya saltado en ese mismo tick
+                if crossed and self.counts[evt] != 1 and not (evt != "shot0" and self.counts["shot0"]):
+                    raise InvariantError(f"{evt} no se disparó al cruzar {limit}s")
+        self.counts.clear()
+
+
+def check_invariants(state: GameState):
+    if min(state.scores) < 0:
+        raise InvariantError(f"puntos negativos: {state.scores}")
+    if not all(0 <= f <= 5 for f in state.fouls):
+        raise InvariantError(f"faltas fuera de 0–5: {state.fouls}")
+    top = state.rules.max_minutes
+    if not all(0 <= m <= top for m in state.minutes):
+        raise InvariantError(f"minutos fuera de 0–{top}: {state.minutes}")
+
+
+@dataclass
+class SimReport:
+    state: GameState
+    ticks: int = 0
+    commands: int = 0
+    periods: int = 0
+    elapsed_s: float = 0.0
+    events: Counter = field(default_factory=Counter)
+
+    @property
+    def ticks_per_s(self) -> float:
+        return self.ticks / self.elapsed_s if self.elapsed_s else 0.0
+
+    @property
+    def commands_per_s(self) -> float:
+        return self.commands / self.elapsed_s if self.elapsed_s else 0.0
+
+    def summary(self) -> str:
+        s = self.state
+        return (f"{s.team_names[0]} {s.scores[0]} - {s.scores[1]} {s.team_names[1]} "
+                f"({self.periods} períodos) | {self.ticks} ticks, {self.commands} comandos "
+                f"en {self.elapsed_s * 1000:.1f} ms | {self.ticks_per_s:,.0f} ticks/s, "
+                f"{self.commands_per_s:,.0f} comandos/s | eventos {dict(self.events)}")
+
+
+def run_game(script=None, seed=0, periods=None, overtimes=1, step_ms=100, jitter_ms=0, check=True,
+             rules=LEAGUE, attach=None):
+    """
+    Juega `periods` + `overtimes` períodos completos con un reloj virtual.
+    - rules: reglamento (rules.RULESETS); periods=None usa sus períodos regulares
+    - script: [(período, segundo, tecla)]; si es None se genera con `seed`
+    - step_ms / jitter_ms: cada cuánto "muestrea la UI" y cuánto se atrasa al azar
+    - check: verifica invariantes en cada tick y que el reloj no derive
+    - attach: fn(state) antes del salto inicial (p.ej. replay.Recorder)
+    """
+    total = (periods or rules.periods) + overtimes
+    if script is None:
+        script = random_script(seed, total, period_s=rules.period_s)
+    rnd = random.Random(seed)
+    clock = VirtualClock()
+    state = GameState(now=clock, rules=rules)
+    state.apply_minutes()
+    if attach:
+        attach(state)
+    audit = ShotAudit(state) if check else None
+    rep = SimReport(state)
+
+    by_period = {}
+    for p, t, key in script:
+        by_period.setdefault(p, []).append((int(t * NS_PER_S), key))
+
+    step_ns = step_ms * 1_000_000
+    t0 = time.perf_counter()
+    for p in range(1, total + 1):
+        if p > 1:
+            state.next_period()
+        queue = sorted(by_period.get(p, []), reverse=True)
+        length = state.schedule.period_ns(p)
+        press(state, "space")
+        run_ns = 0  # tiempo que corrió el reloj de juego en este período
+        while True:
+            dt = step_ns + (rnd.randrange(jitter_ms * 1_000_000) if jitter_ms else 0)
+            if state.running:
+                run_ns += dt
+            clock.advance(dt)
+            played = length - state.game_clock.remaining_ns()
+            while queue and queue[-1][0] <= played:
+                press(state, queue.pop()[1])
+                rep.commands += 1
+
+            ended = state.poll_game()
+            evt = state.poll_shot()
+            state.sample_clocks()
+            rep.ticks += 1
+            if audit:
+                audit.tick(state, evt)
+            if evt:
+                rep.events[evt] += 1
+                if evt == "shot0":
+                    press(state, "3")  # el oficial rearma la posesión
+            if check:
+                check_invariants(state)
+            if ended:
+                rep.events["end"] += 1
+                # Sin deriva: el reloj terminó dentro del último muestreo
+                if check and not length <= run_ns < length + dt:
+                    raise InvariantError(f"deriva del reloj en período {p}: {run_ns} ns")
+                break
+            if not state.running:
+                # el guion se mide en tiempo de juego: las pausas duran 0 s virtuales
+                state.toggle_game()
+                if not state.shot_running:
+                    state.toggle_shot()
+        rep.periods += 1
+    if audit:
+        audit.close()
+    rep.elapsed_s = time.perf_counter() - t0
+    return rep
+
+
+def check_stall(stall_s=2.0, game_s=1.5, shot_s=1.0, tolerance_ms=30):
+    """
+    Traba "la UI" (este hilo, ocupado con el GIL tomado) `stall_s` segundos
+    mientras timing.ClockThread lleva los relojes reales: la bocina de 24s y
+    el fin de período tienen que salir a tiempo igual.
+    """
+    from timing import ClockThread
+    state = GameState()
+    state.apply_minutes()
+    state.shot_beep10_done = state.shot_beep5_done = True
+    heard = {}
+    clocks = ClockThread(state, on_event=lambda evt, t: heard.setdefault(evt, t)).start()
+    try:
+        with state.lock:
+            state.game_clock.set_ns(int(game_s * NS_PER_S))
+            state.shot_clock.set_ns(int(shot_s * NS_PER_S))
+            t0 = time.perf_counter_ns()
+            state.toggle_game()
+            state.toggle_shot()
+
+        end = time.perf_counter() + stall_s
+        while time.perf_counter() < end:  # UI trabada (Toplevel modal, resize lento...)
+            sum(range(1000))
+
+        seen = [evt for evt, _ in clocks.drain()]  # lo que la UI ve en su próximo frame
+    finally:
+        clocks.stop()
+
+    for evt, due_s in (("shot0", shot_s), ("end", game_s)):
+        if evt not in heard or evt not in seen:
+            raise InvariantError(f"{evt} no llegó durante la traba de {stall_s} s")
+        late_ms = (heard[evt] - t0) / 1e6 - due_s * 1000
+        if not -1 <= late_ms <= tolerance_ms:
+            raise InvariantError(f"{evt} salió {late_ms:.1f} ms tarde con la UI trabada")
+    if state.running or state.shot_running or state.game_clock.remaining_ns() or state.shot_clock.remaining_ns():
+        raise InvariantError("los relojes no quedaron detenidos en 0")
+    state.toggle_game()  # el operador aprieta espacio justo después de la bocina
+    state.toggle_shot()
+    if state.running or state.shot_running or state.poll_game() or state.poll_shot():
+        raise InvariantError("un reloj en 0 volvió a arrancar y repitió la bocina")
+    return {evt: (heard[evt] - t0) / 1e6 for evt in heard}
+
+
+
+def check_journal(events=400, fsync_ms=20, seed=0):
+    """
+    Journal con un disco lento (cada fsync tarda `fsync_ms`): ninguna
+    mutación espera al disco, y recover() deja el mismo tablero.
+    """
+    import os, tempfile
+    import journal
+    from journal import Journal
+    directory = tempfile.mkdtemp()
+    fsync = journal.os.fsync
+    journal.os.fsync = lambda fd: (time.sleep(fsync_ms / 1000), fsync(fd))
+    try:
+        state = GameState()
+        state.apply_minutes()
+        j = Journal(directory, sync_every=8, snapshot_s=0.05)
+        j.attach(state)
+        rng = random.Random(seed)
+        keys = [k for k in RANDOM_WEIGHTS if k != "space"]
+        worst = 0
+        for i in range(events):
+            t0 = time.perf_counter_ns()
+            with state.lock:
+                press(state, rng.choice(keys))
+                j.tick(state)
+            worst = max(worst, time.perf_counter_ns() - t0)
+        j.close(state)
+    finally:
+        journal.os.fsync = fsync
+    back = GameState()
+    Journal(directory).recover(back)
+    kept = [g for g in GROUPS if g not in ("time", "shot")]  # los relojes vuelven detenidos
+    if back.capture(*kept) != state.capture(*kept):
+        raise InvariantError("recover() no dejó el mismo tablero")
+    if worst >= fsync_ms * 1_000_000:
+        raise InvariantError(f"una mutación esperó al disco ({worst / 1e6:.1f} ms con state.lock)")
+    return worst / 1e6
@@ -0,0 +1,119 @@
+# teams.py
+"""
+Perfiles de equipos del torneo: nombre, nombre corto, colores, logo y plantel.
+- Se guardan en DATA_DIR/teams.json (escritura atómica, como assets).
+- El buscador del diálogo de configuración usa un índice armado una vez
+  (y al agregar un equipo): trigramas -> equipos y una lista ordenada de
+  palabras para los prefijos. Una búsqueda mira sólo los candidatos que
+  comparten algo con lo tipeado, no los cientos de equipos.
+- Sin tildes ni mayúsculas: "union" encuentra "Unión".
+"""
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+import os, unicodedata
+
+from assets import read_json, write_json
+
+DEFAULT_COLOR = "#00ff7f"  # el verde de los puntos
+
+
+@dataclass
+class Team:
+    name: str
+    short: str = ""
+    colors: tuple = (DEFAULT_COLOR, "#ffffff")   # principal (puntos), secundario
+    logo: str = ""                               # ruta de la imagen (relativa a la app o absoluta)
+    roster: dict = field(default_factory=dict)   # número -> jugador
+
+    def player(self, number) -> str:
+        return self.roster.get(str(number), "")
+
+
+def normalize(text) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(c for c in text if not unicodedata.combining(c)).split())
+
+
+def trigrams(text):
+    t = f"  {text} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+def _subsequence(q, text) -> bool:
+    """Las letras de `q` aparecen en orden en `text` ("bj" -> "Boca Juniors")."""
+    it = iter(text)
+    return all(c in it for c in q)
+
+
+class TeamStore:
+    def __init__(self, path):
+        self.path = path
+        self.teams = {}          # nombre normalizado -> Team
+        for raw in read_json(path).get("teams", ()):
+            team = Team(**{**raw, "colors": tuple(raw.get("colors") or Team.colors)})
+            self.teams[normalize(team.name)] = team
+        self._build_index()
+
+    # ---------- Índice ----------
+    def _build_index(self):
+        self._grams = {}         # trigrama -> {clave}
+        self._words = []         # [(palabra, clave)] ordenada, para prefijos
+        for key, team in self.teams.items():
+            self._index(key, team)
+        self._words.sort()
+
+    def _index(self, key, team):
+        text = f"{key} {normalize(team.short)}".strip()
+        for g in trigrams(text):
+            self._grams.setdefault(g, set()).add(key)
+        self._words += [(w, key) for w in set(text.split())]
+
+    # ---------- Lecturas ----------
+    def get(self, name):
+        return self.teams.get(normalize(name))
+
+    def names(self):
+        return sorted(t.name for t in self.teams.values())
+
+    def search(self, query, limit=8):
+        """Nombres que mejor coinciden con `query`: prefijo > palabra > trigramas > iniciales."""
+        q = normalize(query)
+        if not q:
+            return self.names()[:limit]
+        scores = {}
+        i = bisect_left(self._words, (q,))
+        while i < len(self._words) and self._words[i][0].startswith(q):
+            key = self._words[i][1]
+            scores[key] = 3.0 if key.startswith(q) else 2.0
+            i += 1
+        qg = trigrams(q)
+        counts = {}
+        for g in qg:
+            for key in self._grams.get(g, ()):
+                counts[key] = counts.get(key, 0) + 1
+        for key, n in counts.items():
+            fuzzy = n / len(qg)
+            if fuzzy >= 0.3 or _subsequence(q, key):
+                scores[key] = max(scores.get(key, 0.0), fuzzy + (0.5 if _subsequence(q, key) else 0))
+        best = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [self.teams[key].name for key, _ in best]
+
+    # ---------- Escritura ----------
+    def add(self, team):
+        key = normalize(team.name)
+        new = key not in self.teams
+        self.teams[key] = team
+        if new:
+            self._index(key, team)
+            self._words.sort()
+        else:
+            self._build_index()
+        return team
+
+    def ensure(self, name):
+        """El perfil de `name`; si no había, uno con sólo el nombre (queda para autocompletar)."""
+        return self.get(name) or self.add(Team(name.strip()))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        write_json(self.path, {"teams": [asdict(t) for t in self.teams.values()]})
@@ -0,0 +1,113 @@
+# timing.py
+"""
+Hilo de relojes: detecta fin de período y avisos de 24s fuera del loop de Tk.
+- Duerme hasta el próximo vencimiento (GameState.next_due_ns) y se despierta
+  antes si cambia algo (cualquier mutación del estado lo avisa).
+- Los avisos sonoros salen desde este hilo (on_event); la UI recibe los
+  mismos eventos por `events` (queue.SimpleQueue) y los lee una vez por frame.
+- Un Toplevel modal, un messagebox o un resize lento congelan la UI, pero
+  no atrasan la bocina ni el fsync del journal.
+frame_delay_ms() es el lado de la UI: cuándo hace falta el próximo frame.
+"""
+from collections import deque
+import queue, threading, time
+
+from logic import NS_PER_S
+
+MAX_WAIT_S = 0.25   # aunque no venza nada: journal.tick y cambios de reglamento
+LATE_NS = 1_000_000  # margen para no despertar un pelito antes del borde
+FAST_MS = 100       # último minuto o 24s en menos de 5: 10 Hz
+SLOW_MS = 1000      # reloj corriendo: un frame por segundo, cuando cambia el texto
+
+
+class ClockThread:
+    """
+    - on_event(evt, t_ns): se llama EN ESTE HILO con "end", "shot10", "shot5", "shot0"
+    - journal: si se pasa, su tick() corre acá: decide el fsync por lotes y el
+      snapshot, y se los pasa a su hilo de escritura (sin disco con state.lock)
+    """
+    def __init__(self, state, on_event=None, journal=None, max_wait_s=MAX_WAIT_S):
+        self.state = state
+        self.on_event = on_event or (lambda evt, t_ns: None)
+        self.journal = journal
+        self.max_wait_s = max_wait_s
+        self.events = queue.SimpleQueue()  # (evento, perf_counter_ns) para la UI
+        self.wakeups = 0
+        self.late_ns = deque(maxlen=256)   # atraso de cada evento respecto de su vencimiento
+        self.observe_late = None           # fn(ms), p.ej. Metrics.event_late.observe
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        state.subscribe(self._on_change)
+
+    def _on_change(self, state, op, args):
+        self._wake.set()
+
+    def run(self):
+        st = self.state
+        due_at = None
+        while not self._stop.is_set():
+            with st.lock:
+                ended = st.poll_game()
+                evt = st.poll_shot()
+                if self.journal:
+                    self.journal.tick(st)
+                due = st.next_due_ns()
+                t = time.perf_counter_ns()
+                fired = (("end",) if ended else ()) + ((evt,) if evt else ())
+                for e in fired:
+                    # en la cola antes de soltar el lock: quien vea el reloj parado ya ve el evento
+                    self.events.put((e, t))
+            self.wakeups += 1
+            for e in fired:
+                if due_at is not None:
+                    self.late_ns.append(max(0, t - due_at))
+                    if self.observe_late:
+                        self.observe_late(self.late_ns[-1] / 1e6)
+                self.on_event(e, t)
+
+            timeout = self.max_wait_s
+            due_at = None
+            if due is not None and due / NS_PER_S < timeout:
+                timeout = (due + LATE_NS) / NS_PER_S
+                due_at = t + due
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="clocks", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self.state.unsubscribe(self._on_change)
+
+    def drain(self):
+        """Eventos pendientes para la UI (no bloquea)."""
+        out = []
+        while True:
+            try:
+                out.append(self.events.get_nowait())
+            except queue.Empty:
+                return out
+
+
+def frame_delay_ms(state):
+    """
+    (modo, ms hasta el próximo frame de la UI): "idle" con None si los dos
+    relojes están detenidos (sólo una tecla o un evento la despiertan),
+    "1hz" alineado al cambio de segundo, o "10hz" en el final.
+    """
+    due = state.next_frame_ns()
+    if due is None:
+        return "idle", None
+    ms = -(-due // 1_000_000) + 1  # recién pasado el borde, el texto ya cambió
+    fast = ((state.running and state.game_clock.remaining_ns() <= 60 * NS_PER_S)
+            or (state.shot_running and state.shot_clock.remaining_ns() < 5 * NS_PER_S))
+    if fast:
+        return "10hz", min(ms, FAST_MS)
+    return "1hz", min(ms, SLOW_MS)
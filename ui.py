@@ -1,31 +1,149 @@
 # ui.py
+import time
+STARTUP_T0 = time.perf_counter()  # perfil de arranque: todo se mide desde acá
+
 import tkinter as tk
 from tkinter import ttk, messagebox
 import tkinter.font as tkfont
-import re, pygame, os, sys
-from PIL import Image, ImageTk
+import argparse, re, os, sys
+from collections import deque
 from styles import setup_styles, ArrowIndicator
+from render import RenderPlan
+from journal import Journal
+from assets import resource_path, cache_dir, font_available, load_image, ImageCache, read_json, write_json
 from logic import GameState, START_SECONDS
-
-def resource_path(relative_path):
-    """ Devuelve ruta válida tanto en .py como en .exe """
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
+from commands import KEYMAP, CommandQueue
+from rules import LEAGUE, RULESETS
+from timing import ClockThread, frame_delay_ms, SLOW_MS
+from plays import PlayLog, CsvSink
+from archive import Archive, record_from
+from metrics import Metrics, PORT as METRICS_PORT
+from replay import Recorder, replay_path
+from animation import Timeline, PERIOD_END, SHOT_WARN, SHOT_LAST, SHOT_ZERO
+from teams import TeamStore, DEFAULT_COLOR
+# pygame (audio), PIL (sólo si falta la caché) y asyncio (red) se importan
+# recién cuando hacen falta, después del primer frame
+
+STARTUP_IMPORTS = time.perf_counter()
+PORT = 47474  # mismo que broadcast.PORT, sin importar asyncio para el parser
+REMOTE_PORT = 47475  # mismo que remote.PORT
+
+SAMPLE_MS = 100  # espejo y repetición: cada cuánto se muestrean (el propio marcador usa frame_delay_ms)
+DATA_DIR  = "marcador_data"  # journal + snapshot del partido en curso, game.json, plays.csv, archive.db, teams.json
+RESIZE_MS = 16               # los <Configure> se juntan y se aplican una vez por frame
+SCALE_STEP = 0.05            # escalas de fuente precalculadas entre 0.60 y 1.00
+COMMAND_MS = 16              # las teclas se encolan y se aplican juntas una vez por frame
+REPLAY_SPEEDS = (1, 10, 100) # velocidades de la repetición (flechas arriba/abajo)
+REPLAY_JUMP_S = 10           # Shift+flecha salta estos segundos
+ANIM_MS = 33                 # frame de las animaciones (sólo corre si hay alguna activa)
+# destino de animación -> (widget, color de reposo, cuándo vuelve al reposo)
+ANIM_TARGETS = {
+    "time": ("time_lbl", "white",   lambda st: st.running),
+    "shot": ("shot_lbl", "#ffd700", lambda st: st.shot_time > 10),
+}
+SHOT_ANIMS = {"shot10": SHOT_WARN, "shot5": SHOT_LAST, "shot0": SHOT_ZERO}
+LOGO_PX = 140                # lado del logo con la ventana a pantalla completa
 
 class Scoreboard(tk.Tk):
-    def __init__(self):
+    """
+    - mirror: (host, port) -> pantalla espejo de sólo lectura que dibuja lo
+      que publica otro marcador en la red
+    - broadcast_port: publica el estado para las pantallas espejo
+    - backend: "labels" (un Label por número) o "canvas" (todo en un Canvas
+      con dígitos de siete segmentos pre-renderizados, ver canvas_board.py)
+    - rules: reglamento (rules.RULESETS): largo de períodos, 24s/14s y minutos
+    - metrics_port: sirve /metrics (Prometheus) en 127.0.0.1; F3 muestra el overlay
+    - overlay: ruta del score bug RGBA en memoria compartida para OBS (ver overlay.py)
+    - replay: archivo replay-*.bin -> modo repetición de sólo lectura (ver replay.py):
+      barra para recorrer, play/pausa, 1/10/100x y paso a paso por evento
+    - remote_port: acepta comandos de tablets en la red local (ver remote.py);
+      remote_token: clave que tienen que mandar al conectarse; sin clave sólo
+      escucha en 127.0.0.1
+    - feed: carpeta donde dejar marcador.json/.xml/.csv para la gráfica (ver feed.py)
+    - displays: ventanas extra del mismo tablero, kwargs de display.DisplayWindow
+      (ver display.parse_display); se repintan todas con un solo cálculo por frame
+    - led: tablero LED físico, "tcp:HOST:PUERTO" o "RUTA[@BAUDIOS]" (ver led.py);
+      led_fps: cuántos frames por segundo acepta su controlador
+    """
+    def __init__(self, mirror=None, broadcast_port=None, profile=False, backend="labels",
+                 rules=LEAGUE, metrics_port=None, overlay=None, overlay_fps=30, replay=None,
+                 remote_port=None, remote_token=None, feed=None, displays=(), led=None,
+                 led_fps=20):
         super().__init__()
         setup_styles(self)
-
-        pygame.mixer.init()
-        beep_path = resource_path("assets/beep.wav")
-        self.tone = pygame.mixer.Sound(beep_path)
-        self.tone.set_volume(1.0)
+        self.mirror = mirror is not None
+        self.backend = backend
+        self.board = None
+        self.audio = None  # se inicia después del primer frame (_late_init)
+        self.profile = profile
+        self.startup = {"imports_ms": (STARTUP_IMPORTS - STARTUP_T0) * 1000}
+        self.metrics = Metrics()
+        self.metrics_server = None
+        self._tick_due = None   # perf_counter_ns en que debería correr el próximo muestreo
+        self._tick_job = None   # after() del próximo frame (None: dormido)
+        self._tick_mode = "idle"
+        self._key_t0 = None     # primera tecla todavía sin dibujar
+        self.overlay = None
+        self.timeline = Timeline()  # parpadeos y avisos de color (ver animation.py)
+        self._anim_job = None
+        self._tinted = set()        # destinos que no están en su color de reposo
+        self.teams = TeamStore(os.path.join(os.path.abspath(DATA_DIR), "teams.json"))
+        self.images = ImageCache(self)  # logos por (imagen, tamaño), LRU
+        self._logo_px = LOGO_PX
+        self._team_looks = [None, None]
+        self.displays = []          # DisplayWindow abiertas (ver open_display)
         
         # --- Modelo ---
-        self.state = GameState()
-        self.state.apply_minutes()
+        self.journal = self.publisher = self.subscriber = self.clocks = self.plays = None
+        self.archive = self.overlay_writer = self.recorder = self.replayer = self.remote = None
+        self.feed = self.led = None
+        self.commands = CommandQueue()  # teclas del operador + deshacer/rehacer
+        self._drain_job = None
+        if replay:
+            from replay import Recording, Replayer
+            self.replayer = Replayer(Recording.load(replay))
+            self.state = self.replayer.state
+            self.replay_speed, self.replay_playing, self._replay_t = 1, False, None
+        elif self.mirror:
+            from broadcast import Subscriber, MirrorState
+            self.state = MirrorState()
+            self.subscriber = Subscriber(*mirror).start()
+        else:
+            self.state = GameState(rules=rules)
+            self.journal = Journal(os.path.abspath(DATA_DIR))
+            recovered = self.journal.recover(self.state) or os.path.exists(self.journal.snap_path)
+            self.journal.attach(self.state)
+            self.archive = Archive(os.path.join(os.path.abspath(DATA_DIR), "archive.db"))
+            self._new_playlog(resume=recovered)
+            if not recovered:
+                self.state.apply_minutes()  # partido nuevo
+            # fin de período y 24s en su propio hilo: la UI trabada no atrasa la bocina
+            self.clocks = ClockThread(self.state, on_event=self._on_clock_event,
+                                      journal=self.journal)
+            self.clocks.observe_late = self.metrics.event_late.observe
+            self.clocks.start()
+            self.metrics.watch(self.state)
+            if broadcast_port is not None:
+                from broadcast import Publisher
+                self.publisher = Publisher(port=broadcast_port).start()
+            if remote_port is not None:
+                # aplica en su propio hilo (con state.lock); acá sólo se repinta cuando avisa.
+                # Escucha desde _late_init: antes de mainloop no se le puede avisar a Tk
+                from remote import RemoteServer
+                self.remote = RemoteServer(self.state, self.commands, port=remote_port,
+                                           token=remote_token)
+                self.remote.observe_latency = self.metrics.remote.observe
+                self._remote_wake = False
+                self.bind("<<Remote>>", self._on_remote)
+            if feed is not None:
+                from feed import FeedWriter  # escribe en su hilo: el disco no frena a Tk
+                self.feed = FeedWriter(self.state, feed or os.path.join(os.path.abspath(DATA_DIR), "feed")).start()
+        if metrics_port is not None:
+            from metrics import MetricsServer
+            self.metrics_server = MetricsServer(self.metrics, port=metrics_port).start()
+        if overlay is not None:
+            from overlay import OverlayWriter
+            self.overlay_writer = OverlayWriter(self.state, overlay or None).start(overlay_fps)
 
         # --- Ventana base ---
         self.title("Marcador de Básquet")
@@ -40,7 +158,7 @@ class Scoreboard(tk.Tk):
         # --- Fuentes escalables ---
         sw, sh = self.winfo_screenwidth(), self.winfo_screenheight()
         self.base_w, self.base_h = sw, sh
-        family_big = "DS-Digital" if "DS-Digital" in tkfont.families() else "Arial"
+        family_big = "DS-Digital" if font_available(self, "DS-Digital") else "Arial"
         self.f_small  = tkfont.Font(family="Arial",    size=24,  weight="bold")
         self.f_medium = tkfont.Font(family="Arial",    size=36,  weight="bold")
         self.f_big    = tkfont.Font(family=family_big, size=140, weight="bold")
@@ -51,23 +169,81 @@ class Scoreboard(tk.Tk):
             (self.f_big,   140),
             (self.f_red,    94),
         ]
+        self._scale_table = self._build_scale_table()
+        self._scale_step = None
+        self._resize_job = None
+        self.resize_stats = {"events": 0, "applied": 0, "relayout_ms": deque(maxlen=64)}
 
         # --- UI ---
         self._build_ui()
+        self._bind_render()
         self._refresh_all()
+        for spec in displays:
+            self.open_display(**spec)
+        if led:
+            # una vista más del plan; el puerto lo escribe su propio hilo
+            from led import LedDriver, open_link
+            self.led = LedDriver(lambda: open_link(led), max_fps=led_fps).start().attach(self.plan)
+            self.led.observe_latency = self.metrics.led.observe
+            self.plan.render(self.state)
 
         # --- Hotkeys y resize ---
-        self._bind_keys()
+        if self.replayer:
+            self._build_replay_bar()
+            self._bind_replay_keys()
+        elif self.mirror:
+            self.window_toolbar.grid_remove()
+            self.bind("f", self.toggle_fullscreen)
+            self.bind("<F3>", self.toggle_overlay)
+        else:
+            self._bind_keys()
         self.bind("<Configure>", self._on_resize)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
-        # --- Loop de ticks (UI dirige el reloj) ---
+        # --- Muestreo de relojes (el tiempo lo lleva logic.Clock) ---
         self._schedule_ticks()
+        self.startup["init_ms"] = (time.perf_counter() - STARTUP_T0) * 1000
+        self.after_idle(self._first_frame)
+
+    # ----------------- Arranque -----------------
+    def _first_frame(self):
+        # Corre cuando Tk terminó de dibujar lo pendiente: el tablero ya se ve
+        self.update_idletasks()
+        self.startup["first_frame_ms"] = (time.perf_counter() - STARTUP_T0) * 1000
+        self.after(0, self._late_init)
+
+    def _late_init(self):
+        if not (self.mirror or self.replayer):
+            from audio import AudioEngine
+            self.audio = AudioEngine(resource_path)
+        if self.remote:
+            self.remote.on_applied = self._remote_applied
+            self.remote.start()
+        self.startup["ready_ms"] = (time.perf_counter() - STARTUP_T0) * 1000
+        self._report_startup()
+
+    def _report_startup(self):
+        st = self.startup
+        line = " ".join(f"{k}={v:.1f}" for k, v in st.items())
+        try:
+            with open(os.path.join(cache_dir(), "startup.log"), "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {line}\n")
+        except OSError:
+            pass
+        if self.profile:
+            print(f"arranque: imports {st['imports_ms']:.0f} ms, init {st['init_ms']:.0f} ms, "
+                  f"primer frame {st['first_frame_ms']:.0f} ms, audio listo {st['ready_ms']:.0f} ms",
+                  file=sys.stderr)
+
+    def _cue(self, name, event_ns=None):
+        if self.audio:
+            self.audio.play(name, event_ns or time.perf_counter_ns())
+            self.metrics.audio.observe(self.audio.latencies_ns[-1] / 1e6)
+
+    def _on_clock_event(self, evt, t_ns):
+        # Corre en el hilo de relojes: sólo audio (play() no bloquea), nada de Tk
+        self._cue(evt, t_ns)
         
-    def _play_tun(self, times=1, gap_ms=180):
-        self.tone.play()
-        if times > 1:
-            self.after(gap_ms, lambda: self._play_tun(times-1, gap_ms))
-
     # ----------------- Construcción UI -----------------
     def _configurar_grid(self, widget, rows, cols):
         for r in range(rows):
@@ -80,13 +256,33 @@ class Scoreboard(tk.Tk):
         if "clam" in style.theme_names():
             style.theme_use("clam")
             
-        img = Image.open(resource_path("assets/bandera-roja.png"))
-        img = img.resize((80, 80), Image.LANCZOS)
-        self.flag_img = ImageTk.PhotoImage(img)
+        self.flag_img = load_image(self, "assets/bandera-roja.png", (80, 80))
 
         self.window_toolbar = tk.Frame(self, bg="#000")
         self.window_toolbar.grid(row=0, column=0, columnspan=3, sticky="nsew")
         
+        ttk.Button(self.window_toolbar, text="MENU",  command=self.show_menu,
+                takefocus=False, style="Menu.TButton").grid(row=0, column=0, sticky="w", padx=8, pady=8)
+        ttk.Button(self.window_toolbar, text="EDITAR", command=self.edit_config,
+                takefocus=False, style="Menu.TButton").grid(row=0, column=1, sticky="w", padx=8, pady=8)
+
+        if self.backend == "canvas":
+            self._build_canvas()
+        else:
+            self._build_labels()
+
+    def _build_canvas(self):
+        from canvas_board import CanvasBoard
+        self.board = CanvasBoard(self, (self.f_small, self.f_medium, self.f_red), self.flag_img,
+                                 on_arrow_left=self._on_arrow_left, on_arrow_right=self._on_arrow_right)
+        self.board.grid(row=1, column=0, rowspan=2, columnspan=3, sticky="nsew")
+        # Mismos nombres que el layout de Labels: el resto de la UI no cambia
+        for name in ("arrow_left", "arrow_right", "score_left", "score_right",
+                     "foul_left_value", "foul_right_value", "minutes_left_value",
+                     "minutes_right_value", "period_lbl", "time_lbl", "names_label", "shot_lbl"):
+            setattr(self, name, getattr(self.board, name))
+
+    def _build_labels(self):
         left_bar  = tk.Frame(self, bg="#000"); left_bar.grid(row=1, column=0, rowspan=2, sticky="nsew")
         right_bar = tk.Frame(self, bg="#000"); right_bar.grid(row=1, column=2, rowspan=2, sticky="nsew")
         center    = tk.Frame(self, bg="#000"); center.grid(row=1, column=1, rowspan=2, sticky="nsew")
@@ -94,17 +290,14 @@ class Scoreboard(tk.Tk):
         self._configurar_grid(right_bar, 5, 1)
         self._configurar_grid(center, 4, 3)
 
-        ttk.Button(self.window_toolbar, text="MENU",  command=self.show_menu,
-                takefocus=False, style="Menu.TButton").grid(row=0, column=0, sticky="w", padx=8, pady=8)
-        ttk.Button(self.window_toolbar, text="EDITAR", command=self.edit_config,
-                takefocus=False, style="Menu.TButton").grid(row=0, column=1, sticky="w", padx=8, pady=8)
-
         # Izquierda
         self.arrow_left = ArrowIndicator(left_bar, side="left", on=False,
                                         active="#00d4ff", inactive="#303030",
                                         width=150, height=150,
                                         command=self._on_arrow_left)
         self.arrow_left.grid(row=0, column=0)
+        self.logo_left = tk.Label(left_bar, bg="#000")
+        self.logo_left.grid(row=1, column=0)
         self.score_left  = tk.Label(left_bar, text="0", bg="#000", fg="#00ff7f", font=self.f_big)
         self.score_left.grid(row=2, column=0, padx=12, pady=10)
         
@@ -139,6 +332,8 @@ class Scoreboard(tk.Tk):
                                         command=self._on_arrow_right)
         
         self.arrow_right.grid(row=0, column=0)
+        self.logo_right = tk.Label(right_bar, bg="#000")
+        self.logo_right.grid(row=1, column=0)
         self.score_right = tk.Label(right_bar, text="0", bg="#000", fg="#00ff7f", font=self.f_big)
         self.score_right.grid(row=2, column=0, padx=12, pady=10)
 
@@ -195,67 +390,162 @@ class Scoreboard(tk.Tk):
             self.arrow_left.set_on(False)
 
     # ----------------- Render -----------------
+    def _bind_render(self):
+        # Los valores se calculan una vez en self.plan; cada ventana (ésta y las
+        # DisplayWindow) tiene su vista con sus apply
+        self.plan = RenderPlan()
+        self.plan.key("look_left",  "names", lambda s: self._team_look(s.team_names[0]))
+        self.plan.key("look_right", "names", lambda s: self._team_look(s.team_names[1]))
+        r = self.renderer = self.plan.view("principal")
+        text = lambda w: (lambda v: w.config(text=v))
+
+        r.bind("score_left",    text(self.score_left))
+        r.bind("score_right",   text(self.score_right))
+        r.bind("minutes_left",  text(self.minutes_left_value))
+        r.bind("minutes_right", text(self.minutes_right_value))
+        r.bind("names",         text(self.names_label))
+        r.bind("look_left",     lambda v: self._show_team(0, v))
+        r.bind("look_right",    lambda v: self._show_team(1, v))
+        r.bind("period",        text(self.period_lbl))
+        r.bind("time",          text(self.time_lbl))
+        r.bind("shot",          text(self.shot_lbl))
+        r.bind("fouls_left",    text(self.foul_left_value))
+        r.bind("fouls_right",   text(self.foul_right_value))
+        # Bandera de 5 faltas: el valor cacheado ya dice si está visible
+        if self.board:
+            r.bind("flag_left",  self.board.flag_left.set_visible)
+            r.bind("flag_right", self.board.flag_right.set_visible)
+        else:
+            r.bind("flag_left",  lambda on: self._show_flag(self.label_imgI, on))
+            r.bind("flag_right", lambda on: self._show_flag(self.label_imgD, on))
+
+    def open_display(self, layout="wide", scheme="clasico", geometry=None, scale=1.0):
+        """Otra ventana del mismo tablero (ver display.py); se pinta con el mismo plan."""
+        from display import DisplayWindow
+        win = DisplayWindow(self, self.plan, layout, scheme, geometry, scale)
+        self.displays = [w for w in self.displays if w.winfo_exists()] + [win]
+        self.plan.render(self.state)  # primer pintado de la ventana nueva
+        return win
+
+    def _team_look(self, name):
+        team = self.teams.get(name)
+        return (team.colors[0], team.logo) if team else (DEFAULT_COLOR, "")
+
+    def _show_team(self, side, look):
+        """Color de los puntos y logo del perfil del equipo (el logo sale de la caché LRU)."""
+        self._team_looks[side] = look
+        color, logo = look
+        (self.score_left, self.score_right)[side].config(fg=color)
+        label = getattr(self, ("logo_left", "logo_right")[side], None)
+        if label is None:  # el backend canvas no tiene lugar para logos
+            return
+        img = ""
+        if logo:
+            try:
+                img = self.images.get(logo, (self._logo_px, self._logo_px))
+            except (OSError, ImportError, tk.TclError):
+                img = ""
+        label.config(image=img)
+        label.image = img  # la caché puede soltarla: el Label la mantiene viva
+
+    def _show_flag(self, label, on):
+        if on:
+            label.pack(expand=True)  # ocupa su caja
+        else:
+            label.pack_forget()
+
     def _refresh_all(self):
-        s = self.state
-        self.score_left.config(text=str(s.scores[0]))
-        self.score_right.config(text=str(s.scores[1]))
-        self.minutes_left_value.config(text=str(s.minutes[0]))
-        self.minutes_right_value.config(text=str(s.minutes[1]))
-        self.names_label.config(text=f"{s.team_names[0]} - {s.team_names[1]}")
-        self.period_lbl.config(text=s.period_str())
-        self.time_lbl.config(text=s.time_str())
-        self.shot_lbl.config(text=s.shot_str())
-        
-        # Lado izquierdo
-        self.foul_left_value.config(text=str(s.fouls[0]))
-        if s.fouls[0] >= 5:
-            if not self.label_imgI.winfo_ismapped():
-                self.label_imgI.pack(expand=True)  # ocupa su caja
+        # Sólo se tocan los widgets cuyos campos cambiaron, en todas las ventanas (ver RenderPlan)
+        t0 = time.perf_counter_ns()
+        self.state.sample_clocks()
+        for target in list(self._tinted):
+            if ANIM_TARGETS[target][2](self.state):  # reloj reanudado / 24s rearmado
+                self._rest(target)
+        self.plan.render(self.state)
+        if self.publisher:
+            self.publisher.publish(self.state)
+        self.metrics.render.observe((time.perf_counter_ns() - t0) / 1e6)
+        self._arm_frame()  # una tecla o un comando pueden cambiar el ritmo (p.ej. arrancar el reloj)
+
+    # ----------------- Muestreo de relojes -----------------
+    def _arm_frame(self):
+        """
+        Próximo frame: nada con los relojes detenidos, 1 Hz alineado al cambio
+        de segundo y 10 Hz en el último minuto o con 24s < 5 (timing.frame_delay_ms).
+        """
+        if self.mirror or (self.replayer and self.replay_playing):
+            mode, ms = "poll", SAMPLE_MS   # el espejo no sabe cuándo llega el próximo dato
+        elif self.replayer:
+            mode, ms = "idle", None
         else:
-            if self.label_imgI.winfo_ismapped():
-                self.label_imgI.pack_forget()
-
-        # Lado derecho
-        self.foul_right_value.config(text=str(s.fouls[1]))
-        if s.fouls[1] >= 5:
-            if not self.label_imgD.winfo_ismapped():
-                self.label_imgD.pack(expand=True)
+            with self.state.lock:  # el hilo de relojes para el reloj y encola el evento juntos
+                mode, ms = frame_delay_ms(self.state)
+                if not self.clocks.events.empty():
+                    mode, ms = "event", 0  # venció entre drain() y acá: no dormir con eso en la cola
+        if self.overlay or self.publisher:  # overlay de métricas / keyframes para espejos que se suman
+            ms = min(ms or SLOW_MS, SLOW_MS)
+        if self._tick_job is not None:
+            self.after_cancel(self._tick_job)
+        self._tick_mode = mode
+        if ms is None:
+            self._tick_job = self._tick_due = None
         else:
-            if self.label_imgD.winfo_ismapped():
-                self.label_imgD.pack_forget()
+            self._tick_job = self.after(ms, self._schedule_ticks)
+            self._tick_due = time.perf_counter_ns() + ms * 1_000_000
 
-    # ----------------- Ticks dirigidos por la UI -----------------
     def _schedule_ticks(self):
-        # Juego
-        ended = self.state.tick_game_1s()
-        if ended:
-            self._blink_time()
-            
-        # 24s
-        evt = self.state.tick_shot_1s()
-        if evt == "shot10":
-            self._play_tun(times=1)       
-        elif evt == "shot5":
-            self._play_tun(times=2, gap_ms=500) 
-            
-        self._refresh_all()
-        # reprogramo
-        self.after(1000, self._schedule_ticks)
-
-    def _blink_time(self, count=6):
-        if count <= 0:
-            self.time_lbl.config(fg="#ff2b2b"); return
-        current = self.time_lbl.cget("fg")
-        self.time_lbl.config(fg="white" if current == "#ff2b2b" else "#ff2b2b")
-        self.after(250, lambda: self._blink_time(count - 1))
-
-    def _blink_widget(self, widget, end_color="#ff2b2b", times=6, interval=250):
-        # simple parpadeo
-        if times <= 0:
-            widget.config(fg=end_color); return
-        current = widget.cget("fg")
-        widget.config(fg="white" if current == end_color else end_color)
-        self.after(interval, lambda: self._blink_widget(widget, end_color, times-1, interval))
+        self._tick_job = None
+        now = time.perf_counter_ns()
+        if self._tick_due is not None:
+            self.metrics.tick_late.observe(max(0, now - self._tick_due) / 1e6)
+        self.metrics.wakeups[self._tick_mode] += 1
+        if self.overlay:
+            r = self.renderer
+            self.overlay.config(text=self.metrics.overlay_text() +
+                                f"\nwidgets {r.last_updates} tocados / {r.last_skipped} saltados (último frame)")
+
+        if self.mirror or self.replayer:
+            if self.mirror:
+                self.subscriber.drain(self.state)
+            else:
+                self._replay_tick(now)
+            self._refresh_all()  # arma el próximo frame
+            return
+
+        # Los eventos ya sonaron en el hilo de relojes; acá sólo lo visual
+        st = self.state
+        for evt, _ in self.clocks.drain():
+            if evt == "end":
+                self._animate("time", PERIOD_END)
+                if st.period >= st.rules.periods and st.scores[0] != st.scores[1]:
+                    self._archive_game(finished=True)
+                else:
+                    self._save_game()  # jugada por jugada a disco una vez por período
+            elif evt in SHOT_ANIMS:
+                self._animate("shot", SHOT_ANIMS[evt])
+
+        # Un after() tardío no atrasa el reloj; el render sólo toca lo que cambió
+        self._refresh_all()  # arma el próximo frame
+
+    # ----------------- Animaciones -----------------
+    def _animate(self, target, anim):
+        # reemplaza la animación anterior del mismo destino: nunca se apilan
+        self.timeline.play(target, anim)
+        self._tinted.add(target)
+        if self._anim_job is None:
+            self._anim_job = self.after(0, self._animate_frame)
+
+    def _animate_frame(self):
+        # un solo callback para todas las animaciones; se apaga cuando no queda ninguna
+        for target, color in self.timeline.frame().items():
+            getattr(self, ANIM_TARGETS[target][0]).config(fg=color)
+        self._anim_job = self.after(ANIM_MS, self._animate_frame) if self.timeline.active else None
+
+    def _rest(self, target):
+        widget, color, _ = ANIM_TARGETS[target]
+        self.timeline.stop(target)
+        self._tinted.discard(target)
+        getattr(self, widget).config(fg=color)
 
     # ----------------- Ventanas -----------------
     def edit_config(self):
@@ -273,14 +563,19 @@ class Scoreboard(tk.Tk):
 
         v1 = tk.StringVar(master=win, value=self.state.team_names[0])
         v2 = tk.StringVar(master=win, value=self.state.team_names[1])
-        e1 = ttk.Entry(win, textvariable=v1, width=22); e1.grid(row=1, column=1, padx=6, pady=4)
-        e2 = ttk.Entry(win, textvariable=v2, width=22); e2.grid(row=2, column=1, padx=6, pady=4)
+        e1 = ttk.Combobox(win, textvariable=v1, width=22); e1.grid(row=1, column=1, padx=6, pady=4)
+        e2 = ttk.Combobox(win, textvariable=v2, width=22); e2.grid(row=2, column=1, padx=6, pady=4)
+        # Autocompletado sobre los perfiles guardados (flecha abajo despliega las sugerencias)
+        for cb, var in ((e1, v1), (e2, v2)):
+            cb["values"] = self.teams.search(var.get())
+            cb.bind("<KeyRelease>", lambda e, cb=cb, var=var:
+                    e.keysym in ("Up", "Down", "Return") or cb.configure(values=self.teams.search(var.get())))
 
         # Tiempo
         ttk.Label(win, text="Tiempo", font=self.f_small).grid(row=3, column=0, columnspan=2, pady=(8,4))
         
         ttk.Label(win, text="Tiempo (MM:SS):").grid(row=4, column=0, padx=6, pady=4, sticky="e")
-        v3 = tk.StringVar(master=win, value=self.state.time_str())
+        v3 = tk.StringVar(master=win, value=self.state.format_mmss(self.state.time_left))
         vcmd = (self.register(lambda s: bool(re.fullmatch(r"\d{0,2}(:\d{0,2})?", s or ""))), "%P")
         e3 = ttk.Entry(win, textvariable=v3, width=6, justify="center", validate="key", validatecommand=vcmd)
         e3.grid(row=4, column=1, padx=6, pady=4)
@@ -307,6 +602,12 @@ class Scoreboard(tk.Tk):
         def save():
             try:
                 self.state.set_names(v1.get(), v2.get())
+                known = len(self.teams.teams)
+                for name in self.state.team_names:
+                    if name not in ("Team 1", "Team 2"):
+                        self.teams.ensure(name)
+                if len(self.teams.teams) != known:
+                    self.teams.save()
                 self.state.set_game_time_from_text(v3.get().strip())
                 self.state.set_shot_time(v4.get().strip())
                 self.state.set_points(int(self.v5.get().strip()), int(self.v6.get().strip()))
@@ -332,7 +633,18 @@ class Scoreboard(tk.Tk):
         win.title("Menú"); win.resizable(False, False); win.transient(self); win.grab_set()
         ttk.Button(win, text="Reiniciar marcador", command=lambda:(self.state.reset_scores(), self._refresh_all())).grid(row=0, column=0, padx=12, pady=12, sticky="ew")
         ttk.Button(win, text="Reiniciar tiempo",   command=lambda:(self.state.reset_time(),   self._refresh_all())).grid(row=1, column=0, padx=12, pady=12, sticky="ew")
-        ttk.Button(win, text="Reiniciar todo",     command=lambda:(self.state.reset_all(),    self._refresh_all())).grid(row=2, column=0, padx=12, pady=12, sticky="ew")
+        ttk.Button(win, text="Reiniciar todo",     command=self._reset_all).grid(row=2, column=0, padx=12, pady=12, sticky="ew")
+        ttk.Button(win, text="Abrir otra pantalla", command=self.open_display).grid(row=3, column=0, padx=12, pady=12, sticky="ew")
+
+        # Tabla de posiciones: la consulta corre en el hilo del archivo
+        cols = ("Equipo", "PJ", "G", "P", "PF", "PC", "Prom")
+        table = ttk.Treeview(win, columns=cols, show="headings", height=8)
+        for c in cols:
+            table.heading(c, text=c)
+            table.column(c, width=140 if c == "Equipo" else 48, anchor="w" if c == "Equipo" else "e")
+        table.grid(row=0, column=1, rowspan=4, padx=12, pady=12, sticky="nsew")
+        if self.archive:
+            self._fill_standings(table, self.archive.standings())
 
         def on_close():
             try: win.grab_release()
@@ -341,6 +653,94 @@ class Scoreboard(tk.Tk):
 
         win.protocol("WM_DELETE_WINDOW", on_close)
         
+    def _fill_standings(self, table, future):
+        if not table.winfo_exists():
+            return
+        if not future.done():
+            self.after(50, lambda: self._fill_standings(table, future))
+            return
+        table.delete(*table.get_children())
+        for row in future.result():
+            table.insert("", "end", values=row)
+
+    def _on_close(self):
+        if self.clocks:
+            self.clocks.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.remote:
+            self.remote.on_applied = None  # que el hilo de red no espere a Tk mientras se cierra
+            try:
+                self.remote.stop()
+            except TimeoutError:
+                pass  # una conexión trabada no se lleva el snapshot final
+        if self.feed:
+            self.feed.stop()
+        if self.led:
+            self.led.stop()
+        if self.overlay_writer:
+            self.overlay_writer.stop()
+        if self.journal:
+            self.journal.close(self.state)  # snapshot final
+        if self.recorder:
+            self.recorder.close()
+        if self.archive:
+            # sin archivar: el partido sigue al volver a abrir (journal + game.json)
+            self._save_game()
+            self.archive.close()  # espera a que termine de escribir
+        self.destroy()
+
+    # ----------------- Archivo del torneo -----------------
+    def _new_playlog(self, resume=False):
+        """
+        Partido nuevo, o con `resume` el que recuperó el journal: vuelve con su
+        id, su jugada por jugada y si ya se archivó (game.json).
+        """
+        if self.plays:
+            self.state.unsubscribe(self.plays.on_mutation)
+        if self.recorder:
+            self.recorder.close()
+        self.plays = PlayLog()  # jugada por jugada; sale a plays.csv con el partido
+        game = read_json(self._game_path()) if resume else {}
+        if game.get("id"):
+            self.game_id, self.game_saved = game["id"], game.get("saved", False)
+            self.plays.load(game.get("plays", {}))
+            replay_id = f"{self.game_id}-{time.strftime('%H%M%S')}"  # la repetición sigue en otro archivo
+        else:
+            self.game_id = replay_id = time.strftime("%Y%m%d-%H%M%S")
+            self.game_saved = False
+        self.plays.attach(self.state)
+        # cada mutación con checkpoints, para revisar después con --replay
+        self.recorder = Recorder(self.state, replay_path(os.path.abspath(DATA_DIR), replay_id))
+        self._save_game()
+
+    def _game_path(self):
+        return os.path.join(os.path.abspath(DATA_DIR), "game.json")
+
+    def _save_game(self):
+        write_json(self._game_path(), {"id": self.game_id, "saved": self.game_saved,
+                                        "plays": self.plays.dump()})
+
+    def _archive_game(self, finished):
+        """
+        Guarda el partido (SQLite + plays.csv) una sola vez; sin puntos no hay
+        nada que guardar. finished=False: abandonado, no cuenta en las tablas.
+        """
+        if self.game_saved or not any(self.state.scores):
+            return
+        self.archive.save(record_from(self.state, self.plays, finished, key=self.game_id))
+        sink = CsvSink(os.path.join(os.path.abspath(DATA_DIR), "plays.csv"))
+        self.plays.spill(sink, self.game_id)
+        sink.close()
+        self.game_saved = True
+        self._save_game()
+
+    def _reset_all(self):
+        self._archive_game(finished=False)  # reiniciado antes del final: queda como abandonado
+        self.state.reset_all()
+        self._new_playlog()
+        self._refresh_all()
+
     def toggle_fullscreen(self, event=None):
         self.fullscreen = not self.fullscreen
         self.attributes("-fullscreen", self.fullscreen)
@@ -356,34 +756,229 @@ class Scoreboard(tk.Tk):
 
     # ----------------- Hotkeys -----------------
     def _bind_keys(self):
-        self.bind("<space>",  lambda e: (self.state.toggle_game(), self.state.toggle_shot(), self._refresh_all()))
-        self.bind("<Return>", lambda e: (self.state.next_period(), self._refresh_all()))
-        self.bind("z", lambda e: (self.state.add_points(0, +1), self._refresh_all()))
-        self.bind("x", lambda e: (self.state.add_points(0, -1), self._refresh_all()))
-        self.bind("n", lambda e: (self.state.add_points(1, +1), self._refresh_all()))
-        self.bind("m", lambda e: (self.state.add_points(1, -1), self._refresh_all()))
-        self.bind("a", lambda e: (self.state.add_fouls(0, +1), self._refresh_all()))
-        self.bind("s", lambda e: (self.state.add_fouls(0, -1), self._refresh_all()))
-        self.bind("k", lambda e: (self.state.add_fouls(1, +1), self._refresh_all()))
-        self.bind("l", lambda e: (self.state.add_fouls(1, -1), self._refresh_all()))
-        self.bind("q", lambda e: (self.state.add_minutes(0, +1), self._refresh_all()))
-        self.bind("w", lambda e: (self.state.add_minutes(0, -1), self._refresh_all()))
-        self.bind("o", lambda e: (self.state.add_minutes(1, +1), self._refresh_all()))
-        self.bind("p", lambda e: (self.state.add_minutes(1, -1), self._refresh_all()))
-        self.bind("2", lambda e: (self.state.reset_shot_14(), self._refresh_all()))
-        self.bind("3", lambda e: (self.state.reset_shot_24(), self._refresh_all()))
-        self.bind("<Shift_L>", lambda e: (self.state.toggle_shot(), self._refresh_all()))
+        # Cada tecla encola un comando; Ctrl+Z / Ctrl+Y deshacen y rehacen
+        for key, cmd in KEYMAP.items():
+            self.bind(key, lambda e, c=cmd: self._enqueue(c))
+        self.bind("<F3>", self.toggle_overlay)
+        # Teclado numérico: número del jugador del próximo punto o falta
+        for d in range(10):
+            self.bind(f"<KP_{d}>", lambda e, d=d: self.plays.type_digit(d))
         self.bind("f", self.toggle_fullscreen)
+
+    def _enqueue(self, cmd):
+        if self._key_t0 is None:
+            self._key_t0 = time.perf_counter_ns()
+        self.commands.push(cmd)
+        if self._drain_job is None:  # una ráfaga de auto-repeat = un solo refresh
+            self._drain_job = self.after(COMMAND_MS, self._drain_commands)
+
+    def _drain_commands(self):
+        self._drain_job = None
+        with self.state.lock:  # la ráfaga entera, sin que el hilo de relojes se meta
+            n = self.commands.drain(self.state)
+        if n:
+            self._refresh_all()
+        # after_idle corre después de que Tk redibujó lo que cambió el render
+        t0, self._key_t0 = self._key_t0, None
+        self.after_idle(lambda: self.metrics.key_latency.observe((time.perf_counter_ns() - t0) / 1e6))
+
+    # ----------------- Modo repetición -----------------
+    def _build_replay_bar(self):
+        bar = self.window_toolbar
+        bar.grid_columnconfigure(2, weight=1)
+        self.replay_pos = tk.DoubleVar(value=0.0)
+        ttk.Scale(bar, from_=0, to=max(1.0, self.replayer.length_ns / 1e9), variable=self.replay_pos,
+                  command=lambda v: self._replay_seek(float(v) * 1e9)
+                  ).grid(row=0, column=2, sticky="ew", padx=8)
+        self.replay_lbl = tk.Label(bar, bg="#000", fg="#ffd700", font=("Courier", 14, "bold"))
+        self.replay_lbl.grid(row=0, column=3, sticky="e", padx=8)
+        self._replay_status()
+
+    def _bind_replay_keys(self):
+        # ←/→ un evento; Shift+←/→ 10 s; ↑/↓ velocidad; espacio play/pausa; g período y reloj
+        self.bind("<Left>",  lambda e: self._replay_step(-1))
+        self.bind("<Right>", lambda e: self._replay_step(1))
+        self.bind("<Shift-Left>",  lambda e: self._replay_seek(self.replayer.pos_ns - REPLAY_JUMP_S * 1e9))
+        self.bind("<Shift-Right>", lambda e: self._replay_seek(self.replayer.pos_ns + REPLAY_JUMP_S * 1e9))
+        self.bind("<Up>",   lambda e: self._replay_speed(1))
+        self.bind("<Down>", lambda e: self._replay_speed(-1))
+        self.bind("<space>", self._replay_toggle)
+        self.bind("g", self._replay_goto)
+        self.bind("f", self.toggle_fullscreen)
+        self.bind("<F3>", self.toggle_overlay)
+
+    def _replay_tick(self, now):
+        rp = self.replayer
+        if self.replay_playing and self._replay_t is not None:
+            rp.seek(rp.pos_ns + (now - self._replay_t) * self.replay_speed)
+            if rp.pos_ns >= rp.length_ns:
+                self.replay_playing = False
+        self._replay_t = now
+        self._replay_status()
+
+    def _replay_status(self):
+        rp = self.replayer
+        self.replay_pos.set(rp.pos_ns / 1e9)
+        self.replay_lbl.config(text=f"{'▶' if self.replay_playing else '❚❚'} {self.replay_speed:>3}x "
+                                    f"{GameState.format_mmss(int(rp.pos_ns // 1e9))} "
+                                    f"ev {rp.i + 1}/{rp.rec.n} {rp.rec.ops[rp.i] if rp.i >= 0 else ''}")
+
+    def _replay_seek(self, pos_ns):
+        self.replayer.seek(pos_ns)
+        self._replay_status()
+        self._refresh_all()
+
+    def _replay_step(self, n):
+        self.replay_playing = False
+        self.replayer.step(n)
+        self._replay_status()
+        self._refresh_all()
+
+    def _replay_speed(self, d):
+        i = REPLAY_SPEEDS.index(self.replay_speed)
+        self.replay_speed = REPLAY_SPEEDS[max(0, min(len(REPLAY_SPEEDS) - 1, i + d))]
+        self._replay_status()
+
+    def _replay_toggle(self, event=None):
+        self.replay_playing = not self.replay_playing
+        self._replay_t = None  # el próximo tick arranca a contar desde ahí
+        self._replay_status()
+        self._arm_frame()
+
+    def _replay_goto(self, event=None):
+        from tkinter import simpledialog
+        txt = simpledialog.askstring("Ir a", "Período y reloj (ej: 3 04:12)", parent=self)
+        if not txt:
+            return
+        try:
+            period, mmss = txt.split()
+            ok = self.replayer.seek_game(int(period), GameState.parse_mmss(mmss))
+        except ValueError as e:
+            messagebox.showerror("Error", str(e) or "Formato inválido (ej: 3 04:12)", parent=self)
+            return
+        if not ok:
+            messagebox.showinfo("Ir a", "Ese momento no está en la repetición", parent=self)
+        self.replay_playing = False
+        self._replay_status()
+        self._refresh_all()
+
+    def _remote_applied(self):
+        # Corre en el hilo de red: un evento virtual (Tcl lo pasa al hilo de Tk)
+        # y uno solo por más ráfagas que lleguen antes de que se atienda
+        if not self._remote_wake:
+            self._remote_wake = True
+            try:
+                self.event_generate("<<Remote>>", when="tail")
+            except (RuntimeError, tk.TclError):
+                self._remote_wake = False  # Tk cerrándose: el próximo comando vuelve a intentar
+
+    def _on_remote(self, event=None):
+        try:
+            self._refresh_all()
+        finally:
+            self._remote_wake = False
+
+    def toggle_overlay(self, event=None):
+        if self.overlay:
+            self.overlay.destroy()
+            self.overlay = None
+            return
+        self.overlay = tk.Label(self, text=self.metrics.overlay_text(), justify="left",
+                                bg="#000", fg="#00ff7f", font=("Courier", 10))
+        self.overlay.place(x=8, y=8)
+        self._arm_frame()  # con el overlay visible no se duerme del todo
     
     # ----------------- Escalado -----------------
+    _SCALE_TABLE = None  # no depende de la pantalla: se arma una vez y la comparten las ventanas
+
+    def _build_scale_table(self):
+        """
+        Para cada escalón de factor: el tamaño de cada fuente. El factor ya es
+        relativo a la pantalla (base_w/base_h), así que la tabla se arma una
+        sola vez; el resize sólo busca en ella.
+        """
+        if Scoreboard._SCALE_TABLE is None:
+            steps = int(round((1.0 - 0.6) / SCALE_STEP))
+            table = []
+            for k in range(steps + 1):
+                factor = 0.6 + k * SCALE_STEP
+                sizes = tuple(max(8, int(round(base * factor))) for _, base in self._fontsizes)
+                table.append({"factor": factor, "sizes": sizes})
+            Scoreboard._SCALE_TABLE = table
+        return Scoreboard._SCALE_TABLE
+
     def _on_resize(self, event):
+        # Los hijos también mandan <Configure>; sólo interesa la ventana principal
+        if event.widget is not self:
+            return
+        self.resize_stats["events"] += 1
+        if self._resize_job is None:
+            self._resize_job = self.after(RESIZE_MS, self._apply_resize)
+
+    def _apply_resize(self):
+        self._resize_job = None
         w = max(self.winfo_width(), 1); h = max(self.winfo_height(), 1)
         factor = max(0.6, min(1.0, min(w / self.base_w, h / self.base_h)))
-        for fnt, base in self._fontsizes:
-            new_size = max(8, int(round(base * factor)))
-            if fnt.cget("size") != new_size:
-                fnt.configure(size=new_size)
+        step = int(round((factor - 0.6) / SCALE_STEP))
+        if step == self._scale_step:
+            return
+        self._scale_step = step
+        t0 = time.perf_counter()
+        for (fnt, _), size in zip(self._fontsizes, self._scale_table[step]["sizes"]):
+            if fnt.cget("size") != size:
+                fnt.configure(size=size)
+        self._logo_px = max(16, int(LOGO_PX * self._scale_table[step]["factor"]))
+        for side, look in enumerate(self._team_looks):
+            if look and look[1]:
+                self._show_team(side, look)
+        self.update_idletasks()  # mide el relayout completo que dispara el cambio
+        self.resize_stats["applied"] += 1
+        self.resize_stats["relayout_ms"].append((time.perf_counter() - t0) * 1000)
+
+def _host_port(txt):
+    host, _, port = txt.partition(":")
+    return host, int(port or PORT)
 
 if __name__ == "__main__":
-    app = Scoreboard()
+    ap = argparse.ArgumentParser(description="Marcador de Básquet")
+    ap.add_argument("--broadcast", nargs="?", type=int, const=PORT, metavar="PUERTO",
+                    help="publica el marcador para pantallas espejo")
+    ap.add_argument("--mirror", type=_host_port, metavar="HOST[:PUERTO]",
+                    help="pantalla espejo de sólo lectura")
+    ap.add_argument("--profile", action="store_true",
+                    help="muestra tiempos de arranque (import, primer frame)")
+    ap.add_argument("--backend", choices=("labels", "canvas"), default="labels",
+                    help="cómo se dibuja el tablero")
+    ap.add_argument("--rules", choices=RULESETS, default=LEAGUE.name,
+                    help="reglamento: períodos, 24s y minutos")
+    ap.add_argument("--metrics", nargs="?", type=int, const=METRICS_PORT, metavar="PUERTO",
+                    help="sirve /metrics (Prometheus) en 127.0.0.1")
+    ap.add_argument("--overlay", nargs="?", const="", metavar="ARCHIVO",
+                    help="score bug RGBA en memoria compartida (por defecto /dev/shm/marcador_overlay.rgba)")
+    ap.add_argument("--overlay-fps", type=int, default=30, choices=(30, 50, 60))
+    ap.add_argument("--remote", nargs="?", type=int, const=REMOTE_PORT, metavar="PUERTO",
+                    help="acepta comandos de tablets en la red local")
+    ap.add_argument("--remote-token", metavar="CLAVE",
+                    help="clave que tienen que mandar las tablets al conectarse (sin clave sólo escucha en 127.0.0.1)")
+    ap.add_argument("--feed", nargs="?", const="", metavar="CARPETA",
+                    help="marcador.json/.xml/.csv para la gráfica (por defecto marcador_data/feed)")
+    ap.add_argument("--replay", metavar="ARCHIVO",
+                    help="revisa un partido grabado (marcador_data/replay-*.bin)")
+    ap.add_argument("--display", action="append", default=[], metavar="LAYOUT[:ESQUEMA][@GEOMETRÍA]",
+                    help="otra ventana del tablero (wide/compact/portrait, clasico/contraste/claro); se repite")
+    ap.add_argument("--led", metavar="tcp:HOST:PUERTO|RUTA[@BAUDIOS]",
+                    help="tablero LED físico por red o por puerto serie / RS-485")
+    ap.add_argument("--led-fps", type=int, default=20, metavar="N",
+                    help="frames por segundo que acepta el controlador LED")
+    args = ap.parse_args()
+    from display import parse_display
+    try:
+        displays = [parse_display(d) for d in args.display]
+    except ValueError as e:
+        ap.error(str(e))
+    app = Scoreboard(mirror=args.mirror, broadcast_port=args.broadcast, profile=args.profile,
+                     backend=args.backend, rules=RULESETS[args.rules], metrics_port=args.metrics,
+                     overlay=args.overlay, overlay_fps=args.overlay_fps, replay=args.replay,
+                     remote_port=args.remote, remote_token=args.remote_token, feed=args.feed,
+                     displays=displays, led=args.led, led_fps=args.led_fps)
     app.mainloop()